@@ -1,11 +1,21 @@
 import datetime
 from extensions import db, ma
 from marshmallow import fields
+from sqlalchemy.orm import deferred
+from geometry import boundary_to_json
+
+def normalize_email(email):
+    # Same as the database's LOWER(TRIM(Email)) behind users.Email_Normalized.
+    return email.strip(' ').lower()
+
 
 class users(db.Model):
     __tablename__ = 'users'
     User_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
     Email = db.Column(db.String(50), unique=True, nullable=False)
+    # Lookup key for Email, computed by the database so rows written outside
+    # the ORM get it too.
+    Email_Normalized = db.Column(db.String(50), db.Computed('LOWER(TRIM(Email))', persisted=True))
     Password = db.Column(db.String(200), nullable=False)
     First_name = db.Column(db.String(255), nullable=False)
     Last_name = db.Column(db.String(255), nullable=False)
@@ -16,10 +26,30 @@ class users(db.Model):
     areas = db.relationship('area', backref='author', lazy=True)
     approval = db.relationship('areaApproval', backref='moderator', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_users_email_normalized', 'Email_Normalized', unique=True),
+    )
+
     def __repr__(self):
         return f"<User {self.User_ID} - {self.Email}>"
 
 
+class userMergeAudit(db.Model):
+    """
+    Accounts folded into another when Email_Normalized became unique; the
+    merged account's areas and approvals were moved to the survivor.
+    """
+    __tablename__ = 'user_merge_audit'
+    Merge_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    Merged_User_ID = db.Column(db.Integer, nullable=False)  # deleted, so no foreign key
+    Survivor_User_ID = db.Column(db.Integer, nullable=False)
+    Email = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.now)
+
+    def __repr__(self):
+        return f"<UserMerge {self.Merged_User_ID} -> {self.Survivor_User_ID}>"
+
+
 class area(db.Model):
     __tablename__ = 'area'
     Area_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -30,12 +60,34 @@ class area(db.Model):
     Barangay = db.Column(db.String(255), nullable=False)
     Organization = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.now)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.datetime.now, onupdate=datetime.datetime.now)
+    Boundary = db.Column(db.LargeBinary(length=16777215), nullable=True)
+    # Douglas-Peucker simplified copies of Boundary, see geometry.DETAIL_TOLERANCES.
+    Boundary_Low = deferred(db.Column(db.LargeBinary(length=16777215), nullable=True))
+    Boundary_Medium = deferred(db.Column(db.LargeBinary(length=16777215), nullable=True))
+    Min_Latitude = db.Column(db.Float, nullable=True)
+    Min_Longitude = db.Column(db.Float, nullable=True)
+    Max_Latitude = db.Column(db.Float, nullable=True)
+    Max_Longitude = db.Column(db.Float, nullable=True)
+    Centroid_Latitude = db.Column(db.Float, nullable=True)
+    Centroid_Longitude = db.Column(db.Float, nullable=True)
+    Perimeter_Meters = db.Column(db.Float, nullable=True)
+    Computed_Hectares = db.Column(db.Float, nullable=True)
+    # Status of the latest area_approval row, kept current by the triggers in approval_status.py.
+    Approval_Status = db.Column(db.String(20), nullable=True)
 
     coordinates = db.relationship('areaCoordinates', backref='area_parent', lazy=True, cascade="all, delete-orphan")
     images = db.relationship('areaImages', backref='area_parent', lazy=True, cascade="all, delete-orphan")
     farm = db.relationship('areaFarm', backref='area_parent', lazy=True, cascade="all, delete-orphan")
     approval = db.relationship('areaApproval', backref='area_parent', lazy=True, cascade="all, delete-orphan")
     topography = db.relationship('areaTopography', backref='area_parent', lazy=True, cascade="all, delete-orphan")
+    search_terms = db.relationship('areaSearchTerm', backref='area_parent', lazy=True, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.Index('ix_area_created_at_area_id', 'created_at', 'Area_ID'),
+        db.Index('ix_area_user_id', 'User_ID'),
+        db.Index('ix_area_approval_status_created_at', 'Approval_Status', 'created_at', 'Area_ID'),
+    )
 
     def __repr__(self):
         return f"<Area {self.Area_ID} - {self.Area_Name}>"
@@ -48,14 +100,55 @@ class areaCoordinates(db.Model):
     Longitude = db.Column(db.Float, nullable=False)
     Latitude = db.Column(db.Float, nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_area_coordinates_area_id', 'Area_ID'),
+    )
+
     def __repr__(self):
         return f"<AreaCoordinate (ID: {self.Area_Coordinate_ID}, Area: {self.Area_ID})>"
     
+class areaSearchTerm(db.Model):
+    __tablename__ = 'area_search_term'
+    Search_Term_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    Area_ID = db.Column(db.Integer, db.ForeignKey('area.Area_ID'), nullable=False)
+    Kind = db.Column(db.String(1), nullable=False)  # 'w' = whole word, 't' = trigram
+    Term = db.Column(db.String(64), nullable=False)
+    Word = db.Column(db.String(64))  # the word a trigram came from
+    Weight = db.Column(db.Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        db.Index('ix_area_search_term_kind_term', 'Kind', 'Term', 'Area_ID'),
+        db.Index('ix_area_search_term_area_id', 'Area_ID'),
+    )
+
+    def __repr__(self):
+        return f"<AreaSearchTerm (Area: {self.Area_ID}, {self.Kind}: {self.Term})>"
+
+class imageBlob(db.Model):
+    __tablename__ = 'image_blob'
+    SHA256 = db.Column(db.String(64), primary_key=True)
+    Filepath = db.Column(db.Text, nullable=False)
+    Size = db.Column(db.Integer, nullable=False)
+    Ref_Count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.now)
+
+    def __repr__(self):
+        return f"<ImageBlob {self.SHA256} ({self.Ref_Count} refs)>"
+
 class areaImages(db.Model):
     __tablename__ = 'area_images'
     Image_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
     Area_ID = db.Column(db.Integer, db.ForeignKey('area.Area_ID'), nullable=False)
     Filepath = db.Column(db.Text, nullable=False)
+    Blob_SHA256 = db.Column(db.String(64), db.ForeignKey('image_blob.SHA256'), nullable=True, index=True)
+    Thumbnail_Path = db.Column(db.Text, nullable=True)
+    Medium_Path = db.Column(db.Text, nullable=True)
+    Processing_Status = db.Column(db.String(20), nullable=True, default="Pending")
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.datetime.now, onupdate=datetime.datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_area_images_area_id_image_id', 'Area_ID', 'Image_ID'),
+    )
 
     def __repr__(self):
         return f"<Image (ID: {self.Image_ID}, Filename: {self.Filepath})>"
@@ -67,9 +160,14 @@ class areaFarm(db.Model):
     Soil_Suitability = db.Column(db.String(75), nullable=True)
     Hectares = db.Column(db.Numeric(10,4), nullable=False)
     Status = db.Column(db.String(20), nullable=False, default="Inactive")
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.datetime.now, onupdate=datetime.datetime.now)
 
     harvest = db.relationship('farmHarvestData', backref='farm', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_area_farm_area_id_farm_id', 'Area_ID', 'Farm_ID'),
+    )
+
 class areaApproval(db.Model):
     __tablename__ = 'area_approval'
     Approval_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -77,6 +175,13 @@ class areaApproval(db.Model):
     User_ID = db.Column(db.Integer, db.ForeignKey('users.User_ID'), nullable=False)
     Status = db.Column(db.String(20), nullable=True, default="Pending")
     Time_Of_Checking = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.datetime.now, onupdate=datetime.datetime.now)
+
+    __table_args__ = (
+        # Latest approval per area, and areas having a given status.
+        db.Index('ix_area_approval_area_id_approval_id', 'Area_ID', 'Approval_ID'),
+        db.Index('ix_area_approval_status_area_id', 'Status', 'Area_ID'),
+    )
 
 class areaTopography(db.Model):
     __tablename__ = 'area_topography'
@@ -84,6 +189,11 @@ class areaTopography(db.Model):
     Area_ID = db.Column(db.Integer, db.ForeignKey('area.Area_ID'), nullable=False)
     Slope = db.Column(db.Integer, nullable=True)
     Mean_Average_Sea_Level = db.Column(db.Float, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.datetime.now, onupdate=datetime.datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_area_topography_area_id', 'Area_ID'),
+    )
 
 class farmHarvestData(db.Model):
     __tablename__ = 'farm_harvest_data'
@@ -93,6 +203,11 @@ class farmHarvestData(db.Model):
     Sow_Date = db.Column(db.DateTime, nullable=False)
     Harvest_Date = db.Column(db.DateTime, nullable=False)
     Status = db.Column(db.String(20), nullable=False, default="Ongoing")
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.datetime.now, onupdate=datetime.datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_farm_harvest_data_farm_id_status', 'Farm_ID', 'Status', 'Harvest_ID'),
+    )
 
     def to_dict(self):
         """Converts the farmHarvestData object to a dictionary."""
@@ -106,10 +221,71 @@ class farmHarvestData(db.Model):
             'Status': self.Status
         }
 
+class changePending(db.Model):
+    __tablename__ = 'change_pending'
+    # Written by triggers on the synced tables, moved into change_log at commit.
+    Pending_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    Entity = db.Column(db.String(20), nullable=False)
+    Entity_ID = db.Column(db.Integer, nullable=False)
+    Operation = db.Column(db.String(10), nullable=False)
+
+    def __repr__(self):
+        return f"<PendingChange {self.Pending_ID} {self.Operation} {self.Entity} {self.Entity_ID}>"
+
+class changeLogLock(db.Model):
+    __tablename__ = 'change_log_lock'
+    # A single row; updating it serializes writers of change_log until commit.
+    Lock_ID = db.Column(db.Integer, primary_key=True)
+    Locked_At = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ChangeLogLock {self.Lock_ID}>"
+
+class areaCacheGeneration(db.Model):
+    __tablename__ = 'area_cache_generation'
+    # A single row, bumped by triggers whenever a cached area response may change.
+    Generation_ID = db.Column(db.Integer, primary_key=True)
+    Generation = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AreaCacheGeneration {self.Generation}>"
+
+class changeLog(db.Model):
+    __tablename__ = 'change_log'
+    # Monotonic sequence that sync tokens point into, assigned in commit order.
+    Change_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    Entity = db.Column(db.String(20), nullable=False)
+    Entity_ID = db.Column(db.Integer, nullable=False)
+    Operation = db.Column(db.String(10), nullable=False)  # 'upsert' or 'delete' (tombstone)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_change_log_created_at', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f"<Change {self.Change_ID} {self.Operation} {self.Entity} {self.Entity_ID}>"
+
+
+class revokedToken(db.Model):
+    __tablename__ = 'revoked_token'
+    JTI = db.Column(db.String(36), primary_key=True)
+    # When the token would have expired anyway; the row can go after that.
+    Expires_At = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_revoked_token_created_at', 'created_at'),
+        db.Index('ix_revoked_token_expires_at', 'Expires_At'),
+    )
+
+    def __repr__(self):
+        return f"<RevokedToken {self.JTI}>"
+
 class userSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = users
-        dump_only = ('User_ID', 'Password',)
+        dump_only = ('User_ID', 'Password', 'Email_Normalized',)
         load_instance = True
 
 class areaImageSchema(ma.SQLAlchemyAutoSchema):
@@ -119,6 +295,10 @@ class areaImageSchema(ma.SQLAlchemyAutoSchema):
         exclude = ('area_parent',) 
 
     Image_ID = fields.Int(required=True)
+    Preview_Path = fields.Method('get_preview_path')
+
+    def get_preview_path(self, obj):
+        return obj.Thumbnail_Path or obj.Filepath
 
 class areaCoordinateSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -130,11 +310,22 @@ class areaSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = area
         load_instance = True
-        exclude = ('author',) 
+        exclude = ('author', 'Boundary', 'Boundary_Low', 'Boundary_Medium', 'Min_Latitude', 'Min_Longitude', 'Max_Latitude', 'Max_Longitude', 'Approval_Status',) 
 
-    coordinates = fields.Nested(areaCoordinateSchema, many=True)
+    coordinates = fields.Method('get_coordinates')
     images = fields.Nested(areaImageSchema, many=True)
 
+    boundary_column = 'Boundary'
+
+    def get_coordinates(self, obj):
+        return boundary_to_json(getattr(obj, self.boundary_column))
+
+class areaLowDetailSchema(areaSchema):
+    boundary_column = 'Boundary_Low'
+
+class areaMediumDetailSchema(areaSchema):
+    boundary_column = 'Boundary_Medium'
+
 class areaFarmSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = areaFarm
@@ -167,6 +358,11 @@ users_schema = userSchema(many=True)
 
 area_schema = areaSchema()
 areas_schema = areaSchema(many=True)
+area_schemas_by_detail = {
+    'low': areaLowDetailSchema(),
+    'medium': areaMediumDetailSchema(),
+    'full': area_schema,
+}
 
 area_coordinate_schema = areaCoordinateSchema()
 area_coordinates_schema = areaCoordinateSchema(many=True)
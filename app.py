@@ -1,30 +1,59 @@
 import datetime
 import os
-from werkzeug.utils import secure_filename
-from flask import Flask, request, jsonify, send_from_directory
+from werkzeug.exceptions import RequestEntityTooLarge
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_mysqldb import MySQL
 from flask_migrate import Migrate
 from functools import wraps
 from extensions import db, ma, bcrypt
-from Database import (users, area, areaCoordinates, areaImages, area_schema, areaTopography, areaFarm, areaApproval, farmHarvestData)
+from Database import (users, area, areaCoordinates, areaImages, imageBlob, area_schemas_by_detail, areaTopography, areaFarm, areaApproval, farmHarvestData, normalize_email)
 from flask_jwt_extended import (
     JWTManager, create_access_token,
     jwt_required, get_jwt_identity, get_jwt
 )
 
 import base64
-import uuid
+import click
+import json
 import jwt as pyjwt
+import threading
 import time
-from sqlalchemy.orm import joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm import selectinload, defer, undefer
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
 
 from dotenv import load_dotenv
 
 import dynamic_ip as dip 
+from pagination import paginate_area_rows
+from query_budget import query_budget, unbudgeted
+from search import apply_search, rebuild_search_index
+from geometry import pack_boundary, simplified_boundaries, DETAIL_LEVELS
+from uploads import StreamingUploadRequest, upload_limit
+from resumable_uploads import ChunkStore, UploadSessionError, SESSIONS_DIR_NAME
+from geometry_metrics import compute_metrics, backfill_geometry_metrics, METRIC_COLUMNS
+from spatial_index import area_grid
+from image_pipeline import ImagePipeline, rendition_paths
+from image_store import ContentAddressedStore, BLOBS_DIR_NAME, hash_file
+from image_serving import serve_image
+from response_cache import area_cache
+from triggers import check_trigger_support
+from password_hashing import password_hasher, PasswordHasherBusy
+from token_revocation import revocation_store
+from query_plans import check_hot_queries
+from approval_status import approval_status_mismatches, refresh_approval_status
+from bulk_import import (detect_format, text_stream, iter_records, import_areas, import_harvests, build_area,
+                         validate_area, ImportRowError)
+from export import export_select, iter_features, stream_geojson, stream_ndjson, EXPORT_FORMATS
+from sync import changes_since, stream_snapshot, prune_change_log, publish_changes, SyncTokenExpired
+from compression import compression, compress_response, compress_bytes, supported_encodings
+from read_repository import area_select, assemble_areas, harvests_for_area, harvests_for_farm, harvest_to_dict
+from serializers import (area_serializers_by_detail, areas_serializers_by_detail, serialize_area,
+                         serialize_image, OrjsonProvider, orjson)
 
 app = Flask(__name__)
+app.request_class = StreamingUploadRequest
 CORS(app)
 
 load_dotenv(os.path.join(app.root_path, '.env')) 
@@ -43,13 +72,73 @@ app.config["JWT_SECRET_KEY"] = app.config['SECRET_KEY']
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = datetime.timedelta(days=30)
 app.config['JWT_COOKIE_CSRF_PROTECT'] = False
 app.config['JWT_CSRF_IN_PAYLOAD'] = False
+# Logouts are stored in revoked_token and reach other workers within
+# JWT_REVOCATION_REFRESH_SECONDS (0 checks the table on every request).
+app.config['JWT_REVOCATION_REFRESH_SECONDS'] = float(os.getenv('JWT_REVOCATION_REFRESH_SECONDS', 2))
+app.config['JWT_REVOCATION_REBUILD_SECONDS'] = int(os.getenv('JWT_REVOCATION_REBUILD_SECONDS', 300))
+# Coordinates live packed in area.Boundary; set this to keep mirroring them
+# into the legacy area_coordinates table for external tooling.
+app.config['AREA_COORDINATES_LEGACY_WRITES'] = os.getenv('AREA_COORDINATES_LEGACY_WRITES', '').lower() in ('1', 'true', 'yes')
+# Over-budget views raise when this is set (and under TESTING);
+# otherwise they log a warning. Listings may fetch QUERY_BUDGET_ROWS_PER_AREA
+# rows per area they return, the area itself and its images.
+app.config['QUERY_BUDGET_STRICT'] = os.getenv('QUERY_BUDGET_STRICT', '').lower() in ('1', 'true', 'yes')
+app.config['QUERY_BUDGET_ROWS_PER_AREA'] = int(os.getenv('QUERY_BUDGET_ROWS_PER_AREA', 50))
+# /sync: change_log rows per delta page and how long tombstones and tokens
+# stay valid.
+app.config['SYNC_PAGE_SIZE'] = int(os.getenv('SYNC_PAGE_SIZE', 1000))
+app.config['SYNC_TOMBSTONE_TTL_DAYS'] = int(os.getenv('SYNC_TOMBSTONE_TTL_DAYS', 30))
+app.config['EXPORT_BATCH_SIZE'] = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+app.config['AREA_BATCH_MAX_ITEMS'] = int(os.getenv('AREA_BATCH_MAX_ITEMS', 100))
+app.config['IMPORT_CHUNK_SIZE'] = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
+# Size cap for a multipart /import file; photos use MAX_IMAGE_UPLOAD_BYTES.
+app.config['MAX_IMPORT_UPLOAD_BYTES'] = int(os.getenv('MAX_IMPORT_UPLOAD_BYTES', 512 * 1024 * 1024))
+# Negotiated gzip/brotli for JSON and text bodies of at least COMPRESSION_MIN_SIZE
+# bytes; routes can override this with @compression(...).
+app.config['COMPRESSION_ENABLED'] = os.getenv('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+app.config['COMPRESSION_MIN_SIZE'] = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+app.config['COMPRESSION_GZIP_LEVEL'] = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+# Encode responses with orjson when it is installed. Output stays key-sorted,
+# but non-ASCII text is sent as UTF-8 rather than \u escapes.
+app.config['FAST_JSON'] = os.getenv('FAST_JSON', '').lower() in ('1', 'true', 'yes')
+if app.config['FAST_JSON'] and orjson is not None:
+    app.json = OrjsonProvider(app)
+# bcrypt runs on its own pool of PASSWORD_HASH_WORKERS threads (default: up to
+# 4 cores); logins beyond PASSWORD_HASH_MAX_PENDING queued hashes get a 503.
+# Changing BCRYPT_LOG_ROUNDS rehashes each password at its next login.
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 0))
+app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0))
+app.config['PASSWORD_HASH_TIMEOUT_SECONDS'] = int(os.getenv('PASSWORD_HASH_TIMEOUT_SECONDS', 10))
+# Area read responses are cached in-process unless AREA_CACHE_URL points at a
+# Redis-compatible server; a TTL of 0 disables the cache.
+app.config['AREA_CACHE_URL'] = os.getenv('AREA_CACHE_URL')
+app.config['AREA_CACHE_TTL_SECONDS'] = int(os.getenv('AREA_CACHE_TTL_SECONDS', 60))
+app.config['AREA_CACHE_MAX_ENTRIES'] = int(os.getenv('AREA_CACHE_MAX_ENTRIES', 1024))
 
 BASE_UPLOAD_DIR = 'static/area_images' 
 app.config['BASE_UPLOAD_DIR'] = BASE_UPLOAD_DIR
+# e.g. '/protected_area_images' to let nginx send image bodies via X-Accel-Redirect.
+app.config['IMAGE_ACCEL_REDIRECT_PREFIX'] = os.getenv('IMAGE_ACCEL_REDIRECT_PREFIX')
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+app.config['MAX_IMAGE_UPLOAD_BYTES'] = int(os.getenv('MAX_IMAGE_UPLOAD_BYTES', 15 * 1024 * 1024))
+app.config['UPLOAD_CHUNK_SIZE'] = int(os.getenv('UPLOAD_CHUNK_SIZE', 256 * 1024))
+app.config['UPLOAD_SESSION_TTL_SECONDS'] = int(os.getenv('UPLOAD_SESSION_TTL_SECONDS', 24 * 60 * 60))
 
 os.makedirs(os.path.join(app.root_path, BASE_UPLOAD_DIR), exist_ok=True)
 
 absolute_base_upload_dir = os.path.abspath(os.path.join(app.root_path, BASE_UPLOAD_DIR))
+
+image_store = ContentAddressedStore(
+    os.path.join(absolute_base_upload_dir, BLOBS_DIR_NAME),
+    f"/{BASE_UPLOAD_DIR}/{BLOBS_DIR_NAME}",
+)
+
+upload_store = ChunkStore(
+    os.path.join(absolute_base_upload_dir, SESSIONS_DIR_NAME),
+    chunk_size=app.config['UPLOAD_CHUNK_SIZE'],
+)
 print(f"Backend: Absolute path for base upload directory: {absolute_base_upload_dir}")
 
 app.config['EXTERNAL_BASE_URL'] = os.getenv('EXTERNAL_BASE_URL') 
@@ -62,17 +151,69 @@ if not app.config['EXTERNAL_BASE_URL']:
 db.init_app(app)
 ma.init_app(app)
 bcrypt.init_app(app)
+password_hasher.init_app(app)
+revocation_store.init_app(app)
+area_cache.init_app(app)
+app.after_request(compress_response)
 
 migrate = Migrate(app, db)
 
+image_pipeline = ImagePipeline(app, max_workers=int(os.getenv('IMAGE_PIPELINE_WORKERS', 2)))
+
+
+# Batched IN query per child collection instead of a joined cartesian product.
+# Coordinates come packed in area.Boundary, so only images need one.
+AREA_LOADER_OPTIONS = (
+    selectinload(area.images),
+)
+
+# Only the boundary column matching the requested detail level is fetched.
+BOUNDARY_LOADER_OPTIONS = {
+    'low': (defer(area.Boundary), undefer(area.Boundary_Low)),
+    'medium': (defer(area.Boundary), undefer(area.Boundary_Medium)),
+    'full': (),
+}
+
+
+def area_loader_options(detail='full'):
+    return AREA_LOADER_OPTIONS + BOUNDARY_LOADER_OPTIONS[detail]
+
+
+def get_detail_level(default='full'):
+    detail = request.args.get('detail', default)
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"'detail' must be one of: {', '.join(DETAIL_LEVELS)}")
+    return detail
+
+
+def detail_for_zoom(zoom):
+    if zoom is None or zoom >= 15:
+        return 'full'
+    return 'medium' if zoom >= 12 else 'low'
+
+def area_row_budget(count_arg=None, default=1):
+    # Areas the request can return, plus the look-ahead row for has_more.
+    count = request.args.get(count_arg, default, type=int) if count_arg else default
+    return (max(count, 0) + 1) * app.config['QUERY_BUDGET_ROWS_PER_AREA']
+
+def find_user_by_email(email):
+    # Index seek on users.Email_Normalized, whatever the case of the input.
+    return users.query.filter_by(Email_Normalized=normalize_email(email)).first()
 
 jwt = JWTManager(app)
-BLACKLISTED_JTIS = set()
 
 @jwt.token_in_blocklist_loader
 def is_token_revoked(jwt_header, jwt_payload):
-    jti = jwt_payload['jti']
-    return jti in BLACKLISTED_JTIS
+    return revocation_store.is_revoked(db.session, jwt_payload['jti'])
+
+@app.route(f'/{BASE_UPLOAD_DIR}/<path:filename>', methods=['GET'])
+def serve_area_image(filename):
+    return serve_image(absolute_base_upload_dir, filename)
+
+def password_hashing_busy():
+    response = jsonify({'error': 'Server is busy, please try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @app.route('/hello')
 def hello():
@@ -89,8 +230,15 @@ def login():
         if not user_input or not password:
             return jsonify({'error': 'Email and password are required'}), 400
         
-        user = users.query.filter(users.Email.ilike(user_input)).first()
-        if user and bcrypt.check_password_hash(user.Password, password):
+        user = find_user_by_email(user_input)
+        if user and password_hasher.check(user.Password, password):
+            if password_hasher.needs_rehash(user.Password):
+                try:
+                    user.Password = password_hasher.hash(password)
+                    db.session.commit()
+                except PasswordHasherBusy:
+                    # The upgrade is opportunistic; the next login retries it.
+                    db.session.rollback()
             access_token = create_access_token(identity=str(user.User_ID))
             return jsonify({
                 'access_token': access_token,
@@ -98,6 +246,9 @@ def login():
             }), 200
         else:
             return jsonify({'error': 'Invalid Credentials'}), 401
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return password_hashing_busy()
     except Exception as e:
         app.logger.error(f"Login error: {e}")
         return jsonify({'error': 'An unexpected server error occurred during login.'}), 500
@@ -147,12 +298,16 @@ def get_user_data():
 @jwt_required()
 def logout():
     try:
-        jti = get_jwt()['jti']
-        BLACKLISTED_JTIS.add(jti)
+        token = get_jwt()
+        jti = token['jti']
+        expires_at = datetime.datetime.fromtimestamp(token['exp']) if 'exp' in token else None
+        revocation_store.revoke(db.session, jti, expires_at)
         app.logger.info(f"User logged out. Token with jti {jti} blacklisted.")
         return jsonify({'message': 'Logged out successfully'}), 200
     except Exception as e:
         app.logger.error(f"Logout error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Server error during logout'}), 500
 
 
 
@@ -168,9 +323,9 @@ def register():
         contact_no = data.get('contact_no')
         if not all([email, password, first_name, last_name, sex, contact_no]):
             return jsonify({'error': 'Missing required fields'}), 400
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-        if users.query.filter_by(Email=email).first():
+        if find_user_by_email(email):
             return jsonify({'error': 'Email address already registered'}), 409
+        hashed_password = password_hasher.hash(password)
         new_user = users(
             Email=email.lower(),
             Password=hashed_password,
@@ -183,6 +338,13 @@ def register():
         db.session.add(new_user)
         db.session.commit()
         return jsonify({'message': 'User registered successfully', 'user_id': new_user.User_ID}), 201
+    except IntegrityError:
+        # Lost a race with a concurrent registration of the same address.
+        db.session.rollback()
+        return jsonify({'error': 'Email address already registered'}), 409
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return password_hashing_busy()
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Registration error: {e}")
@@ -246,29 +408,36 @@ def update_user_credentials():
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        if user.Email.lower() != email.lower():
-            if users.query.filter_by(Email=email.lower()).first():
+        if user.Email_Normalized != normalize_email(email):
+            if find_user_by_email(email):
                 return jsonify({'error': 'Email address already registered'}), 409
             user.Email = email.lower()
 
-        if not bcrypt.check_password_hash(user.Password, current_password):
+        if not password_hasher.check(user.Password, current_password):
             return jsonify({'error': 'Current password is incorrect'}), 401
 
-        user.Password = bcrypt.generate_password_hash(new_password).decode('utf-8')
+        user.Password = password_hasher.hash(new_password)
         db.session.commit()
 
         return jsonify({'message': 'User credentials updated successfully'}), 200
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return password_hashing_busy()
     except Exception as e:
         app.logger.error(f"Update user credentials error: {e}")
         return jsonify({'error': 'Server error'}), 500
 
 @app.route('/areas', methods=['GET'])
 @jwt_required()
+@area_cache.cached
+@query_budget(max_statements=2, max_rows=lambda: area_row_budget('per_page', 10))
 def get_all_areas():
     try:
         current_page = request.args.get('page', 1, type=int)
         items_per_page = request.args.get('per_page', 10, type=int)
         search_query = request.args.get('search', '')
+        search_mode = request.args.get('search_mode', 'prefix')
+        cursor = request.args.get('cursor')
 
         print(f"Fetching page {current_page} with {items_per_page} items per page.")
         if search_query:
@@ -278,41 +447,39 @@ def get_all_areas():
             print("Invalid pagination parameters received.")
             return jsonify({"message": "Pagination parameters must be positive integers."}), 400
 
-        base_query = area.query.options(
-            joinedload(area.coordinates),
-            joinedload(area.images)
-        )
-
-        if search_query:
-            search_pattern = f"%{search_query}%"
-            base_query = base_query.filter(
-                or_(
-                    area.Area_Name.ilike(search_pattern),
-                    area.Region.ilike(search_pattern),
-                    area.Province.ilike(search_pattern)
-                )
-            )
+        try:
+            detail = get_detail_level()
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
 
-        offset_value = (current_page - 1) * items_per_page
+        base_query = area_select(detail)
 
-        paginated_area_entries = base_query.offset(offset_value).limit(items_per_page + 1).all()
-        
-        print(f"Database query successful. Found {len(paginated_area_entries)} entries.")
+        search_rank = None
+        if search_query:
+            try:
+                base_query, search_rank = apply_search(base_query, search_query, search_mode)
+            except ValueError as e:
+                return jsonify({"message": str(e)}), 400
 
-        has_more_entries = len(paginated_area_entries) > items_per_page
+        try:
+            area_rows, has_more_entries, next_cursor = paginate_area_rows(
+                db.session, base_query, current_page, items_per_page, cursor, ranked_by=search_rank
+            )
+        except ValueError:
+            return jsonify({"message": "Invalid pagination cursor."}), 400
 
-        if has_more_entries:
-            paginated_area_entries = paginated_area_entries[:-1]
+        print(f"Database query successful. Found {len(area_rows)} entries.")
 
-        serialized_entries = area_schema.dump(paginated_area_entries, many=True)
+        serialized_entries = assemble_areas(db.session, area_rows, detail)
         
         print(f"Serialization successful. Returning {len(serialized_entries)} entries with has_more: {has_more_entries}")
         
         return jsonify({
             "entries": serialized_entries,
-            "page": current_page,
+            "page": current_page if cursor is None else None,
             "per_page": items_per_page,
-            "has_more": has_more_entries
+            "has_more": has_more_entries,
+            "next_cursor": next_cursor
         }), 200
 
     except Exception as e:
@@ -321,67 +488,277 @@ def get_all_areas():
 
 @app.route('/areas_approved', methods=['GET'])
 @jwt_required()
+@area_cache.cached
+@query_budget(max_statements=2, max_rows=lambda: area_row_budget('per_page', 10))
 def get_all_area_approvals():
     try:
         current_page = request.args.get('page', 1, type=int)
         items_per_page = request.args.get('per_page', 10, type=int)
         search_query = request.args.get('search', '')
+        search_mode = request.args.get('search_mode', 'prefix')
+        cursor = request.args.get('cursor')
+
+        if current_page < 1 or items_per_page < 1:
+            return jsonify({"message": "Pagination parameters must be positive integers."}), 400
 
-        # Use subquery for efficiency
-        subquery = db.session.query(areaApproval.Area_ID).filter_by(Status="Approved")
+        try:
+            detail = get_detail_level()
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
 
-        base_query = area.query.filter(area.Area_ID.in_(subquery)).options(
-            joinedload(area.coordinates), 
-            joinedload(area.images),
-            joinedload(area.farm),
-            joinedload(area.topography),
-        )
+        base_query = area_select(detail).where(area.Approval_Status == "Approved")
 
+        search_rank = None
         if search_query:
-            search_pattern = f"%{search_query}%"
-            base_query = base_query.filter(
-                or_(
-                    area.Area_Name.ilike(search_pattern),
-                    area.Region.ilike(search_pattern),
-                    area.Province.ilike(search_pattern)
-                )
+            try:
+                base_query, search_rank = apply_search(base_query, search_query, search_mode)
+            except ValueError as e:
+                return jsonify({"message": str(e)}), 400
+
+        try:
+            area_rows, has_more_entries, next_cursor = paginate_area_rows(
+                db.session, base_query, current_page, items_per_page, cursor, ranked_by=search_rank
             )
+        except ValueError:
+            return jsonify({"message": "Invalid pagination cursor."}), 400
 
-        offset_value = (current_page - 1) * items_per_page
+        result = assemble_areas(db.session, area_rows, detail)
 
-        paginated_area_entries = base_query.offset(offset_value).limit(items_per_page + 1).all()
+        return jsonify({
+            "entries": result,
+            "page": current_page if cursor is None else None,
+            "per_page": items_per_page,
+            "has_more": has_more_entries,
+            "next_cursor": next_cursor
+        }), 200
 
-        has_more_entries = len(paginated_area_entries) > items_per_page
+    except Exception as e:
+        app.logger.error(f"Error fetching approved areas: {e}")
+        return jsonify({"message": "An error occurred while fetching approved areas.", "error": str(e)}), 500
 
-        if has_more_entries:
-            paginated_area_entries = paginated_area_entries[:-1]
+@app.route('/sync', methods=['GET'])
+@jwt_required()
+def sync_changes():
+    """
+    Without ?since= streams a full NDJSON snapshot ending in a sync token.
+    With it, returns only the rows upserted and the IDs deleted since then;
+    keep calling with next_token while has_more is true.
+    """
+    # Changes written outside the app (plain SQL, admin tooling) wait in
+    # change_pending until someone publishes them.
+    try:
+        if publish_changes(db.session):
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error publishing pending changes: {e}")
+
+    since = request.args.get('since')
+    if not since:
+        snapshot = stream_snapshot(db.session)
+        return Response(stream_with_context(snapshot), mimetype='application/x-ndjson')
+
+    try:
+        payload = changes_since(
+            db.session, since,
+            page_size=app.config['SYNC_PAGE_SIZE'],
+            tombstone_ttl_days=app.config['SYNC_TOMBSTONE_TTL_DAYS'],
+        )
+    except SyncTokenExpired:
+        return jsonify({"message": "Sync token has expired; fetch a new snapshot.", "resync": True}), 410
+    except ValueError:
+        return jsonify({"message": "Invalid sync token."}), 400
+    except Exception as e:
+        app.logger.error(f"Error computing sync delta: {e}")
+        return jsonify({"message": "An error occurred while syncing.", "error": str(e)}), 500
+
+    return jsonify(payload), 200
+
+@app.route('/export/areas.<any(geojson, ndjson):export_format>', methods=['GET'])
+@jwt_required()
+def export_areas(export_format):
+    """
+    Streams every matching area as a GeoJSON FeatureCollection or as one
+    Feature per line (NDJSON), with farm and topography rows as properties.
+    Optional filters: region, province, status (latest approval status)
+    and detail (boundary level).
+    """
+    try:
+        detail = get_detail_level()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    statement = export_select(
+        region=request.args.get('region'),
+        province=request.args.get('province'),
+        status=request.args.get('status'),
+        detail=detail,
+    )
+    features = iter_features(db.session, statement, batch_size=app.config['EXPORT_BATCH_SIZE'])
+    body = stream_geojson(features) if export_format == 'geojson' else stream_ndjson(features)
+
+    response = Response(stream_with_context(body), mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="areas.{export_format}"'
+    return response
+
+def index_imported_areas(committed):
+    for area_id, area_bbox in committed:
+        area_grid.insert(area_id, area_bbox)
+
+
+def import_source():
+    """
+    Returns (text stream, format) for a bulk import request: either a
+    multipart 'file' part or the raw request body, with the format taken
+    from ?format=, the file name or the Content-Type.
+    """
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    if upload is not None:
+        upload.stream.seek(0)
+        return text_stream(upload.stream), detect_format(request.args.get('format'), upload.filename, upload.mimetype)
+    return text_stream(request.stream), detect_format(request.args.get('format'), mimetype=request.mimetype)
+
+
+@app.route('/import/areas', methods=['POST'])
+@upload_limit('MAX_IMPORT_UPLOAD_BYTES')
+@jwt_required()
+def bulk_import_areas():
+    """
+    Imports many areas owned by the caller from CSV, GeoJSON or NDJSON.
+    Invalid rows are reported and skipped; the rest are committed in chunks.
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        try:
+            stream, import_format = import_source()
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        report = import_areas(
+            db.session, iter_records(stream, import_format), current_user_id,
+            chunk_size=app.config['IMPORT_CHUNK_SIZE'],
+            legacy_coordinates=app.config['AREA_COORDINATES_LEGACY_WRITES'],
+            on_committed=index_imported_areas,
+        )
+        return jsonify(report.to_dict()), 200 if not report.failed else 207
+    except RequestEntityTooLarge as e:
+        db.session.rollback()
+        return jsonify({"message": e.description}), 413
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error importing areas: {e}")
+        return jsonify({"message": "An error occurred while importing areas.", "error": str(e)}), 500
 
-        result = area_schema.dump(paginated_area_entries, many=True)
+
+@app.route('/import/harvests', methods=['POST'])
+@upload_limit('MAX_IMPORT_UPLOAD_BYTES')
+@jwt_required()
+def bulk_import_harvests():
+    """
+    Imports harvest rows (keyed by area_id or farm_id) from CSV, GeoJSON or
+    NDJSON. Invalid rows are reported and skipped.
+    """
+    try:
+        try:
+            stream, import_format = import_source()
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        report = import_harvests(db.session, iter_records(stream, import_format), chunk_size=app.config['IMPORT_CHUNK_SIZE'] * 4)
+        return jsonify(report.to_dict()), 200 if not report.failed else 207
+    except RequestEntityTooLarge as e:
+        db.session.rollback()
+        return jsonify({"message": e.description}), 413
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error importing harvests: {e}")
+        return jsonify({"message": "An error occurred while importing harvests.", "error": str(e)}), 500
+
+@app.route('/cache/stats', methods=['GET'])
+@compression(enabled=False)
+@jwt_required()
+def get_cache_stats():
+    return jsonify({"area_cache": area_cache.snapshot()}), 200
+
+@app.route('/areas/bbox', methods=['GET'])
+@jwt_required()
+@query_budget(max_rows=lambda: area_row_budget('limit', 500))
+def get_areas_in_bbox():
+    """
+    Returns the areas whose bounding box intersects the map viewport.
+    Candidates come from the in-process grid index, so panning never walks
+    the area table.
+    """
+    try:
+        min_lat = request.args.get('min_lat', type=float)
+        min_lng = request.args.get('min_lng', type=float)
+        max_lat = request.args.get('max_lat', type=float)
+        max_lng = request.args.get('max_lng', type=float)
+        zoom = request.args.get('zoom', type=int)
+        limit = request.args.get('limit', 500, type=int)
+        approved_only = request.args.get('approved', '').lower() in ('1', 'true', 'yes')
+
+        if None in (min_lat, min_lng, max_lat, max_lng):
+            return jsonify({"message": "min_lat, min_lng, max_lat and max_lng are required numbers."}), 400
+        if min_lat > max_lat or min_lng > max_lng:
+            return jsonify({"message": "Bounding box minimums must not exceed maximums."}), 400
+        if zoom is not None and not 0 <= zoom <= 22:
+            return jsonify({"message": "'zoom' must be between 0 and 22."}), 400
+        if limit < 1:
+            return jsonify({"message": "'limit' must be a positive integer."}), 400
+        try:
+            detail = get_detail_level(default=detail_for_zoom(zoom))
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        # Grid upkeep is shared by every request, so it is not charged to this one.
+        with unbudgeted():
+            area_grid.refresh(db.session)
+        candidate_ids = area_grid.query(min_lat, min_lng, max_lat, max_lng)
+
+        entries = []
+        for start in range(0, len(candidate_ids), 1000):
+            chunk_query = area.query.options(*area_loader_options(detail)).filter(
+                area.Area_ID.in_(candidate_ids[start:start + 1000])
+            )
+            if approved_only:
+                chunk_query = chunk_query.filter(area.Approval_Status == "Approved")
+            entries.extend(chunk_query.order_by(area.Area_ID).limit(limit + 1 - len(entries)).all())
+            if len(entries) > limit:
+                break
+
+        has_more_entries = len(entries) > limit
+        if has_more_entries:
+            entries = entries[:limit]
 
         return jsonify({
-            "entries": result,
-            "page": current_page,
-            "per_page": items_per_page,
+            "entries": areas_serializers_by_detail[detail](entries),
+            "zoom": zoom,
+            "detail": detail,
             "has_more": has_more_entries
         }), 200
 
     except Exception as e:
-        app.logger.error(f"Error fetching approved areas: {e}")
-        return jsonify({"message": "An error occurred while fetching approved areas.", "error": str(e)}), 500
+        app.logger.error(f"Error fetching areas in bounding box: {e}")
+        return jsonify({"message": "An error occurred while fetching areas in the bounding box.", "error": str(e)}), 500
 
 @app.route('/area/<int:area_id>', methods=['GET'])
 @jwt_required()
+@area_cache.cached
+@query_budget(max_statements=2, max_rows=area_row_budget)
 def get_area_details(area_id):
     try:
-        current_area = area.query.options(
-            joinedload(area.coordinates),
-            joinedload(area.images)
-        ).filter_by(Area_ID=area_id).first()
+        try:
+            detail = get_detail_level()
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        current_area = area.query.options(*area_loader_options(detail)).filter_by(Area_ID=area_id).first()
 
         if not current_area:
             return jsonify({"message": "Area not found."}), 404
         
-        result = area_schema.dump(current_area)
+        result = area_serializers_by_detail[detail](current_area)
         return jsonify({"area": result}), 200
 
     except Exception as e:
@@ -389,6 +766,118 @@ def get_area_details(area_id):
         return jsonify({"message": "An error occurred while fetching area details.", "error": str(e)}), 500
 
 
+def image_extension(mime_type, filename=None):
+    if mime_type and '/' in mime_type:
+        return "." + mime_type.split('/')[-1]
+    return os.path.splitext(filename or '')[1] or ".jpg"
+
+
+def decode_base64_photo(base64_data):
+    if base64_data.startswith('data:') and ',' in base64_data:
+        base64_data = base64_data.split(',', 1)[1]
+    return base64.b64decode(base64_data)
+
+
+def add_batch_image(new_area, seen_hashes, blob):
+    if blob.SHA256 not in seen_hashes:
+        seen_hashes.add(blob.SHA256)
+        new_area.images.append(areaImages(Filepath=blob.Filepath, Blob_SHA256=blob.SHA256))
+
+
+@app.route('/areas/batch', methods=['POST'])
+@jwt_required()
+def submit_area_batch():
+    """
+    Submits several areas in one request, e.g. surveys queued while offline.
+
+    The body is {"areas": [...]} (or a bare list) of POST /area payloads. As
+    multipart, that JSON goes in a 'payload' part and photos for item i are
+    streamed as 'photos.<i>' file parts. Every item is validated before
+    anything is written; valid items are then inserted in one transaction
+    with a savepoint each, so one failing item does not undo the others.
+    Returns per-item results in request order.
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        if request.mimetype == 'multipart/form-data':
+            try:
+                data = json.loads(request.form.get('payload') or 'null')
+            except ValueError:
+                return jsonify({"message": "Invalid JSON in 'payload' form field"}), 400
+        else:
+            data = request.get_json(silent=True)
+
+        items = data.get('areas') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({"message": "Expected a non-empty list of areas."}), 400
+        if len(items) > app.config['AREA_BATCH_MAX_ITEMS']:
+            return jsonify({"message": f"At most {app.config['AREA_BATCH_MAX_ITEMS']} areas per batch."}), 400
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {"index": index, "status": 400, "message": "Each area must be a JSON object."}
+                continue
+            try:
+                if int(item.get('user_id')) != current_user_id:
+                    results[index] = {"index": index, "status": 403, "message": "User ID in payload does not match authenticated user."}
+                    continue
+            except (TypeError, ValueError):
+                results[index] = {"index": index, "status": 400, "message": "'user_id' in payload must be an integer."}
+                continue
+            try:
+                valid.append((index, item, validate_area(item)))
+            except ImportRowError as e:
+                results[index] = {"index": index, "status": 400, "message": str(e)}
+
+        all_metrics = compute_metrics([pack_boundary(values['vertices']) for _, _, values in valid])
+        created = []
+        for (index, item, values), metrics in zip(valid, all_metrics):
+            try:
+                with db.session.begin_nested():
+                    new_area = build_area(current_user_id, values, metrics, app.config['AREA_COORDINATES_LEGACY_WRITES'])
+                    seen_hashes = set()
+                    for photo_item in item.get('photos') or []:
+                        if isinstance(photo_item, dict) and photo_item.get('base64'):
+                            add_batch_image(new_area, seen_hashes, image_store.store_bytes(
+                                db.session, decode_base64_photo(photo_item['base64']), image_extension(photo_item.get('mimeType'))
+                            ))
+                    for photo_file in request.files.getlist(f'photos.{index}'):
+                        if photo_file.stream.size and photo_file.stream.sha256 not in seen_hashes:
+                            add_batch_image(new_area, seen_hashes, image_store.store_staged(
+                                db.session, photo_file.stream, image_extension(photo_file.mimetype, photo_file.filename)
+                            ))
+                    db.session.add(new_area)
+                    db.session.flush()
+                results[index] = {"index": index, "status": 201, "area": serialize_area(new_area)}
+                created.append(new_area)
+            except Exception as e:
+                app.logger.error(f"Error submitting batch item {index} for user {current_user_id}: {e}")
+                results[index] = {"index": index, "status": 500, "message": "An error occurred while submitting the area.", "error": str(e)}
+
+        area_index = [(new_area.Area_ID, (new_area.Min_Latitude, new_area.Min_Longitude, new_area.Max_Latitude, new_area.Max_Longitude))
+                      for new_area in created]
+        image_ids = [image.Image_ID for new_area in created for image in new_area.images]
+        db.session.commit()
+        index_imported_areas(area_index)
+        image_pipeline.enqueue(image_ids)
+
+        all_created = len(created) == len(items)
+        return jsonify({
+            "message": f"{len(created)} of {len(items)} areas submitted.",
+            "results": results,
+        }), 201 if all_created else 207
+
+    except RequestEntityTooLarge as e:
+        db.session.rollback()
+        return jsonify({"message": e.description}), 413
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error submitting area batch: {e}")
+        return jsonify({"message": "An error occurred while submitting the areas.", "error": str(e)}), 500
+
+
 @app.route('/area', methods=['POST'])
 @jwt_required()
 def submitArea():
@@ -399,7 +888,16 @@ def submitArea():
         except Exception as e:
             print(f"Error converting JWT identity to int: {e}")
             return jsonify({'error': 'Invalid user id in token'}), 400
-        data = request.get_json()
+        uploaded_photos = []
+        if request.mimetype == 'multipart/form-data':
+            # Same fields as the JSON body in a 'payload' part, photos as 'photos' file parts.
+            try:
+                data = json.loads(request.form.get('payload') or 'null')
+            except ValueError:
+                return jsonify({"message": "Invalid JSON in 'payload' form field"}), 400
+            uploaded_photos = request.files.getlist('photos')
+        else:
+            data = request.get_json()
 
         if not data:
             return jsonify({"message": "Invalid JSON data"}), 400
@@ -413,7 +911,7 @@ def submitArea():
         photos_data = data.get('photos', [])
 
         # print(f"Received photos_data: {photos_data}")
-        print(f"Number of photos received: {len(photos_data)}")
+        print(f"Number of photos received: {len(photos_data) + len(uploaded_photos)}")
 
         payload_user_id = data.get('user_id')
         if payload_user_id is None:
@@ -458,6 +956,7 @@ def submitArea():
             db.session.rollback()
             return jsonify({"message": "At least one coordinate is required for an area"}), 400
 
+        vertices = []
         for coord_item in coordinates_data:
             latitude = coord_item.get('latitude')
             longitude = coord_item.get('longitude')
@@ -473,19 +972,32 @@ def submitArea():
                 db.session.rollback()
                 return jsonify({"message": "Invalid coordinate data: latitude and longitude must be numbers"}), 400
             
-            new_coordinate = areaCoordinates(
-                Area_ID=new_area.Area_ID,
-                Latitude=latitude,
-                Longitude=longitude
-            )
-            db.session.add(new_coordinate)
-        
-        sanitized_area_name = secure_filename(name_data.lower().replace(" ", "_"))
-        area_upload_dir = os.path.join(app.root_path, app.config['BASE_UPLOAD_DIR'], sanitized_area_name)
+            vertices.append((latitude, longitude))
+
+        new_area.Boundary = pack_boundary(vertices)
+        simplified = simplified_boundaries(vertices)
+        new_area.Boundary_Low = simplified['low']
+        new_area.Boundary_Medium = simplified['medium']
+        metrics = compute_metrics([new_area.Boundary])[0]
+        for column_name in METRIC_COLUMNS:
+            setattr(new_area, column_name, metrics[column_name])
+        area_bbox = (metrics['Min_Latitude'], metrics['Min_Longitude'], metrics['Max_Latitude'], metrics['Max_Longitude'])
+
+        if app.config['AREA_COORDINATES_LEGACY_WRITES']:
+            db.session.add_all([
+                areaCoordinates(Area_ID=new_area.Area_ID, Latitude=latitude, Longitude=longitude)
+                for latitude, longitude in vertices
+            ])
         
-        print(f"Attempting to create directory: {area_upload_dir}")
-        os.makedirs(area_upload_dir, exist_ok=True)
+        seen_hashes = set()
 
+        def add_area_image(blob):
+            if blob.SHA256 in seen_hashes:
+                print(f"Skipping duplicate photo {blob.SHA256} for area {new_area.Area_ID}.")
+                return
+            seen_hashes.add(blob.SHA256)
+            db.session.add(areaImages(Area_ID=new_area.Area_ID, Filepath=blob.Filepath, Blob_SHA256=blob.SHA256))
+            print(f"Added image entry to DB for {new_area.Area_ID}: {blob.Filepath}")
 
         for photo_item in photos_data:
             print(f"Processing photo_item: {photo_item.keys()}")
@@ -506,33 +1018,21 @@ def submitArea():
                 # If the data comes without the prefix, this line will work correctly.
                 image_binary = base64.b64decode(base64_data)
 
-                extension = ""
-                if mime_type and '/' in mime_type:
-                    extension = "." + mime_type.split('/')[-1]
-                else:
-                    extension = ".jpg"
-
-                unique_filename = secure_filename(f"{datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')}_{uuid.uuid4().hex}{extension}")
-                
-                file_path_on_server = os.path.join(area_upload_dir, unique_filename)
-
-                print(f"Saving image to: {file_path_on_server}")
-                with open(file_path_on_server, 'wb') as f:
-                    f.write(image_binary)
-
-                relative_url = f"/{app.config['BASE_UPLOAD_DIR']}/{sanitized_area_name}/{unique_filename}"
-                
-                new_image = areaImages(
-                    Area_ID=new_area.Area_ID,
-                    Filepath=relative_url
-                )
-                db.session.add(new_image)
-                print(f"Added image entry to DB for {new_area.Area_ID}: {relative_url}")
+                add_area_image(image_store.store_bytes(db.session, image_binary, image_extension(mime_type)))
 
             except Exception as img_e:
                 app.logger.error(f"Error processing and saving image for area {new_area.Area_ID}: {img_e}")
                 print(f"Detailed image saving error: {img_e}")
                 continue
+
+        for photo_file in uploaded_photos:
+            staged = photo_file.stream
+            if staged.size == 0 or staged.sha256 in seen_hashes:
+                print(f"Skipping empty or duplicate uploaded photo: {photo_file.filename}")
+                continue
+            add_area_image(image_store.store_staged(
+                db.session, staged, image_extension(photo_file.mimetype, photo_file.filename)
+            ))
         
         slope_data = data.get('slope')
         masl_data = data.get('masl')
@@ -557,19 +1057,153 @@ def submitArea():
         db.session.add(new_farm_data)
 
         db.session.commit()
+        area_grid.insert(new_area.Area_ID, area_bbox)
+        image_pipeline.enqueue([image.Image_ID for image in new_area.images])
 
-        result = area_schema.dump(new_area)
+        result = serialize_area(new_area)
         return jsonify({
             "message": "Area submitted successfully!",
             "area": result
         }), 201
 
+    except RequestEntityTooLarge as e:
+        db.session.rollback()
+        return jsonify({"message": e.description}), 413
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error submitting area for user {current_user_id}: {e}")
         print(f"Overall submission error: {e}")
         return jsonify({"message": "An error occurred while submitting the area.", "error": str(e)}), 500
     
+def get_upload_session(upload_id, current_user_id):
+    meta = upload_store.load(upload_id)
+    if meta['user_id'] != current_user_id:
+        raise UploadSessionError("Unknown upload session.")
+    return meta
+
+
+@app.route('/uploads', methods=['POST'])
+@jwt_required()
+def create_upload_session():
+    """
+    Starts a resumable photo upload for an existing area. The client then
+    PUTs numbered chunks and can ask which ones are still missing after a
+    dropped connection.
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        data = request.get_json()
+        if not data:
+            return jsonify({"message": "Invalid JSON data"}), 400
+
+        try:
+            area_id = int(data.get('area_id'))
+            total_size = int(data.get('total_size'))
+        except (TypeError, ValueError):
+            return jsonify({"message": "'area_id' and 'total_size' must be integers."}), 400
+
+        if not 0 < total_size <= app.config['MAX_IMAGE_UPLOAD_BYTES']:
+            return jsonify({"message": f"'total_size' must be between 1 and {app.config['MAX_IMAGE_UPLOAD_BYTES']} bytes."}), 400
+
+        target_area = db.session.get(area, area_id)
+        if not target_area:
+            return jsonify({"message": "Area not found."}), 404
+        if target_area.User_ID != current_user_id:
+            return jsonify({"message": "You can only upload photos to your own areas."}), 403
+
+        existing_blob = image_store.get(db.session, data.get('sha256'))
+        if existing_blob:
+            # Already stored: link it without transferring any bytes.
+            new_image = areaImages(Area_ID=area_id, Filepath=existing_blob.Filepath, Blob_SHA256=existing_blob.SHA256)
+            db.session.add(new_image)
+            db.session.commit()
+            image_pipeline.enqueue([new_image.Image_ID])
+            return jsonify({"message": "Upload completed.", "complete": True, "image": serialize_image(new_image)}), 201
+
+        upload_store.collect_garbage(app.config['UPLOAD_SESSION_TTL_SECONDS'])
+        meta = upload_store.create(
+            user_id=current_user_id,
+            area_id=area_id,
+            total_size=total_size,
+            mime_type=data.get('mime_type'),
+            filename=data.get('filename'),
+            sha256=data.get('sha256'),
+        )
+        return jsonify({"complete": False, **upload_store.status(meta)}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error creating upload session: {e}")
+        return jsonify({"message": "An error occurred while creating the upload session.", "error": str(e)}), 500
+
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+@jwt_required()
+def get_upload_session_status(upload_id):
+    try:
+        meta = get_upload_session(upload_id, int(get_jwt_identity()))
+        return jsonify(upload_store.status(meta)), 200
+    except UploadSessionError as e:
+        return jsonify({"message": str(e)}), 404
+
+
+@app.route('/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+@jwt_required()
+def put_upload_chunk(upload_id, index):
+    try:
+        meta = get_upload_session(upload_id, int(get_jwt_identity()))
+    except UploadSessionError as e:
+        return jsonify({"message": str(e)}), 404
+
+    try:
+        upload_store.write_chunk(meta, index, request.stream)
+        return jsonify(upload_store.status(meta)), 200
+    except UploadSessionError as e:
+        return jsonify({"message": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error writing chunk {index} of upload {upload_id}: {e}")
+        return jsonify({"message": "An error occurred while storing the chunk.", "error": str(e)}), 500
+
+
+@app.route('/uploads/<upload_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_upload_session(upload_id):
+    try:
+        meta = get_upload_session(upload_id, int(get_jwt_identity()))
+    except UploadSessionError as e:
+        return jsonify({"message": str(e)}), 404
+
+    assembled_path = os.path.join(upload_store.root, f"{upload_id}.assembled")
+    try:
+        target_area = db.session.get(area, meta['area_id'])
+        if not target_area:
+            upload_store.delete(upload_id)
+            return jsonify({"message": "Area not found."}), 404
+
+        sha256 = upload_store.assemble(meta, assembled_path)
+        blob = image_store.store_file(
+            db.session, assembled_path, sha256, meta['total_size'],
+            image_extension(meta.get('mime_type'), meta.get('filename'))
+        )
+
+        new_image = areaImages(Area_ID=target_area.Area_ID, Filepath=blob.Filepath, Blob_SHA256=blob.SHA256)
+        db.session.add(new_image)
+        db.session.commit()
+        upload_store.delete(upload_id)
+        image_pipeline.enqueue([new_image.Image_ID])
+
+        return jsonify({"message": "Upload completed.", "image": serialize_image(new_image)}), 201
+
+    except UploadSessionError as e:
+        return jsonify({"message": str(e), **upload_store.status(meta)}), 409
+    except Exception as e:
+        db.session.rollback()
+        if os.path.exists(assembled_path):
+            os.remove(assembled_path)
+        app.logger.error(f"Error completing upload {upload_id}: {e}")
+        return jsonify({"message": "An error occurred while completing the upload.", "error": str(e)}), 500
+
+
 @app.route('/area/farm_harvest', methods=['POST'])
 @jwt_required()
 def submitFarmHarvestData():
@@ -630,25 +1264,22 @@ def submitFarmHarvestData():
 
     
 @app.route('/area/farm_harvest/area_id=<int:area_id>', methods=['GET'])
+@compression(min_size=512)
 @jwt_required()
+@query_budget(max_statements=1)
 def getFarmHarvestsByAreaId(area_id):
     try:
-        # 1. LOOKUP: Find the correct Farm_ID using the incoming Area_ID
-        # (This is the same logic used in the POST route)
-        area_record = areaFarm.query.filter_by(Area_ID=area_id).first()
+        # 1. LOOKUP + QUERY: Resolve the area's Farm_ID (same rule as the POST
+        # route) and fetch its harvest rows in a single statement
+        farm_id_fk, harvest_records = harvests_for_area(db.session, area_id)
 
-        if not area_record:
+        if farm_id_fk is None:
             return jsonify({"message": f"Area ID {area_id} not found."}), 404
 
-        farm_id_fk = area_record.Farm_ID
-
-        # 2. QUERY: Get all harvest records linked to this Farm_ID
-        harvest_records = farmHarvestData.query.filter_by(Farm_ID=farm_id_fk).all()
-
         if not harvest_records:
             return jsonify({"message": f"No harvest data found for Farm ID {farm_id_fk}.", "harvests": []}), 200
 
-        # 3. SERIALIZE: Convert the list of SQLAlchemy objects to a list of dictionaries
+        # 2. SERIALIZE: Convert the harvest rows to a list of dictionaries
         harvests_list = []
         for record in harvest_records:
             harvests_list.append({
@@ -669,11 +1300,13 @@ def getFarmHarvestsByAreaId(area_id):
 
 
 @app.route('/area/farm_harvest/farm_id=<int:farm_id>', methods=['GET'])
+@compression(min_size=512)
 @jwt_required()
+@query_budget(max_statements=1)
 def getFarmHarvestByArea(farm_id):
     try:
-        harvest_entries = farmHarvestData.query.filter_by(Farm_ID=farm_id).all()
-        serialized_entries = [entry.to_dict() for entry in harvest_entries]
+        harvest_entries = harvests_for_farm(db.session, farm_id)
+        serialized_entries = [harvest_to_dict(entry) for entry in harvest_entries]
         return jsonify({"harvests": serialized_entries}), 200
     except Exception as e:
         app.logger.error(f"Error fetching farm harvest data for Area ID {farm_id}: {e}")
@@ -684,30 +1317,21 @@ def getFarmHarvestByArea(farm_id):
 @jwt_required()
 def getOngoingCropCountByArea(area_id):
     try:
-        # Step 1: Get the Farm_ID corresponding to the Area_ID
-        area_entry = areaFarm.query.filter_by(Area_ID=area_id).first()
+        # Step 1: Get the Farm_ID for the Area_ID and its 'Ongoing' harvests in one statement
+        farm_id, ongoing_batches = harvests_for_area(db.session, area_id, status='Ongoing')
 
-        if not area_entry:
+        if farm_id is None:
             return jsonify({
                 "message": f"Area ID {area_id} not found.",
                 "count": 0
             }), 200
 
-        farm_id = area_entry.Farm_ID
-
-        # Step 2: Query farmHarvestData using the retrieved Farm_ID and the 'Ongoing' status
-        ongoing_batches = farmHarvestData.query.filter(
-            farmHarvestData.Farm_ID == farm_id,
-            farmHarvestData.Status == 'Ongoing',
-        ).all()
-        
-        # Step 3: Calculate count and serialize the data
+        # Step 2: Calculate count and serialize the data
         count = len(ongoing_batches)
         
-        # NOTE: Ensure that 'batch.to_dict()' is defined on your 'farmHarvestData' model
-        serialized_data = [batch.to_dict() for batch in ongoing_batches]
+        serialized_data = [harvest_to_dict(batch) for batch in ongoing_batches]
         
-        # Step 4: Return the result
+        # Step 3: Return the result
         return jsonify({
             "ongoing_crops_data": serialized_data,
             "count": count
@@ -739,7 +1363,278 @@ def getOngoingCropCountByArea(area_id):
 #         "headers": dict(request.headers),
 #     }), 404
 
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Re-tokenizes every area into the area_search_term index."""
+    total = rebuild_search_index(db.session)
+    db.session.commit()
+    print(f"Search index rebuilt for {total} areas.")
+
+@app.cli.command('process-images')
+def process_images_command():
+    """Generates renditions for every photo the image pipeline has not handled yet."""
+    pending = db.session.query(areaImages.Image_ID).filter(
+        or_(areaImages.Processing_Status.is_(None), areaImages.Processing_Status == 'Pending')
+    ).all()
+    for (image_id,) in pending:
+        image_pipeline.process(image_id)
+    print(f"Processed {len(pending)} images.")
+
+@app.cli.command('dedupe-images')
+def dedupe_images_command():
+    """Moves photos saved before the content-addressed store into it, merging duplicates."""
+    moved = 0
+    legacy_images = areaImages.query.filter(areaImages.Blob_SHA256.is_(None)).all()
+    for image in legacy_images:
+        source_path = os.path.join(app.root_path, image.Filepath.lstrip('/'))
+        if not os.path.exists(source_path):
+            continue
+        for rendition_path in rendition_paths(source_path).values():
+            if os.path.exists(rendition_path):
+                os.remove(rendition_path)
+        blob = image_store.store_file(
+            db.session, source_path, hash_file(source_path), os.path.getsize(source_path),
+            os.path.splitext(source_path)[1]
+        )
+        db.session.flush()
+        image.Filepath = blob.Filepath
+        image.Blob_SHA256 = blob.SHA256
+        image.Thumbnail_Path = image.Medium_Path = None
+        image.Processing_Status = 'Pending'
+        db.session.execute(update(imageBlob).where(imageBlob.SHA256 == blob.SHA256).values(Ref_Count=imageBlob.Ref_Count + 1))
+        db.session.commit()
+        moved += 1
+    print(f"Moved {moved} images into the content-addressed store. Run 'flask process-images' to rebuild renditions.")
+
+@app.cli.command('strip-image-metadata')
+def strip_image_metadata_command():
+    """Re-stores photos that were saved with their EXIF/XMP metadata still in place."""
+    restripped = 0
+    for sha256 in db.session.scalars(select(imageBlob.SHA256)).all():
+        blob = db.session.get(imageBlob, sha256)
+        image_ids = image_store.restrip(db.session, blob) if blob else []
+        db.session.commit()
+        for image_id in image_ids:
+            image_pipeline.process(image_id)
+        restripped += bool(image_ids)
+    print(f"Stripped metadata from {restripped} stored photos.")
+
+@app.cli.command('gc-uploads')
+def gc_uploads_command():
+    """Removes resumable upload sessions that have been idle past their TTL."""
+    removed = upload_store.collect_garbage(app.config['UPLOAD_SESSION_TTL_SECONDS'])
+    print(f"Removed {removed} abandoned upload sessions.")
+
+@app.cli.command('check-serializers')
+@click.option('--limit', default=500, help='Number of areas to dump.')
+@click.option('--rounds', default=5, help='Timed repetitions per serializer.')
+def check_serializers_command(limit, rounds):
+    """Compares fast serializer output and speed with the marshmallow schemas."""
+    mismatches = 0
+    for detail in DETAIL_LEVELS:
+        entries = area.query.options(*area_loader_options(detail)).order_by(area.Area_ID).limit(limit).all()
+        schema = area_schemas_by_detail[detail]
+        serialize_many = areas_serializers_by_detail[detail]
+
+        for entry in entries:
+            expected = app.json.dumps(schema.dump(entry))
+            actual = app.json.dumps(area_serializers_by_detail[detail](entry))
+            if expected != actual:
+                mismatches += 1
+                print(f"Mismatch for area {entry.Area_ID} at detail '{detail}'")
+
+        timings = {}
+        for name, dump in (('marshmallow', lambda: schema.dump(entries, many=True)), ('fast', lambda: serialize_many(entries))):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                dump()
+            timings[name] = (time.perf_counter() - started) / rounds
+        speedup = timings['marshmallow'] / timings['fast'] if timings['fast'] else float('inf')
+        print(f"{detail}: {len(entries)} areas, marshmallow {timings['marshmallow'] * 1000:.1f} ms, "
+              f"fast {timings['fast'] * 1000:.1f} ms ({speedup:.1f}x)")
+
+    if mismatches:
+        raise click.ClickException(f"{mismatches} serializer mismatches.")
+    print("Serializer output matches marshmallow.")
+
+def print_import_report(report):
+    for error in report.errors:
+        print(f"Row {error['row']}: {error['message']}")
+    if report.failed > len(report.errors):
+        print(f"... {report.failed - len(report.errors)} more errors not shown.")
+    print(f"Imported {report.imported} rows, {report.failed} failed.")
+
+
+@app.cli.command('import-areas')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user-id', required=True, type=int, help='Owner of the imported areas.')
+@click.option('--format', 'import_format', type=click.Choice(['csv', 'geojson', 'ndjson']), help='Defaults to the file extension.')
+@click.option('--chunk-size', type=int, help='Areas per transaction.')
+def import_areas_command(path, user_id, import_format, chunk_size):
+    """Imports areas from a CSV, GeoJSON or NDJSON file."""
+    if not db.session.get(users, user_id):
+        raise click.ClickException(f"User {user_id} does not exist.")
+    import_format = detect_format(import_format, path)
+    with open(path, 'rb') as f:
+        report = import_areas(
+            db.session, iter_records(text_stream(f), import_format), user_id,
+            chunk_size=chunk_size or app.config['IMPORT_CHUNK_SIZE'],
+            legacy_coordinates=app.config['AREA_COORDINATES_LEGACY_WRITES'],
+            on_committed=index_imported_areas,
+        )
+    print_import_report(report)
+
+
+@app.cli.command('import-harvests')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'import_format', type=click.Choice(['csv', 'geojson', 'ndjson']), help='Defaults to the file extension.')
+@click.option('--chunk-size', type=int, help='Harvest rows per transaction.')
+def import_harvests_command(path, import_format, chunk_size):
+    """Imports harvest rows from a CSV, GeoJSON or NDJSON file."""
+    import_format = detect_format(import_format, path)
+    with open(path, 'rb') as f:
+        report = import_harvests(
+            db.session, iter_records(text_stream(f), import_format),
+            chunk_size=chunk_size or app.config['IMPORT_CHUNK_SIZE'] * 4,
+        )
+    print_import_report(report)
+
+@app.cli.command('prune-change-log')
+def prune_change_log_command():
+    removed = prune_change_log(db.session, app.config['SYNC_TOMBSTONE_TTL_DAYS'])
+    db.session.commit()
+    print(f"Removed {removed} change log entries.")
+
+@app.cli.command('prune-revoked-tokens')
+def prune_revoked_tokens_command():
+    removed = revocation_store.prune(db.session)
+    db.session.commit()
+    print(f"Removed {removed} expired token revocations.")
+
+@app.cli.command('benchmark-compression')
+@click.option('--rounds', default=20, help='Timed compressions per endpoint and encoding.')
+def benchmark_compression_command(rounds):
+    """Reports bytes on the wire and compression CPU time per endpoint."""
+    sample_area = db.session.query(area.Area_ID).order_by(area.Area_ID).first()
+    sample_farm = db.session.query(areaFarm.Farm_ID, areaFarm.Area_ID).order_by(areaFarm.Farm_ID).first()
+    sample_user = db.session.query(users.User_ID).first()
+    if not sample_area or not sample_user:
+        raise click.ClickException("Need at least one user and one area to benchmark.")
+
+    endpoints = ['/areas?per_page=50', '/areas?per_page=50&detail=low', '/areas_approved?per_page=50',
+                 f'/area/{sample_area.Area_ID}']
+    if sample_farm:
+        endpoints += [f'/area/farm_harvest/area_id={sample_farm.Area_ID}', f'/area/farm_harvest/farm_id={sample_farm.Farm_ID}']
+
+    headers = {'Authorization': f"Bearer {create_access_token(identity=str(sample_user.User_ID))}",
+               'Accept-Encoding': 'identity'}
+    client = app.test_client()
+    for endpoint in endpoints:
+        body = client.get(endpoint, headers=headers).get_data()
+        report = [f"identity {len(body)} B"]
+        for encoding in supported_encodings():
+            started = time.perf_counter()
+            for _ in range(rounds):
+                compressed = compress_bytes(body, encoding)
+            elapsed = (time.perf_counter() - started) / rounds
+            ratio = len(compressed) / len(body) if body else 0
+            report.append(f"{encoding} {len(compressed)} B ({ratio:.0%}) {elapsed * 1000:.2f} ms")
+        print(f"{endpoint}: " + ", ".join(report))
+
+@app.cli.command('benchmark-login')
+@click.option('--email', required=True, help='Account to log in with.')
+@click.option('--password', required=True, prompt=True, hide_input=True)
+@click.option('--login-threads', default=16, help='Concurrent clients logging in.')
+@click.option('--read-threads', default=4, help='Concurrent clients reading /areas.')
+@click.option('--duration', default=10.0, help='Seconds to run.')
+def benchmark_login_command(email, password, login_threads, read_threads, duration):
+    """Measures login throughput and /areas latency while both run together."""
+    user = find_user_by_email(email)
+    if not user:
+        raise click.ClickException(f"No user with email {email}.")
+    read_headers = {'Authorization': f"Bearer {create_access_token(identity=str(user.User_ID))}"}
+    db.session.remove()
+
+    deadline = time.perf_counter() + duration
+    results = {'login': [], 'busy': 0, 'failed': 0, 'read': []}
+    results_lock = threading.Lock()
+
+    def log_in():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = client.post('/auth/login', json={'email': email, 'password': password}).status_code
+            with results_lock:
+                if status == 200:
+                    results['login'].append(time.perf_counter() - started)
+                elif status == 503:
+                    results['busy'] += 1
+                else:
+                    results['failed'] += 1
+
+    def read_areas():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get('/areas?per_page=10', headers=read_headers)
+            with results_lock:
+                results['read'].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=log_in) for _ in range(login_threads)]
+    threads += [threading.Thread(target=read_areas) for _ in range(read_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def percentile(samples, fraction):
+        samples = sorted(samples)
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000 if samples else float('nan')
+
+    print(f"bcrypt cost {app.config['BCRYPT_LOG_ROUNDS']}, {password_hasher.workers} hash workers")
+    print(f"logins: {len(results['login']) / duration:.1f}/s, p50 {percentile(results['login'], 0.5):.0f} ms, "
+          f"p95 {percentile(results['login'], 0.95):.0f} ms, {results['busy']} busy (503), {results['failed']} failed")
+    print(f"/areas: {len(results['read']) / duration:.1f}/s, p50 {percentile(results['read'], 0.5):.1f} ms, "
+          f"p95 {percentile(results['read'], 0.95):.1f} ms")
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """EXPLAINs the hot read queries and fails if any reads a table in full."""
+    scanned = 0
+    for name, (plan, tables) in check_hot_queries(db.session.connection()).items():
+        print(f"{name}: {'FULL SCAN of ' + ', '.join(tables) if tables else 'ok'}")
+        for row in plan:
+            print(f"    {tuple(row)}")
+        scanned += bool(tables)
+    if scanned:
+        raise click.ClickException(f"{scanned} hot queries fall back to a full table scan.")
+
+@app.cli.command('check-approval-status')
+@click.option('--fix', is_flag=True, help='Recompute the cached status of mismatched areas.')
+@click.option('--limit', default=100, help='Mismatches to list.')
+def check_approval_status_command(fix, limit):
+    """Compares area.Approval_Status with each area's latest approval row."""
+    mismatches = approval_status_mismatches(db.session)
+    for row in mismatches[:limit]:
+        print(f"Area {row.Area_ID}: cached {row.Approval_Status!r}, latest approval {row.Expected_Status!r}")
+    if not mismatches:
+        print("Approval status is consistent.")
+        return
+    if not fix:
+        raise click.ClickException(f"{len(mismatches)} areas have a stale approval status; rerun with --fix.")
+    updated = refresh_approval_status(db.session.connection(), [row.Area_ID for row in mismatches])
+    db.session.commit()
+    print(f"Fixed the approval status of {updated} areas.")
+
+@app.cli.command('backfill-geometry-metrics')
+def backfill_geometry_metrics_command():
+    """Recomputes centroid, bounding box, perimeter and hectares for every area."""
+    total = backfill_geometry_metrics(db.session.connection())
+    db.session.commit()
+    print(f"Geometry metrics computed for {total} areas.")
+
 with app.app_context():
+    check_trigger_support(db.engine.dialect.name)
     print("Ensuring database tables exist...")
     db.create_all()
     print("Database table check complete.")
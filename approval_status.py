@@ -0,0 +1,93 @@
+from sqlalchemy import event, select, update
+
+from Database import area, areaApproval
+from triggers import create_trigger, local_now
+
+IN_CHUNK_SIZE = 1000
+
+# Approvals are also written by admin tooling and plain SQL, so the cached
+# status is maintained by triggers on area_approval rather than in the ORM.
+# Touching updated_at also fires area's own triggers, so the change reaches
+# the sync log and the area cache as an area update.
+_REFRESH_AREAS = (
+    "UPDATE area SET Approval_Status = ("
+    "SELECT Status FROM area_approval WHERE area_approval.Area_ID = area.Area_ID "
+    "ORDER BY Approval_ID DESC LIMIT 1"
+    "), updated_at = {now} WHERE Area_ID IN ({area_ids})"
+)
+# Trigger name -> (event, affected Area_IDs); an update may move an approval.
+APPROVAL_STATUS_TRIGGERS = {
+    'area_approval_status_insert': ('INSERT', 'NEW.Area_ID'),
+    'area_approval_status_update': ('UPDATE', 'OLD.Area_ID, NEW.Area_ID'),
+    'area_approval_status_delete': ('DELETE', 'OLD.Area_ID'),
+}
+
+
+def latest_approval_status():
+    """
+    The status of an area's most recent approval row, correlated to area.
+    This is what area.Approval_Status caches.
+    """
+    return (
+        select(areaApproval.Status)
+        .where(areaApproval.Area_ID == area.Area_ID)
+        .order_by(areaApproval.Approval_ID.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def approval_status_trigger_ddl(dialect_name):
+    """
+    DROP/CREATE statements for the area_approval triggers on MySQL or
+    SQLite. On MySQL with binary logging, creating them needs the TRIGGER
+    privilege and log_bin_trust_function_creators (or SUPER).
+    """
+    statements = []
+    for name, (operation, area_ids) in APPROVAL_STATUS_TRIGGERS.items():
+        refresh = _REFRESH_AREAS.format(now=local_now(dialect_name), area_ids=area_ids)
+        statements.append(f"DROP TRIGGER IF EXISTS {name}")
+        statements.append(create_trigger(dialect_name, name, operation, 'area_approval', refresh))
+    return statements
+
+
+@event.listens_for(areaApproval.__table__, 'after_create')
+def _create_approval_status_triggers(table, connection, **kwargs):
+    # Tables made by create_all get the same triggers as migrated ones.
+    for statement in approval_status_trigger_ddl(connection.dialect.name):
+        connection.exec_driver_sql(statement)
+
+
+def refresh_approval_status(connection, area_ids=None):
+    """
+    Recomputes area.Approval_Status for area_ids, or for every area.
+    Returns the number of areas updated.
+    """
+    if area_ids is None:
+        return connection.execute(update(area.__table__).values(Approval_Status=latest_approval_status())).rowcount
+    area_ids = sorted(area_ids)
+    updated = 0
+    for start in range(0, len(area_ids), IN_CHUNK_SIZE):
+        updated += connection.execute(
+            update(area.__table__)
+            .where(area.Area_ID.in_(area_ids[start:start + IN_CHUNK_SIZE]))
+            .values(Approval_Status=latest_approval_status())
+        ).rowcount
+    return updated
+
+
+def approval_status_mismatches(session, limit=None):
+    """
+    Returns (Area_ID, Approval_Status, expected status) rows for areas whose
+    cached status disagrees with their latest approval row, e.g. because
+    the triggers were dropped or disabled for a bulk load.
+    """
+    expected = latest_approval_status()
+    statement = (
+        select(area.Area_ID, area.Approval_Status, expected.label('Expected_Status'))
+        .where(area.Approval_Status.is_distinct_from(expected))
+        .order_by(area.Area_ID)
+    )
+    if limit is not None:
+        statement = statement.limit(limit)
+    return session.execute(statement).all()
@@ -0,0 +1,452 @@
+import csv
+import datetime
+import io
+import json
+import os
+from sqlalchemy import func, insert, select
+
+from Database import area, areaApproval, areaCoordinates, areaFarm, areaTopography, farmHarvestData
+from geometry import pack_boundary, simplified_boundaries
+from geometry_metrics import compute_metrics, METRIC_COLUMNS
+
+IMPORT_FORMATS = ('csv', 'geojson', 'ndjson')
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+_EXTENSIONS = {'.csv': 'csv', '.geojson': 'geojson', '.json': 'geojson', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+_MIMETYPES = {'text/csv': 'csv', 'application/geo+json': 'geojson', 'application/json': 'geojson',
+              'application/x-ndjson': 'ndjson', 'application/jsonl': 'ndjson'}
+
+# Export property names (see export.py) accepted as aliases, so an export
+# can be re-imported as is.
+_AREA_ALIASES = {'area_name': 'name', 'mean_average_sea_level': 'masl', 'soil_suitability': 'suitability'}
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+class ImportReport:
+    """
+    Running totals for one import. Only the first MAX_REPORTED_ERRORS row
+    errors are kept so a bad file cannot grow the report without bound.
+    """
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'message': str(message)})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            # Farm lookups report per chunk, after that chunk's validation errors.
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def detect_format(explicit=None, filename=None, mimetype=None):
+    if explicit:
+        if explicit not in IMPORT_FORMATS:
+            raise ValueError(f"'format' must be one of: {', '.join(IMPORT_FORMATS)}")
+        return explicit
+    extension = os.path.splitext(filename or '')[1].lower()
+    detected = _EXTENSIONS.get(extension) or _MIMETYPES.get(mimetype or '')
+    if not detected:
+        raise ValueError(f"Cannot tell the import format; pass 'format' as one of: {', '.join(IMPORT_FORMATS)}")
+    return detected
+
+
+def text_stream(binary_stream):
+    if not isinstance(binary_stream, io.BufferedIOBase):
+        binary_stream = io.BufferedReader(binary_stream)
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+
+def _position(position):
+    if not isinstance(position, (list, tuple)) or len(position) < 2:
+        raise ImportRowError("Each GeoJSON position must be a [longitude, latitude] array")
+    return {'longitude': position[0], 'latitude': position[1]}
+
+
+def _feature_record(feature):
+    """
+    Flattens a GeoJSON Feature into the same shape as a POST /area body.
+    Raises ImportRowError for a malformed geometry.
+    """
+    properties = feature.get('properties') or {}
+    geometry = feature.get('geometry') or {}
+    if not isinstance(properties, dict) or not isinstance(geometry, dict):
+        raise ImportRowError("A feature's 'properties' and 'geometry' must be JSON objects")
+    record = dict(properties)
+    coordinates = geometry.get('coordinates')
+    positions = []
+    if geometry.get('type') == 'Polygon' and coordinates:
+        if not isinstance(coordinates, list) or not isinstance(coordinates[0], list):
+            raise ImportRowError("A Polygon's 'coordinates' must be a list of rings")
+        positions = list(coordinates[0])
+        if len(positions) > 3 and positions[0] == positions[-1]:
+            positions.pop()
+    elif geometry.get('type') == 'LineString' and coordinates:
+        if not isinstance(coordinates, list):
+            raise ImportRowError("A LineString's 'coordinates' must be a list of positions")
+        positions = coordinates
+    elif geometry.get('type') == 'Point':
+        positions = [coordinates]
+    if positions:
+        record['coordinates'] = [_position(position) for position in positions if position]
+    return record
+
+
+def _record_or_error(feature):
+    try:
+        return _feature_record(feature) if feature.get('type') == 'Feature' else feature
+    except ImportRowError as e:
+        return e
+
+
+def iter_records(stream, import_format):
+    """
+    Yields (row_number, record dict or ImportRowError) from a text stream.
+
+    CSV and NDJSON are read row by row. A GeoJSON FeatureCollection is one
+    JSON document and is parsed whole; use NDJSON (one Feature or record
+    per line) for very large files.
+    """
+    if import_format == 'csv':
+        for row_number, row in enumerate(csv.DictReader(stream), start=2):
+            yield row_number, row
+    elif import_format == 'ndjson':
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, ImportRowError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield row_number, ImportRowError("Each line must be a JSON object.")
+                continue
+            yield row_number, _record_or_error(record)
+    else:
+        try:
+            document = json.load(stream)
+        except ValueError as e:
+            yield 0, ImportRowError(f"Invalid GeoJSON: {e}")
+            return
+        features = document.get('features', []) if isinstance(document, dict) else document
+        for row_number, feature in enumerate(features, start=1):
+            if not isinstance(feature, dict):
+                yield row_number, ImportRowError("Each feature must be a JSON object.")
+                continue
+            yield row_number, _record_or_error(feature)
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _lowercase_keys(record, aliases=None):
+    # csv.DictReader files the cells of a row longer than its header under None.
+    if None in record:
+        raise ImportRowError("Row has more fields than the header")
+    aliases = aliases or {}
+    return {aliases.get(key.lower(), key.lower()): value for key, value in record.items()}
+
+
+def _required_text(record, key):
+    value = record.get(key)
+    if _blank(value):
+        raise ImportRowError(f"'{key}' is required")
+    return str(value).strip()
+
+
+def _optional_number(record, key, cast):
+    value = record.get(key)
+    if _blank(value):
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ImportRowError(f"'{key}' must be a number")
+
+
+def _parse_coordinates(value):
+    """
+    Accepts the POST /area list of {latitude, longitude} objects, its JSON
+    text (CSV cells), or 'lat lng; lat lng; ...'.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                raise ImportRowError("'coordinates' is not valid JSON")
+        else:
+            value = [dict(zip(('latitude', 'longitude'), pair.split())) for pair in value.split(';') if pair.strip()]
+    if not value:
+        raise ImportRowError("At least one coordinate is required for an area")
+    if not isinstance(value, list):
+        raise ImportRowError("'coordinates' must be a list")
+    vertices = []
+    for item in value:
+        try:
+            vertices.append((float(item['latitude']), float(item['longitude'])))
+        except (KeyError, TypeError, ValueError):
+            raise ImportRowError("Invalid coordinate data: numeric 'latitude' and 'longitude' are required")
+    return vertices
+
+
+def validate_area(record):
+    """
+    Normalizes one area record (POST /area body keys, or the export's
+    property names) into column values. Raises ImportRowError.
+    """
+    record = _lowercase_keys(record, _AREA_ALIASES)
+    # Exported features carry farm and topography rows as lists.
+    for nested_key in ('farms', 'topography'):
+        nested = record.pop(nested_key, None)
+        if isinstance(nested, list) and nested and isinstance(nested[0], dict):
+            for key, value in _lowercase_keys(nested[0], _AREA_ALIASES).items():
+                record.setdefault(key, value)
+
+    hectares = _optional_number(record, 'hectares', float)
+    if hectares is None:
+        raise ImportRowError("'hectares' is required")
+    return {
+        'name': _required_text(record, 'name'),
+        'region': _required_text(record, 'region'),
+        'province': _required_text(record, 'province'),
+        'barangay': _required_text(record, 'barangay'),
+        'organization': _required_text(record, 'organization'),
+        'vertices': _parse_coordinates(record.get('coordinates')),
+        'slope': _optional_number(record, 'slope', lambda value: int(float(value))),
+        'masl': _optional_number(record, 'masl', float),
+        'soil_type': None if _blank(record.get('soil_type')) else str(record['soil_type']),
+        'suitability': None if _blank(record.get('suitability')) else str(record['suitability']),
+        'hectares': hectares,
+    }
+
+
+def _new_area(owner_id, values, metrics):
+    vertices = values['vertices']
+    simplified = simplified_boundaries(vertices)
+    return area(
+        User_ID=owner_id,
+        Area_Name=values['name'],
+        Region=values['region'],
+        Province=values['province'],
+        Barangay=values['barangay'],
+        Organization=values['organization'],
+        created_at=datetime.datetime.now(),
+        Boundary=pack_boundary(vertices),
+        Boundary_Low=simplified['low'],
+        Boundary_Medium=simplified['medium'],
+        **{column_name: metrics[column_name] for column_name in METRIC_COLUMNS},
+    )
+
+
+def build_area(owner_id, values, metrics, legacy_coordinates=False):
+    """
+    Builds an unsaved area from validate_area() values and its
+    compute_metrics() row, with approval, topography and farm attached.
+    """
+    new_area = _new_area(owner_id, values, metrics)
+    new_area.approval.append(areaApproval(User_ID=owner_id, Status="Pending", Time_Of_Checking=None))
+    new_area.topography.append(areaTopography(Slope=values['slope'], Mean_Average_Sea_Level=values['masl']))
+    new_area.farm.append(areaFarm(Soil_Type=values['soil_type'], Soil_Suitability=values['suitability'], Hectares=values['hectares']))
+    if legacy_coordinates:
+        new_area.coordinates.extend(areaCoordinates(Latitude=latitude, Longitude=longitude) for latitude, longitude in values['vertices'])
+    return new_area
+
+
+def _commit_areas(session, owner_id, chunk, legacy_coordinates):
+    metrics = compute_metrics([pack_boundary(values['vertices']) for _, values in chunk])
+    new_areas = [_new_area(owner_id, values, row_metrics) for (_, values), row_metrics in zip(chunk, metrics)]
+    # The areas go through the ORM flush, which needs their generated IDs
+    # back (and keeps the search index hook seeing them); the child rows
+    # only need those IDs, so each table gets one executemany per chunk.
+    session.add_all(new_areas)
+    session.flush()
+    connection = session.connection()
+    area_values = [(new_area.Area_ID, values) for new_area, (_, values) in zip(new_areas, chunk)]
+    connection.execute(insert(areaApproval), [
+        {'Area_ID': area_id, 'User_ID': owner_id, 'Status': "Pending", 'Time_Of_Checking': None} for area_id, _ in area_values
+    ])
+    connection.execute(insert(areaTopography), [
+        {'Area_ID': area_id, 'Slope': values['slope'], 'Mean_Average_Sea_Level': values['masl']} for area_id, values in area_values
+    ])
+    connection.execute(insert(areaFarm), [
+        {'Area_ID': area_id, 'Soil_Type': values['soil_type'], 'Soil_Suitability': values['suitability'], 'Hectares': values['hectares']}
+        for area_id, values in area_values
+    ])
+    if legacy_coordinates:
+        connection.execute(insert(areaCoordinates), [
+            {'Area_ID': area_id, 'Latitude': latitude, 'Longitude': longitude}
+            for area_id, values in area_values for latitude, longitude in values['vertices']
+        ])
+    # Read before commit expires the objects.
+    committed = [
+        (new_area.Area_ID, (new_area.Min_Latitude, new_area.Min_Longitude, new_area.Max_Latitude, new_area.Max_Longitude))
+        for new_area in new_areas
+    ]
+    session.commit()
+    return committed
+
+
+def _write_chunk(session, chunk, commit, report, on_committed):
+    """
+    Commits a chunk in one transaction. If that fails, the chunk is retried
+    row by row so one bad row only costs itself.
+    """
+    if not chunk:
+        return
+    try:
+        on_committed(commit(chunk))
+        report.imported += len(chunk)
+        return
+    except Exception:
+        session.rollback()
+    for row in chunk:
+        try:
+            on_committed(commit([row]))
+            report.imported += 1
+        except Exception as e:
+            session.rollback()
+            report.error(row[0], e)
+
+
+def import_areas(session, records, owner_id, chunk_size=DEFAULT_CHUNK_SIZE, legacy_coordinates=False, on_committed=None):
+    """
+    Validates (row_number, record) pairs as they stream in and inserts the
+    valid ones chunk_size at a time, one transaction per chunk, with
+    approval, topography and farm rows alongside. The search index,
+    change log and response cache stay current as for POST /area. on_committed receives [(Area_ID, bbox), ...] per commit.
+    """
+    report = ImportReport()
+    chunk = []
+
+    def commit(rows):
+        return _commit_areas(session, owner_id, rows, legacy_coordinates)
+
+    for row_number, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            chunk.append((row_number, validate_area(record)))
+        except ImportRowError as e:
+            report.error(row_number, e)
+            continue
+        if len(chunk) >= chunk_size:
+            _write_chunk(session, chunk, commit, report, on_committed or (lambda committed: None))
+            chunk = []
+    _write_chunk(session, chunk, commit, report, on_committed or (lambda committed: None))
+    return report
+
+
+def _parse_date(record, key):
+    value = record.get(key)
+    if _blank(value):
+        raise ImportRowError(f"'{key}' is required")
+    try:
+        return datetime.datetime.strptime(str(value).strip()[:10], '%Y-%m-%d')
+    except ValueError:
+        raise ImportRowError(f"'{key}' must be a YYYY-MM-DD date")
+
+
+def validate_harvest(record):
+    """
+    Normalizes one harvest record (POST /area/farm_harvest body keys, plus
+    an optional farm_id instead of area_id). Raises ImportRowError.
+    """
+    record = _lowercase_keys(record)
+    area_id = _optional_number(record, 'area_id', int)
+    farm_id = _optional_number(record, 'farm_id', int)
+    if area_id is None and farm_id is None:
+        raise ImportRowError("'area_id' or 'farm_id' is required")
+    crop = record.get('crop_type', record.get('crop'))
+    if _blank(crop):
+        raise ImportRowError("'crop_type' is required")
+    status = record.get('status')
+    return {
+        'area_id': area_id,
+        'farm_id': farm_id,
+        'Crop': str(crop).strip()[:50],
+        'Sow_Date': _parse_date(record, 'sow_date'),
+        'Harvest_Date': _parse_date(record, 'harvest_date'),
+        'Status': "Ongoing" if _blank(status) else str(status).strip()[:20],
+    }
+
+
+def _resolve_farms(session, chunk, report):
+    """
+    Maps area_id to the area's farm (the lowest Farm_ID, as the harvest
+    endpoints do) and checks explicit farm IDs, in two queries per chunk.
+    Rows whose farm cannot be found are reported and dropped.
+    """
+    area_ids = {values['area_id'] for _, values in chunk if values['farm_id'] is None}
+    farm_ids = {values['farm_id'] for _, values in chunk if values['farm_id'] is not None}
+    farm_by_area = {}
+    if area_ids:
+        farm_by_area = dict(session.execute(
+            select(areaFarm.Area_ID, func.min(areaFarm.Farm_ID)).where(areaFarm.Area_ID.in_(area_ids)).group_by(areaFarm.Area_ID)
+        ).all())
+    known_farms = set()
+    if farm_ids:
+        known_farms = set(session.execute(select(areaFarm.Farm_ID).where(areaFarm.Farm_ID.in_(farm_ids))).scalars())
+
+    resolved = []
+    for row_number, values in chunk:
+        farm_id = values['farm_id'] if values['farm_id'] is not None else farm_by_area.get(values['area_id'])
+        if farm_id is None or (values['farm_id'] is not None and farm_id not in known_farms):
+            report.error(row_number, f"No farm found for area_id {values['area_id']}" if values['farm_id'] is None
+                         else f"Farm ID {values['farm_id']} not found")
+            continue
+        resolved.append((row_number, {
+            'Farm_ID': farm_id, 'Crop': values['Crop'], 'Sow_Date': values['Sow_Date'],
+            'Harvest_Date': values['Harvest_Date'], 'Status': values['Status'],
+        }))
+    return resolved
+
+
+def _commit_harvests(session, chunk):
+    # One executemany per chunk; the sync triggers log the new rows.
+    session.connection().execute(insert(farmHarvestData), [params for _, params in chunk])
+    session.commit()
+
+
+def import_harvests(session, records, chunk_size=DEFAULT_CHUNK_SIZE * 4):
+    """
+    Validates (row_number, record) pairs as they stream in and inserts each
+    chunk with a single executemany in its own transaction.
+    """
+    report = ImportReport()
+    chunk = []
+
+    def flush_chunk(rows):
+        _write_chunk(session, _resolve_farms(session, rows, report), lambda rows: _commit_harvests(session, rows),
+                     report, lambda ids: None)
+
+    for row_number, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            chunk.append((row_number, validate_harvest(record)))
+        except ImportRowError as e:
+            report.error(row_number, e)
+            continue
+        if len(chunk) >= chunk_size:
+            flush_chunk(chunk)
+            chunk = []
+    if chunk:
+        flush_chunk(chunk)
+    return report
@@ -0,0 +1,143 @@
+import gzip
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+STREAM_FLUSH_BYTES = 16 * 1024
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/geo+json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/html',
+    'text/plain',
+}
+
+
+def compression(enabled=True, min_size=None):
+    """
+    Per-route override of the app-wide compression settings, e.g.
+    @compression(min_size=256) or @compression(enabled=False). Place it
+    directly under @app.route; functools.wraps carries the setting through
+    the other decorators.
+    """
+    def decorator(view):
+        view.compression = {'enabled': enabled, 'min_size': min_size}
+        return view
+    return decorator
+
+
+def _route_settings():
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(view, 'compression', {})
+
+
+def supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(size=None):
+    """
+    Picks the content coding for the current response: brotli over gzip
+    when the client accepts both, None when compression is disabled for
+    the app or route, the client accepts neither, or size (if known) is
+    below the minimum.
+    """
+    settings = _route_settings()
+    if not current_app.config.get('COMPRESSION_ENABLED', True) or not settings.get('enabled', True):
+        return None
+    min_size = settings.get('min_size')
+    if min_size is None:
+        min_size = current_app.config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+    if size is not None and size < min_size:
+        return None
+    for encoding in supported_encodings():
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def compress_bytes(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=current_app.config.get('COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY))
+    return gzip.compress(data, compresslevel=current_app.config.get('COMPRESSION_GZIP_LEVEL', DEFAULT_GZIP_LEVEL), mtime=0)
+
+
+def _compressor(encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=current_app.config.get('COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY))
+        return compressor.process, compressor.flush, compressor.finish
+    # wbits=31 writes a gzip header and trailer.
+    compressor = zlib.compressobj(current_app.config.get('COMPRESSION_GZIP_LEVEL', DEFAULT_GZIP_LEVEL), zlib.DEFLATED, 31)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    """
+    Compresses an iterable of byte chunks incrementally, flushing roughly
+    every STREAM_FLUSH_BYTES of input so clients keep receiving data
+    without the ratio suffering from tiny flushed blocks.
+    """
+    # Built here, inside the app context; the generator runs after it is gone.
+    process, flush, finish = _compressor(encoding)
+
+    def generate():
+        pending = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = process(chunk)
+            pending += len(chunk)
+            if pending >= STREAM_FLUSH_BYTES:
+                data += flush()
+                pending = 0
+            if data:
+                yield data
+        yield finish()
+
+    return generate()
+
+
+def encoded_etag(etag, encoding):
+    # A compressed variant is a different representation, so it gets its own ETag.
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def compress_response(response):
+    """
+    after_request hook. Buffered responses are compressed in one go,
+    streamed ones chunk by chunk. Files sent by send_file, responses that
+    already carry a Content-Encoding and non-text types pass through.
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+
+    if response.is_streamed:
+        encoding = negotiate_encoding()
+        if encoding:
+            response.response = compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    data = response.get_data()
+    encoding = negotiate_encoding(len(data))
+    if encoding:
+        response.set_data(compress_bytes(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, is_weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak=is_weak)
+    return response
@@ -0,0 +1,102 @@
+import json
+from sqlalchemy import select
+
+from Database import area, areaFarm, areaTopography
+from geometry import boundary_to_geojson
+from read_repository import BOUNDARY_COLUMNS
+from serializers import serialize_farm, serialize_topography, orjson
+
+DEFAULT_BATCH_SIZE = 1000
+
+EXPORT_AREA_COLUMNS = (
+    area.Area_ID, area.Area_Name, area.Region, area.Province, area.Barangay, area.Organization,
+    area.created_at, area.updated_at, area.Centroid_Latitude, area.Centroid_Longitude,
+    area.Perimeter_Meters, area.Computed_Hectares,
+)
+
+EXPORT_FORMATS = {
+    'geojson': 'application/geo+json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _dumps(obj):
+    # Float-heavy geometry makes encoding the main cost; use orjson if present.
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, separators=(',', ':'), default=str)
+
+
+def export_select(region=None, province=None, status=None, detail='full'):
+    """
+    Core select of the exported area columns, the boundary for detail and
+    the area's latest approval status, with the optional filters applied.
+    """
+    statement = select(*EXPORT_AREA_COLUMNS, BOUNDARY_COLUMNS[detail].label('Boundary'), area.Approval_Status)
+    if region:
+        statement = statement.where(area.Region == region)
+    if province:
+        statement = statement.where(area.Province == province)
+    if status:
+        statement = statement.where(area.Approval_Status == status)
+    return statement
+
+
+def _group_by_area(session, model, serialize, area_ids):
+    grouped = {}
+    primary_key = model.__mapper__.primary_key[0]
+    for row in session.execute(select(*model.__table__.columns).where(model.Area_ID.in_(area_ids)).order_by(primary_key)):
+        grouped.setdefault(row.Area_ID, []).append(serialize(row))
+    return grouped
+
+
+def iter_features(session, statement, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yields one GeoJSON Feature per area in Area_ID order.
+
+    Rows are read in keyset batches (Area_ID > last seen) rather than
+    through one long-lived unbuffered cursor: memory stays bounded by the
+    batch, each statement is short, and the connection stays usable for
+    the farm and topography lookups of every batch.
+    """
+    last_id = 0
+    while True:
+        rows = session.execute(
+            statement.where(area.Area_ID > last_id).order_by(area.Area_ID).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        area_ids = [row.Area_ID for row in rows]
+        farms = _group_by_area(session, areaFarm, serialize_farm, area_ids)
+        topography = _group_by_area(session, areaTopography, serialize_topography, area_ids)
+
+        for row in rows:
+            properties = {column.key: getattr(row, column.key) for column in EXPORT_AREA_COLUMNS}
+            properties['created_at'] = row.created_at.isoformat() if row.created_at else None
+            properties['updated_at'] = row.updated_at.isoformat() if row.updated_at else None
+            properties['Approval_Status'] = row.Approval_Status
+            properties['farms'] = farms.get(row.Area_ID, [])
+            properties['topography'] = topography.get(row.Area_ID, [])
+            yield {
+                'type': 'Feature',
+                'id': row.Area_ID,
+                'geometry': boundary_to_geojson(row.Boundary),
+                'properties': properties,
+            }
+        last_id = area_ids[-1]
+        # Drop the batch before fetching the next one.
+        del rows, farms, topography
+
+
+def stream_geojson(features):
+    yield '{"type":"FeatureCollection","features":['
+    separator = ''
+    for feature in features:
+        yield separator + _dumps(feature)
+        separator = ','
+    yield ']}\n'
+
+
+def stream_ndjson(features):
+    for feature in features:
+        yield _dumps(feature) + '\n'
@@ -0,0 +1,119 @@
+import struct
+
+# area.Boundary layout: little-endian float64 (longitude, latitude) pairs,
+# one pair per vertex, in submission order.
+_VERTEX = struct.Struct('<2d')
+
+
+def pack_boundary(vertices):
+    """
+    Packs an iterable of (latitude, longitude) pairs into the area.Boundary
+    blob.
+    """
+    flat = []
+    for latitude, longitude in vertices:
+        flat.append(longitude)
+        flat.append(latitude)
+    return struct.pack(f'<{len(flat)}d', *flat)
+
+
+def unpack_boundary(blob):
+    """
+    Returns the (latitude, longitude) pairs stored in an area.Boundary blob.
+    """
+    if not blob:
+        return []
+    return [(latitude, longitude) for longitude, latitude in _VERTEX.iter_unpack(blob)]
+
+
+def boundary_to_json(blob):
+    """
+    Shapes a Boundary blob the way area responses expose coordinates.
+    """
+    return [{'Latitude': latitude, 'Longitude': longitude} for latitude, longitude in unpack_boundary(blob)]
+
+
+def boundary_to_geojson(blob):
+    """
+    Returns a GeoJSON geometry for a Boundary blob: a Polygon with a closed
+    ring for three or more vertices, otherwise a LineString or Point, or
+    None when there are no vertices.
+    """
+    positions = [[longitude, latitude] for longitude, latitude in _VERTEX.iter_unpack(blob or b'')]
+    if len(positions) >= 3:
+        if positions[0] != positions[-1]:
+            positions.append(positions[0])
+        return {'type': 'Polygon', 'coordinates': [positions]}
+    if len(positions) == 2:
+        return {'type': 'LineString', 'coordinates': positions}
+    if positions:
+        return {'type': 'Point', 'coordinates': positions[0]}
+    return None
+
+
+def bounding_box(vertices):
+    """
+    Returns (min_latitude, min_longitude, max_latitude, max_longitude) for a
+    list of (latitude, longitude) pairs, or None if it is empty.
+    """
+    if not vertices:
+        return None
+    latitudes = [latitude for latitude, _ in vertices]
+    longitudes = [longitude for _, longitude in vertices]
+    return min(latitudes), min(longitudes), max(latitudes), max(longitudes)
+
+
+# Douglas-Peucker tolerances, in degrees, for the stored levels of detail.
+# 0.001 deg is ~110 m: invisible at city zoom. 0.0001 deg is ~11 m.
+DETAIL_TOLERANCES = {
+    'low': 0.001,
+    'medium': 0.0001,
+}
+DETAIL_LEVELS = ('low', 'medium', 'full')
+
+
+def _segment_distance(point, start, end):
+    (py, px), (ay, ax), (by, bx) = point, start, end
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return ((px - (ax + t * dx)) ** 2 + (py - (ay + t * dy)) ** 2) ** 0.5
+
+
+def simplify(vertices, tolerance):
+    """
+    Douglas-Peucker simplification of a list of (latitude, longitude) pairs.
+    A polygon never drops below four vertices (or its original count, if
+    smaller) so it still draws as an outline.
+    """
+    count = len(vertices)
+    if count <= 4:
+        return list(vertices)
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, max_distance = None, tolerance
+        for index in range(first + 1, last):
+            distance = _segment_distance(vertices[index], vertices[first], vertices[last])
+            if distance > max_distance:
+                farthest, max_distance = index, distance
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    simplified = [vertex for vertex, kept in zip(vertices, keep) if kept]
+    if len(simplified) < 4:
+        simplified = [vertices[index] for index in sorted({0, count // 3, 2 * count // 3, count - 1})]
+    return simplified
+
+
+def simplified_boundaries(vertices):
+    """
+    Returns {detail level: packed boundary} for the simplified levels.
+    """
+    return {level: pack_boundary(simplify(vertices, tolerance)) for level, tolerance in DETAIL_TOLERANCES.items()}
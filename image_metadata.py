@@ -0,0 +1,183 @@
+import hashlib
+import struct
+
+COPY_BUFFER_SIZE = 64 * 1024
+ORIENTATION_TAG = 0x0112
+
+JPEG_SOI = b'\xff\xd8'
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# APP1 carries EXIF and XMP, APP13 Photoshop/IPTC records, COM free text.
+# APP0 (JFIF), APP2 (ICC profile) and APP14 (Adobe colour transform) stay,
+# since decoders need them.
+JPEG_METADATA_MARKERS = {0xE1, 0xED, 0xFE}
+PNG_METADATA_CHUNKS = {b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+_JPEG_SOS = 0xDA
+_JPEG_STANDALONE_MARKERS = {0x01} | set(range(0xD0, 0xD8))
+
+
+class _HashingWriter:
+    def __init__(self, destination):
+        self.destination = destination
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.destination.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+    def copy(self, source, length=None):
+        while length is None or length > 0:
+            data = source.read(COPY_BUFFER_SIZE if length is None else min(COPY_BUFFER_SIZE, length))
+            if not data:
+                break
+            self.write(data)
+            if length is not None:
+                length -= len(data)
+
+
+def _read_exact(source, length):
+    data = source.read(length)
+    if len(data) != length:
+        raise ValueError("Truncated image header")
+    return data
+
+
+def exif_orientation(payload):
+    """
+    The Orientation tag of an APP1 Exif payload, or None.
+    """
+    if not payload.startswith(b'Exif\x00\x00'):
+        return None
+    tiff = payload[6:]
+    order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if order is None:
+        return None
+    try:
+        offset = struct.unpack(order + 'I', tiff[4:8])[0]
+        (count,) = struct.unpack(order + 'H', tiff[offset:offset + 2])
+        for index in range(count):
+            start = offset + 2 + 12 * index
+            tag, value_type, _, value = struct.unpack(order + 'HHIH', tiff[start:start + 10])
+            if tag == ORIENTATION_TAG and value_type == 3:
+                return value
+    except struct.error:
+        return None
+    return None
+
+
+def orientation_segment(orientation):
+    """
+    A minimal APP1 Exif segment holding nothing but the Orientation tag.
+    """
+    ifd = struct.pack('>HHHIH2xI', 1, ORIENTATION_TAG, 3, 1, orientation, 0)
+    payload = b'Exif\x00\x00' + b'MM\x00\x2a' + struct.pack('>I', 8) + ifd
+    return b'\xff\xe1' + struct.pack('>H', len(payload) + 2) + payload
+
+
+def _jpeg_segments(source):
+    """
+    Returns ([(marker, offset, length, is metadata), ...], start of scan
+    offset, Exif orientation) for the header segments of a JPEG positioned
+    after SOI. A lone orientation segment, as written here, is not metadata.
+    """
+    segments = []
+    orientation = None
+    while True:
+        offset = source.tell()
+        prefix, marker = _read_exact(source, 2)
+        while marker == 0xFF:
+            # Fill bytes may pad a marker.
+            marker = _read_exact(source, 1)[0]
+        if prefix != 0xFF:
+            raise ValueError("Invalid JPEG marker")
+        if marker == _JPEG_SOS:
+            return segments, offset, orientation
+        if marker in _JPEG_STANDALONE_MARKERS:
+            segments.append((marker, offset, source.tell() - offset, False))
+            continue
+        (length,) = struct.unpack('>H', _read_exact(source, 2))
+        is_metadata = marker in JPEG_METADATA_MARKERS
+        if marker == 0xE1:
+            payload = _read_exact(source, length - 2)
+            segment_orientation = exif_orientation(payload)
+            if orientation is None:
+                orientation = segment_orientation
+            is_metadata = segment_orientation is None or payload != orientation_segment(segment_orientation)[4:]
+        else:
+            source.seek(length - 2, 1)
+        segments.append((marker, offset, source.tell() - offset, is_metadata))
+
+
+def _strip_jpeg(source, destination):
+    segments, scan_offset, orientation = _jpeg_segments(source)
+    if not any(is_metadata for _, _, _, is_metadata in segments):
+        return None
+    writer = _HashingWriter(destination)
+    writer.write(JPEG_SOI)
+    pending_orientation = orientation not in (None, 1)
+    for marker, offset, length, is_metadata in segments:
+        if pending_orientation and marker != 0xE0:
+            # Keep photos upright: the orientation goes back in, after JFIF.
+            writer.write(orientation_segment(orientation))
+            pending_orientation = False
+        if marker in JPEG_METADATA_MARKERS:
+            continue
+        source.seek(offset)
+        writer.copy(source, length)
+    if pending_orientation:
+        writer.write(orientation_segment(orientation))
+    source.seek(scan_offset)
+    writer.copy(source)
+    return writer.digest.hexdigest(), writer.size
+
+
+def _png_chunks(source):
+    chunks = []
+    while True:
+        offset = source.tell()
+        length, chunk_type = struct.unpack('>I4s', _read_exact(source, 8))
+        source.seek(length + 4, 1)
+        chunks.append((chunk_type, offset, length + 12))
+        if chunk_type == b'IEND':
+            return chunks
+
+
+def _strip_png(source, destination):
+    chunks = _png_chunks(source)
+    if not any(chunk_type in PNG_METADATA_CHUNKS for chunk_type, _, _ in chunks):
+        return None
+    writer = _HashingWriter(destination)
+    writer.write(PNG_SIGNATURE)
+    for chunk_type, offset, length in chunks:
+        if chunk_type in PNG_METADATA_CHUNKS:
+            continue
+        source.seek(offset)
+        writer.copy(source, length)
+    return writer.digest.hexdigest(), writer.size
+
+
+def strip_metadata(source, destination):
+    """
+    Copies a JPEG or PNG from source to destination (seekable binary file
+    objects) without its EXIF, XMP, IPTC and text metadata, leaving the
+    compressed image data untouched: nothing is decoded or re-encoded. A
+    JPEG keeps its Exif orientation as a one-tag Exif segment so it still
+    displays upright.
+
+    Returns (sha256, size) of what was written, or None without writing
+    anything if source has no such metadata, is another format or is
+    malformed.
+    """
+    try:
+        source.seek(0)
+        if source.read(2) == JPEG_SOI:
+            layout = _strip_jpeg
+        else:
+            source.seek(0)
+            if source.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+                return None
+            layout = _strip_png
+        return layout(source, destination)
+    except (ValueError, struct.error):
+        return None
@@ -0,0 +1,84 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+
+from extensions import db
+from Database import areaImages
+
+# Rendition name -> (areaImages column, longest edge in pixels)
+RENDITIONS = {
+    'thumb': ('Thumbnail_Path', 256),
+    'medium': ('Medium_Path', 1024),
+}
+JPEG_QUALITY = 85
+
+
+def disk_path(app, relative_url):
+    return os.path.join(app.root_path, relative_url.lstrip('/'))
+
+
+def rendition_paths(source_path):
+    base, _ = os.path.splitext(source_path)
+    return {name: f"{base}_{name}.jpg" for name in RENDITIONS}
+
+
+def render_image(source_path, strip_original=True):
+    """
+    Writes a thumbnail and a medium JPEG next to source_path, both rotated
+    upright and without EXIF, and optionally strips EXIF from the original
+    in place. Returns {rendition name: file path}.
+    """
+    outputs = rendition_paths(source_path)
+    with Image.open(source_path) as original:
+        had_exif = bool(original.getexif())
+        image_format = original.format
+        upright = ImageOps.exif_transpose(original)
+        if upright.mode not in ('RGB', 'L'):
+            upright = upright.convert('RGB')
+
+        for name, (_, max_edge) in RENDITIONS.items():
+            rendition = upright.copy()
+            rendition.thumbnail((max_edge, max_edge))
+            rendition.save(outputs[name], 'JPEG', quality=JPEG_QUALITY, optimize=True)
+
+    if had_exif and strip_original:
+        # Re-saving without the exif argument drops GPS and camera metadata.
+        save_options = {'quality': 95} if image_format == 'JPEG' else {}
+        upright.save(source_path, image_format, **save_options)
+    return outputs
+
+
+class ImagePipeline:
+    """
+    Generates photo renditions on a small background thread pool so area
+    submission never waits on image work. Each job runs in its own app
+    context and records the rendition URLs on its areaImages row.
+    """
+
+    def __init__(self, app, max_workers=2):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-pipeline')
+
+    def enqueue(self, image_ids):
+        for image_id in image_ids:
+            self.executor.submit(self.process, image_id)
+
+    def process(self, image_id):
+        with self.app.app_context():
+            image = db.session.get(areaImages, image_id)
+            if not image:
+                return
+            try:
+                source_path = disk_path(self.app, image.Filepath)
+                # Content-addressed blobs are stripped when stored, shared and
+                # immutable: render once, never rewrite.
+                if not (image.Blob_SHA256 and all(os.path.exists(path) for path in rendition_paths(source_path).values())):
+                    render_image(source_path, strip_original=not image.Blob_SHA256)
+                url_base = os.path.splitext(image.Filepath)[0]
+                for name, (column_name, _) in RENDITIONS.items():
+                    setattr(image, column_name, f"{url_base}_{name}.jpg")
+                image.Processing_Status = 'Ready'
+            except Exception as e:
+                self.app.logger.error(f"Image pipeline failed for image {image_id}: {e}")
+                image.Processing_Status = 'Failed'
+            db.session.commit()
@@ -0,0 +1,75 @@
+import mimetypes
+import os
+import re
+from flask import Response, current_app, request, send_from_directory
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+from image_store import BLOBS_DIR_NAME
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MUTABLE_MAX_AGE = 60 * 60
+
+# blobs/ab/cd/<sha256><ext> and its renditions (<sha256>_thumb.jpg, ...)
+_CONTENT_ADDRESSED = re.compile(rf'^{BLOBS_DIR_NAME}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/([0-9a-f]{{64}})(_[a-z]+)?\.[0-9a-z]+$')
+
+
+def content_etag(relative_path):
+    """
+    Returns a strong ETag derived from the file name for content-addressed
+    files, or None for legacy uploads.
+    """
+    match = _CONTENT_ADDRESSED.match(relative_path)
+    if not match:
+        return None
+    digest, rendition = match.groups()
+    return f"{digest}{rendition or ''}"
+
+
+def _max_age(etag):
+    return IMMUTABLE_MAX_AGE if etag else MUTABLE_MAX_AGE
+
+
+def _apply_cache_headers(response, etag):
+    # send_file marks responses no-cache unless told otherwise.
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = _max_age(etag)
+    if etag:
+        response.cache_control.immutable = True
+    return response
+
+
+def serve_image(upload_dir, relative_path):
+    """
+    Serves one uploaded photo with validators and caching headers.
+
+    Content-addressed names never change content, so they get a year-long
+    immutable Cache-Control and their hash as ETag; repeat views are either
+    served from the client cache or answered with a 304. Range requests are
+    handled by send_from_directory. If IMAGE_ACCEL_REDIRECT_PREFIX is set the
+    body is handed to nginx via X-Accel-Redirect (USE_X_SENDFILE covers
+    Apache/lighttpd through Flask itself).
+    """
+    path = safe_join(upload_dir, relative_path)
+    # Dot-directories hold in-flight uploads (.incoming, .sessions).
+    if path is None or relative_path.startswith('.') or not os.path.isfile(path):
+        raise NotFound()
+
+    etag = content_etag(relative_path)
+    accel_prefix = current_app.config.get('IMAGE_ACCEL_REDIRECT_PREFIX')
+
+    if accel_prefix:
+        stat = os.stat(path)
+        response = Response(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{relative_path}"
+        response.set_etag(etag or f"{int(stat.st_mtime)}-{stat.st_size}")
+        response.last_modified = stat.st_mtime
+        response = response.make_conditional(request)
+        if response.status_code == 200:
+            # nginx supplies the body and length.
+            response.headers.pop('Content-Length', None)
+    else:
+        response = send_from_directory(upload_dir, relative_path, etag=etag or True, conditional=True, max_age=_max_age(etag))
+
+    return _apply_cache_headers(response, etag)
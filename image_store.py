@@ -0,0 +1,230 @@
+import hashlib
+import io
+import os
+import re
+import uuid
+from flask import current_app
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from Database import areaImages, imageBlob
+from image_metadata import strip_metadata
+from image_pipeline import RENDITIONS, disk_path
+
+BLOBS_DIR_NAME = 'blobs'
+HASH_BUFFER_SIZE = 64 * 1024
+
+_EXTENSION = re.compile(r'[^0-9a-z]')
+
+
+def clean_extension(extension):
+    extension = _EXTENSION.sub('', (extension or '').lower())[:10]
+    return f".{extension}" if extension else ".jpg"
+
+
+class ContentAddressedStore:
+    """
+    Stores photos once per SHA-256 under <root>/ab/cd/<sha256><ext>.
+
+    Blobs are served publicly, so EXIF/XMP (GPS position, camera details)
+    is stripped before hashing: identical photos still share one blob, and
+    what is stored is exactly what may be shown. Stripping drops metadata
+    segments without decoding the image, so it is cheap enough to stay in
+    the request.
+
+    Each stored file has an image_blob row whose Ref_Count tracks the
+    area_images rows pointing at it. Writing bytes that are already stored
+    skips the disk write entirely, and a blob whose last reference is
+    deleted has its files removed once the transaction commits.
+    """
+
+    def __init__(self, root_dir, url_prefix):
+        self.root_dir = root_dir
+        self.url_prefix = url_prefix.rstrip('/')
+
+    def _relative_path(self, sha256, extension):
+        return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+    def _new_blob(self, session, sha256, size, extension):
+        """
+        Inserts the image_blob row for new content and returns (blob, disk
+        path to write). If a concurrent request stored the same bytes first,
+        returns (their blob, None) instead of failing on the primary key.
+        """
+        relative_path = self._relative_path(sha256, clean_extension(extension))
+        blob = imageBlob(SHA256=sha256, Filepath=f"{self.url_prefix}/{relative_path}", Size=size, Ref_Count=0)
+        try:
+            with session.begin_nested():
+                session.add(blob)
+        except IntegrityError:
+            # A locking read sees the other transaction's committed row.
+            existing = session.get(imageBlob, sha256, with_for_update=True, populate_existing=True)
+            if existing is None:
+                raise
+            return existing, None
+        return blob, os.path.join(self.root_dir, relative_path)
+
+    def get(self, session, sha256):
+        return session.get(imageBlob, (sha256 or '').lower())
+
+    def _strip_file(self, path, sha256, size):
+        # Returns the (sha256, size) of path after stripping it in place.
+        stripped_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(path, 'rb') as source, open(stripped_path, 'wb') as destination:
+                stripped = strip_metadata(source, destination)
+            if stripped is None:
+                return sha256, size
+            os.replace(stripped_path, path)
+            return stripped
+        finally:
+            if os.path.exists(stripped_path):
+                os.remove(stripped_path)
+
+    def store_bytes(self, session, data, extension):
+        stripped = io.BytesIO()
+        if strip_metadata(io.BytesIO(data), stripped) is not None:
+            data = stripped.getvalue()
+        sha256 = hashlib.sha256(data).hexdigest()
+        blob = self.get(session, sha256)
+        if blob:
+            return blob
+        blob, path = self._new_blob(session, sha256, len(data), extension)
+        if path:
+            self._write_atomically(path, lambda f: f.write(data))
+        return blob
+
+    def store_file(self, session, source_path, sha256, size, extension):
+        """
+        Adopts an already hashed file (e.g. a finished streamed upload). The
+        file is stripped and renamed into place, or simply deleted if the
+        blob exists.
+        """
+        sha256, size = self._strip_file(source_path, sha256, size)
+        blob = self.get(session, sha256)
+        if blob:
+            os.remove(source_path)
+            return blob
+        blob, path = self._new_blob(session, sha256, size, extension)
+        if path is None:
+            os.remove(source_path)
+            return blob
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+        return blob
+
+    def store_staged(self, session, staged, extension):
+        staged.flush()
+        sha256, size = self._strip_file(staged.path, staged.sha256, staged.size)
+        blob = self.get(session, sha256)
+        if blob:
+            staged.discard()
+            return blob
+        blob, path = self._new_blob(session, sha256, size, extension)
+        if path is None:
+            staged.discard()
+            return blob
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staged.finalize(path)
+        return blob
+
+    def restrip(self, session, blob):
+        """
+        Re-stores a blob saved before stripping was added. Its area_images
+        rows move to the stripped blob (renditions reset to Pending) and the
+        old blob is deleted, its files once the transaction commits.
+        Returns the moved Image_IDs, or [] if the blob had no metadata.
+        """
+        path = disk_path(current_app, blob.Filepath)
+        if not os.path.exists(path):
+            return []
+        stripped_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(path, 'rb') as source, open(stripped_path, 'wb') as destination:
+            stripped = strip_metadata(source, destination)
+        if stripped is None:
+            os.remove(stripped_path)
+            return []
+        new_blob = self.store_file(session, stripped_path, *stripped, os.path.splitext(path)[1])
+        session.flush()
+        image_ids = session.execute(select(areaImages.Image_ID).where(areaImages.Blob_SHA256 == blob.SHA256)).scalars().all()
+        session.execute(
+            update(areaImages).where(areaImages.Blob_SHA256 == blob.SHA256).values(
+                Blob_SHA256=new_blob.SHA256, Filepath=new_blob.Filepath,
+                Thumbnail_Path=None, Medium_Path=None, Processing_Status='Pending',
+            )
+        )
+        session.execute(
+            update(imageBlob).where(imageBlob.SHA256 == new_blob.SHA256).values(Ref_Count=imageBlob.Ref_Count + len(image_ids))
+        )
+        session.info.setdefault('orphaned_blob_files', []).append(blob.Filepath)
+        session.delete(blob)
+        return image_ids
+
+    def _write_atomically(self, path, writer):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(partial_path, 'wb') as f:
+                writer(f)
+            os.replace(partial_path, path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(HASH_BUFFER_SIZE)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+
+@event.listens_for(Session, 'after_flush')
+def _count_blob_references(session, flush_context):
+    """
+    Adjusts image_blob.Ref_Count for area_images rows inserted or deleted in
+    this flush (including cascades from a deleted area). Blobs that drop to
+    zero references are deleted in the same transaction; their files go
+    after commit.
+    """
+    deltas = {}
+    for obj in session.new:
+        if isinstance(obj, areaImages) and obj.Blob_SHA256:
+            deltas[obj.Blob_SHA256] = deltas.get(obj.Blob_SHA256, 0) + 1
+    for obj in session.deleted:
+        if isinstance(obj, areaImages) and obj.Blob_SHA256:
+            deltas[obj.Blob_SHA256] = deltas.get(obj.Blob_SHA256, 0) - 1
+    if not deltas:
+        return
+
+    connection = session.connection()
+    for sha256, delta in deltas.items():
+        connection.execute(
+            update(imageBlob).where(imageBlob.SHA256 == sha256).values(Ref_Count=imageBlob.Ref_Count + delta)
+        )
+        if delta < 0:
+            unreferenced = (imageBlob.SHA256 == sha256, imageBlob.Ref_Count <= 0)
+            filepath = connection.execute(select(imageBlob.Filepath).where(*unreferenced)).scalar()
+            if filepath:
+                connection.execute(delete(imageBlob).where(*unreferenced))
+                session.info.setdefault('orphaned_blob_files', []).append(filepath)
+
+
+@event.listens_for(Session, 'after_commit')
+def _remove_orphaned_blob_files(session):
+    for filepath in session.info.pop('orphaned_blob_files', []):
+        path = disk_path(current_app, filepath)
+        base = os.path.splitext(path)[0]
+        for candidate in [path] + [f"{base}_{name}.jpg" for name in RENDITIONS]:
+            if os.path.exists(candidate):
+                os.remove(candidate)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_orphaned_blob_files(session):
+    session.info.pop('orphaned_blob_files', None)
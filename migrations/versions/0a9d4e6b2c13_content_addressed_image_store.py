@@ -0,0 +1,44 @@
+"""content addressed image store
+
+Revision ID: 0a9d4e6b2c13
+Revises: f3a8c6d1e257
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9d4e6b2c13'
+down_revision = 'f3a8c6d1e257'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'image_blob' not in inspector.get_table_names():
+        op.create_table('image_blob',
+        sa.Column('SHA256', sa.String(length=64), nullable=False),
+        sa.Column('Filepath', sa.Text(), nullable=False),
+        sa.Column('Size', sa.Integer(), nullable=False),
+        sa.Column('Ref_Count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('SHA256')
+        )
+
+    if 'Blob_SHA256' not in {column['name'] for column in inspector.get_columns('area_images')}:
+        with op.batch_alter_table('area_images', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('Blob_SHA256', sa.String(length=64), nullable=True))
+            batch_op.create_index(batch_op.f('ix_area_images_Blob_SHA256'), ['Blob_SHA256'], unique=False)
+            batch_op.create_foreign_key('fk_area_images_blob_sha256', 'image_blob', ['Blob_SHA256'], ['SHA256'])
+
+
+def downgrade():
+    with op.batch_alter_table('area_images', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_area_images_blob_sha256', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_area_images_Blob_SHA256'))
+        batch_op.drop_column('Blob_SHA256')
+
+    op.drop_table('image_blob')
@@ -0,0 +1,53 @@
+"""sync change log and updated_at columns
+
+Revision ID: 1c7e5a9f3b20
+Revises: 0a9d4e6b2c13
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c7e5a9f3b20'
+down_revision = '0a9d4e6b2c13'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ('area', 'area_images', 'area_approval', 'area_farm', 'area_topography', 'farm_harvest_data')
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table_name in SYNCED_TABLES:
+        if 'updated_at' not in {column['name'] for column in inspector.get_columns(table_name)}:
+            with op.batch_alter_table(table_name, schema=None) as batch_op:
+                batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Existing rows count as last touched when created, or now if unknown.
+    op.execute("UPDATE area SET updated_at = created_at WHERE updated_at IS NULL")
+    for table_name in SYNCED_TABLES[1:]:
+        op.execute(f"UPDATE {table_name} SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+
+    if 'change_log' not in inspector.get_table_names():
+        op.create_table('change_log',
+        sa.Column('Change_ID', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('Entity', sa.String(length=20), nullable=False),
+        sa.Column('Entity_ID', sa.Integer(), nullable=False),
+        sa.Column('Operation', sa.String(length=10), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('Change_ID')
+        )
+        with op.batch_alter_table('change_log', schema=None) as batch_op:
+            batch_op.create_index('ix_change_log_created_at', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_change_log_created_at')
+    op.drop_table('change_log')
+
+    for table_name in reversed(SYNCED_TABLES):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,29 @@
+"""area created_at keyset index
+
+Revision ID: 3f1a2b7c9d10
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a2b7c9d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'ix_area_created_at_area_id' in {index['name'] for index in inspector.get_indexes('area')}:
+        return
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        batch_op.create_index('ix_area_created_at_area_id', ['created_at', 'Area_ID'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        batch_op.drop_index('ix_area_created_at_area_id')
@@ -0,0 +1,37 @@
+"""revoked_token table for the JWT blocklist
+
+Revision ID: 4d8b1f6e2a57
+Revises: 1c7e5a9f3b20
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8b1f6e2a57'
+down_revision = '1c7e5a9f3b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'revoked_token' not in inspector.get_table_names():
+        op.create_table('revoked_token',
+        sa.Column('JTI', sa.String(length=36), nullable=False),
+        sa.Column('Expires_At', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('JTI')
+        )
+        with op.batch_alter_table('revoked_token', schema=None) as batch_op:
+            batch_op.create_index('ix_revoked_token_created_at', ['created_at'], unique=False)
+            batch_op.create_index('ix_revoked_token_expires_at', ['Expires_At'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_token', schema=None) as batch_op:
+        batch_op.drop_index('ix_revoked_token_expires_at')
+        batch_op.drop_index('ix_revoked_token_created_at')
+    op.drop_table('revoked_token')
@@ -0,0 +1,86 @@
+"""users.Email_Normalized for indexed case-insensitive lookups
+
+Revision ID: 5e2c9a7d4b18
+Revises: 4d8b1f6e2a57
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2c9a7d4b18'
+down_revision = '4d8b1f6e2a57'
+branch_labels = None
+depends_on = None
+
+users_table = sa.table('users', sa.column('User_ID'), sa.column('Email'))
+audit_table = sa.table('user_merge_audit',
+    sa.column('Merged_User_ID', sa.Integer),
+    sa.column('Survivor_User_ID', sa.Integer),
+    sa.column('Email', sa.String),
+    sa.column('created_at', sa.DateTime),
+)
+# Tables whose User_ID points at users.
+USER_REFERENCES = (
+    sa.table('area', sa.column('User_ID')),
+    sa.table('area_approval', sa.column('User_ID')),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # app.py runs db.create_all() on import, so these may already exist.
+    if 'user_merge_audit' not in inspector.get_table_names():
+        op.create_table('user_merge_audit',
+        sa.Column('Merge_ID', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('Merged_User_ID', sa.Integer(), nullable=False),
+        sa.Column('Survivor_User_ID', sa.Integer(), nullable=False),
+        sa.Column('Email', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('Merge_ID')
+        )
+
+    _merge_duplicates(bind)
+
+    if 'Email_Normalized' not in {column['name'] for column in inspector.get_columns('users')}:
+        # SQLite can only add a stored generated column by rebuilding the table.
+        recreate = 'always' if bind.dialect.name == 'sqlite' else 'auto'
+        with op.batch_alter_table('users', schema=None, recreate=recreate) as batch_op:
+            batch_op.add_column(sa.Column('Email_Normalized', sa.String(length=50), sa.Computed('LOWER(TRIM(Email))', persisted=True)))
+    if 'ix_users_email_normalized' not in {index['name'] for index in inspector.get_indexes('users')}:
+        with op.batch_alter_table('users', schema=None) as batch_op:
+            batch_op.create_index('ix_users_email_normalized', ['Email_Normalized'], unique=True)
+
+
+def _merge_duplicates(bind):
+    # Accounts that differ only in case or surrounding spaces were already
+    # unreachable: login matched case-insensitively and took the first row.
+    # Fold each into the oldest account with the same address, recording
+    # the merge in user_merge_audit.
+    survivors = {}
+    merged_at = datetime.datetime.now()
+    for user_id, email in bind.execute(sa.select(users_table.c.User_ID, users_table.c.Email).order_by(users_table.c.User_ID)):
+        # Matches LOWER(TRIM(Email)).
+        survivor_id = survivors.setdefault(email.strip(' ').lower(), user_id)
+        if survivor_id == user_id:
+            continue
+        print(f"Merging user {user_id} ({email}) into user {survivor_id}.")
+        for reference in USER_REFERENCES:
+            bind.execute(reference.update().where(reference.c.User_ID == user_id).values(User_ID=survivor_id))
+        bind.execute(users_table.delete().where(users_table.c.User_ID == user_id))
+        bind.execute(audit_table.insert().values(
+            Merged_User_ID=user_id, Survivor_User_ID=survivor_id, Email=email, created_at=merged_at
+        ))
+
+
+def downgrade():
+    # Merged accounts are not restored; user_merge_audit lists them.
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_email_normalized')
+        batch_op.drop_column('Email_Normalized')
+    op.drop_table('user_merge_audit')
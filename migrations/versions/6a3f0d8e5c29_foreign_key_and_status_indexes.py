@@ -0,0 +1,45 @@
+"""foreign key and status filter indexes
+
+Revision ID: 6a3f0d8e5c29
+Revises: 5e2c9a7d4b18
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a3f0d8e5c29'
+down_revision = '5e2c9a7d4b18'
+branch_labels = None
+depends_on = None
+
+# (table, index name, columns), matching the predicates of the read endpoints.
+INDEXES = (
+    ('area', 'ix_area_user_id', ['User_ID']),
+    ('area_coordinates', 'ix_area_coordinates_area_id', ['Area_ID']),
+    ('area_images', 'ix_area_images_area_id_image_id', ['Area_ID', 'Image_ID']),
+    ('area_farm', 'ix_area_farm_area_id_farm_id', ['Area_ID', 'Farm_ID']),
+    ('area_approval', 'ix_area_approval_area_id_approval_id', ['Area_ID', 'Approval_ID']),
+    ('area_approval', 'ix_area_approval_status_area_id', ['Status', 'Area_ID']),
+    ('area_topography', 'ix_area_topography_area_id', ['Area_ID']),
+    ('farm_harvest_data', 'ix_farm_harvest_data_farm_id_status', ['Farm_ID', 'Status', 'Harvest_ID']),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table_name, index_name, columns in INDEXES:
+        if index_name in {index['name'] for index in inspector.get_indexes(table_name)}:
+            continue
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.create_index(index_name, columns, unique=False)
+
+
+def downgrade():
+    # On MySQL, InnoDB drops its implicit foreign key index once one of these
+    # covers the column, so dropping ours may need that index recreated first.
+    for table_name, index_name, _ in reversed(INDEXES):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_index(index_name)
@@ -0,0 +1,112 @@
+"""area search term index
+
+Revision ID: 7b2e4d6a8c31
+Revises: 3f1a2b7c9d10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e4d6a8c31'
+down_revision = '3f1a2b7c9d10'
+branch_labels = None
+depends_on = None
+
+# Search tokenization as of this revision, kept here rather than imported
+# from search.py so the backfill does not change when search.py does.
+SEARCHABLE_FIELDS = {
+    'Area_Name': 3,
+    'Province': 2,
+    'Region': 1,
+}
+MAX_TERM_LENGTH = 64
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def _normalize_words(text):
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return [word[:MAX_TERM_LENGTH] for word in _NON_WORD.split(text) if word]
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _build_terms(row):
+    """
+    Returns {(Kind, Term): Weight} for one area row.
+    """
+    terms = {}
+    for field_name, weight in SEARCHABLE_FIELDS.items():
+        for word in _normalize_words(getattr(row, field_name)):
+            keys = [('w', word)] + [('t', gram) for gram in _trigrams(word)]
+            for key in keys:
+                if terms.get(key, 0) < weight:
+                    terms[key] = weight
+    return terms
+
+
+def upgrade():
+    # app.py runs db.create_all() on import, so the table may already exist.
+    inspector = sa.inspect(op.get_bind())
+    if 'area_search_term' in inspector.get_table_names():
+        op.execute('DELETE FROM area_search_term')
+    else:
+        _create_table()
+    _backfill()
+
+
+def _create_table():
+    op.create_table('area_search_term',
+    sa.Column('Search_Term_ID', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('Area_ID', sa.Integer(), nullable=False),
+    sa.Column('Kind', sa.String(length=1), nullable=False),
+    sa.Column('Term', sa.String(length=64), nullable=False),
+    sa.Column('Weight', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['Area_ID'], ['area.Area_ID'], ),
+    sa.PrimaryKeyConstraint('Search_Term_ID')
+    )
+    with op.batch_alter_table('area_search_term', schema=None) as batch_op:
+        batch_op.create_index('ix_area_search_term_kind_term', ['Kind', 'Term', 'Area_ID'], unique=False)
+        batch_op.create_index('ix_area_search_term_area_id', ['Area_ID'], unique=False)
+
+
+def _backfill():
+    connection = op.get_bind()
+    area_table = sa.table('area',
+        sa.column('Area_ID', sa.Integer),
+        sa.column('Area_Name', sa.String),
+        sa.column('Region', sa.String),
+        sa.column('Province', sa.String),
+    )
+    term_table = sa.table('area_search_term',
+        sa.column('Area_ID', sa.Integer),
+        sa.column('Kind', sa.String),
+        sa.column('Term', sa.String),
+        sa.column('Weight', sa.Integer),
+    )
+    for row in connection.execute(sa.select(area_table)):
+        rows = [
+            {'Area_ID': row.Area_ID, 'Kind': kind, 'Term': term, 'Weight': weight}
+            for (kind, term), weight in _build_terms(row).items()
+        ]
+        if rows:
+            connection.execute(term_table.insert(), rows)
+
+
+def downgrade():
+    with op.batch_alter_table('area_search_term', schema=None) as batch_op:
+        batch_op.drop_index('ix_area_search_term_area_id')
+        batch_op.drop_index('ix_area_search_term_kind_term')
+
+    op.drop_table('area_search_term')
@@ -0,0 +1,45 @@
+"""area.Approval_Status cache of the latest approval
+
+Revision ID: 7c4e1a9b6d30
+Revises: 6a3f0d8e5c29
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e1a9b6d30'
+down_revision = '6a3f0d8e5c29'
+branch_labels = None
+depends_on = None
+
+area = sa.table('area', sa.column('Area_ID'), sa.column('Approval_Status'))
+area_approval = sa.table('area_approval', sa.column('Approval_ID'), sa.column('Area_ID'), sa.column('Status'))
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'Approval_Status' not in {column['name'] for column in inspector.get_columns('area')}:
+        with op.batch_alter_table('area', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('Approval_Status', sa.String(length=20), nullable=True))
+
+    latest_status = (
+        sa.select(area_approval.c.Status)
+        .where(area_approval.c.Area_ID == area.c.Area_ID)
+        .order_by(area_approval.c.Approval_ID.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    op.execute(area.update().values(Approval_Status=latest_status))
+
+    if 'ix_area_approval_status_created_at' not in {index['name'] for index in inspector.get_indexes('area')}:
+        with op.batch_alter_table('area', schema=None) as batch_op:
+            batch_op.create_index('ix_area_approval_status_created_at', ['Approval_Status', 'created_at', 'Area_ID'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        batch_op.drop_index('ix_area_approval_status_created_at')
+        batch_op.drop_column('Approval_Status')
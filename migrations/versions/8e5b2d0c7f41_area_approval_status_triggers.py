@@ -0,0 +1,51 @@
+"""triggers keeping area.Approval_Status current
+
+Revision ID: 8e5b2d0c7f41
+Revises: 7c4e1a9b6d30
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8e5b2d0c7f41'
+down_revision = '7c4e1a9b6d30'
+branch_labels = None
+depends_on = None
+
+# Kept in this file rather than imported, so the revision stays as written.
+REFRESH_AREAS = (
+    "UPDATE area SET Approval_Status = ("
+    "SELECT Status FROM area_approval WHERE area_approval.Area_ID = area.Area_ID "
+    "ORDER BY Approval_ID DESC LIMIT 1"
+    ") WHERE Area_ID IN ({area_ids})"
+)
+TRIGGERS = {
+    'area_approval_status_insert': ('INSERT', 'NEW.Area_ID'),
+    'area_approval_status_update': ('UPDATE', 'OLD.Area_ID, NEW.Area_ID'),
+    'area_approval_status_delete': ('DELETE', 'OLD.Area_ID'),
+}
+
+
+def upgrade():
+    dialect_name = op.get_bind().dialect.name
+    for name, (operation, area_ids) in TRIGGERS.items():
+        refresh = REFRESH_AREAS.format(area_ids=area_ids)
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        if dialect_name == 'mysql':
+            op.execute(f"CREATE TRIGGER {name} AFTER {operation} ON area_approval FOR EACH ROW {refresh}")
+        else:
+            op.execute(f"CREATE TRIGGER {name} AFTER {operation} ON area_approval FOR EACH ROW BEGIN {refresh}; END")
+
+    # Catch up on approvals written between the backfill and now.
+    op.execute(
+        "UPDATE area SET Approval_Status = ("
+        "SELECT Status FROM area_approval WHERE area_approval.Area_ID = area.Area_ID "
+        "ORDER BY Approval_ID DESC LIMIT 1)"
+    )
+
+
+def downgrade():
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
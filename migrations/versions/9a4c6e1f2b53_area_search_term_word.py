@@ -0,0 +1,99 @@
+"""area search trigrams keep their word
+
+Revision ID: 9a4c6e1f2b53
+Revises: 8e5b2d0c7f41
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4c6e1f2b53'
+down_revision = '8e5b2d0c7f41'
+branch_labels = None
+depends_on = None
+
+# Search tokenization as of this revision, kept here rather than imported
+# from search.py so the backfill does not change when search.py does.
+SEARCHABLE_FIELDS = {
+    'Area_Name': 3,
+    'Province': 2,
+    'Region': 1,
+}
+MAX_TERM_LENGTH = 64
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def _normalize_words(text):
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return [word[:MAX_TERM_LENGTH] for word in _NON_WORD.split(text) if word]
+
+
+def _trigrams(word):
+    padded = f"  {word}  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _build_terms(row):
+    """
+    Returns {(Kind, Term, Word): Weight} for one area row.
+    """
+    terms = {}
+    for field_name, weight in SEARCHABLE_FIELDS.items():
+        for word in _normalize_words(getattr(row, field_name)):
+            keys = [('w', word, None)] + [('t', gram, word) for gram in _trigrams(word)]
+            for key in keys:
+                if terms.get(key, 0) < weight:
+                    terms[key] = weight
+    return terms
+
+
+def upgrade():
+    # app.py runs db.create_all() on import, so the column may already exist.
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('area_search_term')}
+    if 'Word' not in columns:
+        with op.batch_alter_table('area_search_term', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('Word', sa.String(length=64), nullable=True))
+
+    # Trigrams are now padded on both sides and stored per word, so every
+    # area is re-tokenized.
+    op.execute('DELETE FROM area_search_term')
+    _backfill()
+
+
+def _backfill():
+    connection = op.get_bind()
+    area_table = sa.table('area',
+        sa.column('Area_ID', sa.Integer),
+        sa.column('Area_Name', sa.String),
+        sa.column('Region', sa.String),
+        sa.column('Province', sa.String),
+    )
+    term_table = sa.table('area_search_term',
+        sa.column('Area_ID', sa.Integer),
+        sa.column('Kind', sa.String),
+        sa.column('Term', sa.String),
+        sa.column('Word', sa.String),
+        sa.column('Weight', sa.Integer),
+    )
+    for row in connection.execute(sa.select(area_table)):
+        rows = [
+            {'Area_ID': row.Area_ID, 'Kind': kind, 'Term': term, 'Word': word, 'Weight': weight}
+            for (kind, term, word), weight in _build_terms(row).items()
+        ]
+        if rows:
+            connection.execute(term_table.insert(), rows)
+
+
+def downgrade():
+    with op.batch_alter_table('area_search_term', schema=None) as batch_op:
+        batch_op.drop_column('Word')
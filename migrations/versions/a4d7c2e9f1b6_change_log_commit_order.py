@@ -0,0 +1,80 @@
+"""change_log written in commit order from trigger-queued changes
+
+Revision ID: a4d7c2e9f1b6
+Revises: 9a4c6e1f2b53
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d7c2e9f1b6'
+down_revision = '9a4c6e1f2b53'
+branch_labels = None
+depends_on = None
+
+# Synced table -> (change_log entity, primary key), as of this revision.
+SYNCED_TABLES = {
+    'area': ('areas', 'Area_ID'),
+    'area_images': ('images', 'Image_ID'),
+    'area_approval': ('approvals', 'Approval_ID'),
+    'area_farm': ('farms', 'Farm_ID'),
+    'area_topography': ('topography', 'Area_Topography_ID'),
+    'farm_harvest_data': ('harvests', 'Harvest_ID'),
+}
+TRIGGER_EVENTS = {
+    'INSERT': ('NEW', 'upsert'),
+    'UPDATE': ('NEW', 'upsert'),
+    'DELETE': ('OLD', 'delete'),
+}
+
+
+def _triggers():
+    for table_name, (entity, primary_key) in SYNCED_TABLES.items():
+        for operation, (row, change) in TRIGGER_EVENTS.items():
+            queue = (
+                "INSERT INTO change_pending (Entity, Entity_ID, Operation) "
+                f"VALUES ('{entity}', {row}.{primary_key}, '{change}')"
+            )
+            yield f"{table_name}_sync_{operation.lower()}", operation, table_name, queue
+
+
+def upgrade():
+    bind = op.get_bind()
+    # app.py runs db.create_all() on import, so the tables may already exist.
+    inspector = sa.inspect(bind)
+    table_names = inspector.get_table_names()
+    if 'change_pending' not in table_names:
+        op.create_table('change_pending',
+        sa.Column('Pending_ID', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('Entity', sa.String(length=20), nullable=False),
+        sa.Column('Entity_ID', sa.Integer(), nullable=False),
+        sa.Column('Operation', sa.String(length=10), nullable=False),
+        sa.PrimaryKeyConstraint('Pending_ID')
+        )
+    if 'change_log_lock' not in table_names:
+        op.create_table('change_log_lock',
+        sa.Column('Lock_ID', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('Locked_At', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('Lock_ID')
+        )
+    lock_table = sa.table('change_log_lock', sa.column('Lock_ID', sa.Integer))
+    if bind.execute(sa.select(lock_table.c.Lock_ID).where(lock_table.c.Lock_ID == 1)).first() is None:
+        op.execute(lock_table.insert().values(Lock_ID=1))
+
+    dialect_name = bind.dialect.name
+    for trigger, operation, table_name, queue in _triggers():
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        if dialect_name == 'mysql':
+            op.execute(f"CREATE TRIGGER {trigger} AFTER {operation} ON {table_name} FOR EACH ROW {queue}")
+        else:
+            op.execute(f"CREATE TRIGGER {trigger} AFTER {operation} ON {table_name} FOR EACH ROW BEGIN {queue}; END")
+
+
+def downgrade():
+    for trigger, _, _, _ in _triggers():
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.drop_table('change_log_lock')
+    op.drop_table('change_pending')
@@ -0,0 +1,64 @@
+"""area response cache generation bumped by triggers
+
+Revision ID: b1e5f8a3c620
+Revises: a4d7c2e9f1b6
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1e5f8a3c620'
+down_revision = 'a4d7c2e9f1b6'
+branch_labels = None
+depends_on = None
+
+BUMP_GENERATION = "UPDATE area_cache_generation SET Generation = Generation + 1 WHERE Generation_ID = 1"
+# Table -> columns whose updates bump the generation (None: any update), as
+# of this revision. Image updates that only move Processing_Status do not.
+CACHED_TABLES = {
+    'area': None,
+    'area_approval': None,
+    'area_images': ('Image_ID', 'Area_ID', 'Filepath', 'Blob_SHA256', 'Thumbnail_Path', 'Medium_Path'),
+}
+
+
+def _triggers(dialect_name):
+    same = ' <=> ' if dialect_name == 'mysql' else ' IS '
+    for table_name, columns in CACHED_TABLES.items():
+        for operation in ('INSERT', 'UPDATE', 'DELETE'):
+            bump = BUMP_GENERATION
+            if operation == 'UPDATE' and columns:
+                bump += " AND NOT ({})".format(' AND '.join(f"NEW.{column}{same}OLD.{column}" for column in columns))
+            yield f"{table_name}_cache_{operation.lower()}", operation, table_name, bump
+
+
+def upgrade():
+    bind = op.get_bind()
+    # app.py runs db.create_all() on import, so the table may already exist.
+    inspector = sa.inspect(bind)
+    if 'area_cache_generation' not in inspector.get_table_names():
+        op.create_table('area_cache_generation',
+        sa.Column('Generation_ID', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('Generation', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('Generation_ID')
+        )
+    generation_table = sa.table('area_cache_generation', sa.column('Generation_ID', sa.Integer), sa.column('Generation', sa.BigInteger))
+    if bind.execute(sa.select(generation_table.c.Generation_ID).where(generation_table.c.Generation_ID == 1)).first() is None:
+        op.execute(generation_table.insert().values(Generation_ID=1, Generation=0))
+
+    dialect_name = bind.dialect.name
+    for trigger, operation, table_name, bump in _triggers(dialect_name):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        if dialect_name == 'mysql':
+            op.execute(f"CREATE TRIGGER {trigger} AFTER {operation} ON {table_name} FOR EACH ROW {bump}")
+        else:
+            op.execute(f"CREATE TRIGGER {trigger} AFTER {operation} ON {table_name} FOR EACH ROW BEGIN {bump}; END")
+
+
+def downgrade():
+    for trigger, _, _, _ in _triggers(op.get_bind().dialect.name):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.drop_table('area_cache_generation')
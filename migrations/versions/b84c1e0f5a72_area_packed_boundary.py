@@ -0,0 +1,96 @@
+"""area packed boundary
+
+Revision ID: b84c1e0f5a72
+Revises: 7b2e4d6a8c31
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+import struct
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b84c1e0f5a72'
+down_revision = '7b2e4d6a8c31'
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 50000
+
+area_table = sa.table('area',
+    sa.column('Area_ID', sa.Integer),
+    sa.column('Boundary', sa.LargeBinary),
+)
+coordinates_table = sa.table('area_coordinates',
+    sa.column('Area_Coordinate_ID', sa.Integer),
+    sa.column('Area_ID', sa.Integer),
+    sa.column('Latitude', sa.Float),
+    sa.column('Longitude', sa.Float),
+)
+
+
+def _pack_boundary(vertices):
+    # The area.Boundary layout as of this revision: little-endian float64
+    # (longitude, latitude) pairs in submission order.
+    flat = []
+    for latitude, longitude in vertices:
+        flat.append(longitude)
+        flat.append(latitude)
+    return struct.pack(f'<{len(flat)}d', *flat)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'Boundary' not in {column['name'] for column in inspector.get_columns('area')}:
+        with op.batch_alter_table('area', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('Boundary', sa.LargeBinary(length=16777215), nullable=True))
+
+    _backfill()
+
+
+def _backfill():
+    """
+    Walks area_coordinates in (Area_ID, Area_Coordinate_ID) order, packing
+    each area's vertices once all of its rows have been read.
+    """
+    connection = op.get_bind()
+    update = (
+        area_table.update()
+        .where(area_table.c.Area_ID == sa.bindparam('b_area_id'))
+        .values(Boundary=sa.bindparam('b_boundary'))
+    )
+
+    current_area_id = None
+    vertices = []
+    last_key = (0, 0)
+    while True:
+        rows = connection.execute(
+            sa.select(coordinates_table)
+            .where(sa.tuple_(coordinates_table.c.Area_ID, coordinates_table.c.Area_Coordinate_ID) > sa.tuple_(*last_key))
+            .order_by(coordinates_table.c.Area_ID, coordinates_table.c.Area_Coordinate_ID)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        packed = []
+        for row in rows:
+            if row.Area_ID != current_area_id:
+                if current_area_id is not None:
+                    packed.append({'b_area_id': current_area_id, 'b_boundary': _pack_boundary(vertices)})
+                current_area_id = row.Area_ID
+                vertices = []
+            vertices.append((row.Latitude, row.Longitude))
+        if packed:
+            connection.execute(update, packed)
+        last_key = (rows[-1].Area_ID, rows[-1].Area_Coordinate_ID)
+
+    if current_area_id is not None:
+        connection.execute(update, [{'b_area_id': current_area_id, 'b_boundary': _pack_boundary(vertices)}])
+
+
+def downgrade():
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        batch_op.drop_column('Boundary')
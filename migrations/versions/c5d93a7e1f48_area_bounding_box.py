@@ -0,0 +1,77 @@
+"""area bounding box
+
+Revision ID: c5d93a7e1f48
+Revises: b84c1e0f5a72
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import struct
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d93a7e1f48'
+down_revision = 'b84c1e0f5a72'
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 1000
+
+BBOX_COLUMNS = ('Min_Latitude', 'Min_Longitude', 'Max_Latitude', 'Max_Longitude')
+
+area_table = sa.table('area',
+    sa.column('Area_ID', sa.Integer),
+    sa.column('Boundary', sa.LargeBinary),
+    *[sa.column(name, sa.Float) for name in BBOX_COLUMNS]
+)
+
+
+def _bounding_box(boundary):
+    # Boundary holds little-endian float64 (longitude, latitude) pairs.
+    vertices = list(struct.iter_unpack('<2d', boundary))
+    if not vertices:
+        return None
+    longitudes = [longitude for longitude, _ in vertices]
+    latitudes = [latitude for _, latitude in vertices]
+    return min(latitudes), min(longitudes), max(latitudes), max(longitudes)
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('area')}
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        for name in BBOX_COLUMNS:
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, sa.Float(), nullable=True))
+
+    connection = op.get_bind()
+    update = (
+        area_table.update()
+        .where(area_table.c.Area_ID == sa.bindparam('b_area_id'))
+        .values({name: sa.bindparam(f'b_{name}') for name in BBOX_COLUMNS})
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(area_table.c.Area_ID, area_table.c.Boundary)
+            .where(area_table.c.Area_ID > last_id, area_table.c.Boundary.is_not(None))
+            .order_by(area_table.c.Area_ID)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            bbox = _bounding_box(row.Boundary)
+            if bbox:
+                params.append({'b_area_id': row.Area_ID, **{f'b_{name}': value for name, value in zip(BBOX_COLUMNS, bbox)}})
+        if params:
+            connection.execute(update, params)
+        last_id = rows[-1].Area_ID
+
+
+def downgrade():
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        for name in reversed(BBOX_COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,52 @@
+"""approval status triggers also touch area.updated_at
+
+Revision ID: c7f2a1d9e384
+Revises: b1e5f8a3c620
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f2a1d9e384'
+down_revision = 'b1e5f8a3c620'
+branch_labels = None
+depends_on = None
+
+# Kept in this file rather than imported, so the revision stays as written.
+REFRESH_AREAS = (
+    "UPDATE area SET Approval_Status = ("
+    "SELECT Status FROM area_approval WHERE area_approval.Area_ID = area.Area_ID "
+    "ORDER BY Approval_ID DESC LIMIT 1"
+    "){touch} WHERE Area_ID IN ({area_ids})"
+)
+LOCAL_NOW = {
+    'mysql': "NOW(6)",
+    'sqlite': "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')",
+}
+TRIGGERS = {
+    'area_approval_status_insert': ('INSERT', 'NEW.Area_ID'),
+    'area_approval_status_update': ('UPDATE', 'OLD.Area_ID, NEW.Area_ID'),
+    'area_approval_status_delete': ('DELETE', 'OLD.Area_ID'),
+}
+
+
+def _create_triggers(touch_updated_at):
+    dialect_name = op.get_bind().dialect.name
+    touch = f", updated_at = {LOCAL_NOW[dialect_name]}" if touch_updated_at else ""
+    for name, (operation, area_ids) in TRIGGERS.items():
+        refresh = REFRESH_AREAS.format(touch=touch, area_ids=area_ids)
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        if dialect_name == 'mysql':
+            op.execute(f"CREATE TRIGGER {name} AFTER {operation} ON area_approval FOR EACH ROW {refresh}")
+        else:
+            op.execute(f"CREATE TRIGGER {name} AFTER {operation} ON area_approval FOR EACH ROW BEGIN {refresh}; END")
+
+
+def upgrade():
+    _create_triggers(touch_updated_at=True)
+
+
+def downgrade():
+    _create_triggers(touch_updated_at=False)
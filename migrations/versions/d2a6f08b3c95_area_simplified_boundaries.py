@@ -0,0 +1,123 @@
+"""area simplified boundaries
+
+Revision ID: d2a6f08b3c95
+Revises: c5d93a7e1f48
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+import struct
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6f08b3c95'
+down_revision = 'c5d93a7e1f48'
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 1000
+
+area_table = sa.table('area',
+    sa.column('Area_ID', sa.Integer),
+    sa.column('Boundary', sa.LargeBinary),
+    sa.column('Boundary_Low', sa.LargeBinary),
+    sa.column('Boundary_Medium', sa.LargeBinary),
+)
+
+# Simplification as of this revision, kept here rather than imported from
+# geometry.py so the backfill does not change when geometry.py does.
+DETAIL_TOLERANCES = {
+    'low': 0.001,
+    'medium': 0.0001,
+}
+_VERTEX = struct.Struct('<2d')
+
+
+def _unpack_boundary(blob):
+    return [(latitude, longitude) for longitude, latitude in _VERTEX.iter_unpack(blob)]
+
+
+def _pack_boundary(vertices):
+    return b''.join(_VERTEX.pack(longitude, latitude) for latitude, longitude in vertices)
+
+
+def _segment_distance(point, start, end):
+    (py, px), (ay, ax), (by, bx) = point, start, end
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return ((px - (ax + t * dx)) ** 2 + (py - (ay + t * dy)) ** 2) ** 0.5
+
+
+def _simplify(vertices, tolerance):
+    """
+    Douglas-Peucker, never dropping a polygon below four vertices (or its
+    original count, if smaller).
+    """
+    count = len(vertices)
+    if count <= 4:
+        return list(vertices)
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, max_distance = None, tolerance
+        for index in range(first + 1, last):
+            distance = _segment_distance(vertices[index], vertices[first], vertices[last])
+            if distance > max_distance:
+                farthest, max_distance = index, distance
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    simplified = [vertex for vertex, kept in zip(vertices, keep) if kept]
+    if len(simplified) < 4:
+        simplified = [vertices[index] for index in sorted({0, count // 3, 2 * count // 3, count - 1})]
+    return simplified
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('area')}
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        for name in ('Boundary_Low', 'Boundary_Medium'):
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, sa.LargeBinary(length=16777215), nullable=True))
+
+    connection = op.get_bind()
+    update = (
+        area_table.update()
+        .where(area_table.c.Area_ID == sa.bindparam('b_area_id'))
+        .values(Boundary_Low=sa.bindparam('b_low'), Boundary_Medium=sa.bindparam('b_medium'))
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(area_table.c.Area_ID, area_table.c.Boundary)
+            .where(area_table.c.Area_ID > last_id, area_table.c.Boundary.is_not(None))
+            .order_by(area_table.c.Area_ID)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            vertices = _unpack_boundary(row.Boundary)
+            params.append({
+                'b_area_id': row.Area_ID,
+                'b_low': _pack_boundary(_simplify(vertices, DETAIL_TOLERANCES['low'])),
+                'b_medium': _pack_boundary(_simplify(vertices, DETAIL_TOLERANCES['medium'])),
+            })
+        connection.execute(update, params)
+        last_id = rows[-1].Area_ID
+
+
+def downgrade():
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        batch_op.drop_column('Boundary_Medium')
+        batch_op.drop_column('Boundary_Low')
@@ -0,0 +1,135 @@
+"""area geometry metrics
+
+Revision ID: e7f1b2c4d806
+Revises: d2a6f08b3c95
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7f1b2c4d806'
+down_revision = 'd2a6f08b3c95'
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = ('Centroid_Latitude', 'Centroid_Longitude', 'Perimeter_Meters', 'Computed_Hectares')
+CHUNK_SIZE = 1000
+
+# Metrics as of this revision, kept here rather than imported from
+# geometry_metrics.py so the backfill does not change when that does.
+EARTH_RADIUS_METERS = 6371008.8
+SQUARE_METERS_PER_HECTARE = 10000.0
+METRIC_COLUMNS = (
+    'Centroid_Latitude', 'Centroid_Longitude',
+    'Min_Latitude', 'Min_Longitude', 'Max_Latitude', 'Max_Longitude',
+    'Perimeter_Meters', 'Computed_Hectares',
+)
+area_table = sa.table('area',
+    sa.column('Area_ID', sa.Integer),
+    sa.column('Boundary', sa.LargeBinary),
+    *[sa.column(name, sa.Float) for name in METRIC_COLUMNS]
+)
+
+
+def _compute_metrics(boundaries):
+    """
+    METRIC_COLUMNS for each packed Boundary blob (None for empty ones).
+    """
+    coords = [np.frombuffer(blob, dtype='<f8').reshape(-1, 2) if blob else np.empty((0, 2)) for blob in boundaries]
+    counts = np.array([len(c) for c in coords], dtype=np.int64)
+    results = [None] * len(coords)
+    present = np.flatnonzero(counts)
+    if present.size == 0:
+        return results
+
+    counts = counts[present]
+    points = np.concatenate([coords[i] for i in present])
+    lng, lat = points[:, 0], points[:, 1]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    polygon_of = np.repeat(np.arange(counts.size), counts)
+
+    # Index of the next vertex on the same ring, wrapping back to its start.
+    next_index = np.arange(points.shape[0]) + 1
+    next_index[starts + counts - 1] = starts
+
+    lat_rad, lng_rad = np.radians(lat), np.radians(lng)
+    mean_lat = np.add.reduceat(lat_rad, starts) / counts
+    meters_per_lng_radian = EARTH_RADIUS_METERS * np.cos(mean_lat)
+    x = lng_rad * meters_per_lng_radian[polygon_of]
+    y = lat_rad * EARTH_RADIUS_METERS
+    # Measure from each ring's first vertex so the shoelace sums stay small.
+    origin_x, origin_y = x[starts], y[starts]
+    x = x - origin_x[polygon_of]
+    y = y - origin_y[polygon_of]
+
+    cross = x * y[next_index] - x[next_index] * y
+    signed_area = np.add.reduceat(cross, starts) / 2.0
+    degenerate = np.abs(signed_area) < 1e-6
+    six_area = 6.0 * np.where(degenerate, 1.0, signed_area)
+    centroid_x = np.add.reduceat((x + x[next_index]) * cross, starts) / six_area + origin_x
+    centroid_y = np.add.reduceat((y + y[next_index]) * cross, starts) / six_area + origin_y
+
+    # Lines and points have no area; fall back to the vertex mean.
+    centroid_lat = np.where(degenerate, np.add.reduceat(lat, starts) / counts, np.degrees(centroid_y / EARTH_RADIUS_METERS))
+    centroid_lng = np.where(degenerate, np.add.reduceat(lng, starts) / counts, np.degrees(centroid_x / meters_per_lng_radian))
+
+    half_dlat = (lat_rad[next_index] - lat_rad) / 2.0
+    half_dlng = (lng_rad[next_index] - lng_rad) / 2.0
+    haversine = np.sin(half_dlat) ** 2 + np.cos(lat_rad) * np.cos(lat_rad[next_index]) * np.sin(half_dlng) ** 2
+    edge_length = 2.0 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(haversine, 0.0, 1.0)))
+    perimeter = np.add.reduceat(edge_length, starts)
+
+    columns = (
+        centroid_lat, centroid_lng,
+        np.minimum.reduceat(lat, starts), np.minimum.reduceat(lng, starts),
+        np.maximum.reduceat(lat, starts), np.maximum.reduceat(lng, starts),
+        perimeter, np.abs(signed_area) / SQUARE_METERS_PER_HECTARE,
+    )
+    for position, index in enumerate(present):
+        results[index] = {name: float(values[position]) for name, values in zip(METRIC_COLUMNS, columns)}
+    return results
+
+
+def _backfill(connection):
+    statement = (
+        area_table.update()
+        .where(area_table.c.Area_ID == sa.bindparam('b_area_id'))
+        .values({name: sa.bindparam(f'b_{name}') for name in METRIC_COLUMNS})
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(area_table.c.Area_ID, area_table.c.Boundary)
+            .where(area_table.c.Area_ID > last_id, area_table.c.Boundary.is_not(None))
+            .order_by(area_table.c.Area_ID)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row, metrics in zip(rows, _compute_metrics([row.Boundary for row in rows])):
+            if metrics:
+                params.append({'b_area_id': row.Area_ID, **{f'b_{name}': value for name, value in metrics.items()}})
+        if params:
+            connection.execute(statement, params)
+        last_id = rows[-1].Area_ID
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('area')}
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        for name in NEW_COLUMNS:
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, sa.Float(), nullable=True))
+
+    _backfill(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        for name in reversed(NEW_COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,36 @@
+"""area image renditions
+
+Revision ID: f3a8c6d1e257
+Revises: e7f1b2c4d806
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8c6d1e257'
+down_revision = 'e7f1b2c4d806'
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = (
+    sa.Column('Thumbnail_Path', sa.Text(), nullable=True),
+    sa.Column('Medium_Path', sa.Text(), nullable=True),
+    sa.Column('Processing_Status', sa.String(length=20), nullable=True),
+)
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('area_images')}
+    with op.batch_alter_table('area_images', schema=None) as batch_op:
+        for column in NEW_COLUMNS:
+            if column.name not in existing:
+                batch_op.add_column(column)
+
+
+def downgrade():
+    with op.batch_alter_table('area_images', schema=None) as batch_op:
+        for column in reversed(NEW_COLUMNS):
+            batch_op.drop_column(column.name)
@@ -0,0 +1,80 @@
+import base64
+import datetime
+from sqlalchemy import tuple_
+
+from Database import area
+
+
+def encode_cursor(created_at, area_id):
+    """
+    Builds an opaque cursor token from the (created_at, Area_ID) pair of the
+    last row on a page.
+    """
+    raw = f"{created_at.isoformat()}|{area_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Reverses encode_cursor. Raises ValueError if the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        created_at_str, area_id_str = raw.split('|', 1)
+        return datetime.datetime.fromisoformat(created_at_str), int(area_id_str)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _page_statement(base, page, per_page, cursor, ranked_by):
+    # Works on both ORM queries and Core selects.
+    if cursor is None and ranked_by is not None:
+        statement = base.order_by(ranked_by.desc(), area.created_at, area.Area_ID)
+    else:
+        statement = base.order_by(area.created_at, area.Area_ID)
+
+    if cursor is None:
+        statement = statement.offset((page - 1) * per_page)
+    elif cursor:
+        last_created_at, last_area_id = decode_cursor(cursor)
+        statement = statement.filter(tuple_(area.created_at, area.Area_ID) > tuple_(last_created_at, last_area_id))
+
+    return statement.limit(per_page + 1)
+
+
+def _page_result(entries, per_page, cursor, ranked_by):
+    has_more = len(entries) > per_page
+    if has_more:
+        entries = entries[:-1]
+
+    next_cursor = None
+    if has_more and entries and (cursor is not None or ranked_by is None):
+        next_cursor = encode_cursor(entries[-1].created_at, entries[-1].Area_ID)
+
+    return entries, has_more, next_cursor
+
+
+def paginate_areas(base_query, page, per_page, cursor=None, ranked_by=None):
+    """
+    Runs base_query for one page of areas ordered by (created_at, Area_ID).
+
+    When cursor is None the legacy page/offset mode is used, and ranked_by
+    (e.g. a search score) takes precedence in the ordering if given. Otherwise
+    the page starts right after the row the cursor points to (an empty cursor
+    means the first page), so every page is a single range seek on
+    ix_area_created_at_area_id regardless of depth.
+
+    Returns (entries, has_more, next_cursor).
+    """
+    entries = _page_statement(base_query, page, per_page, cursor, ranked_by).all()
+    return _page_result(entries, per_page, cursor, ranked_by)
+
+
+def paginate_area_rows(session, base_select, page, per_page, cursor=None, ranked_by=None):
+    """
+    Same as paginate_areas for a Core select() over area columns (which must
+    include created_at and Area_ID); entries are Row tuples.
+    """
+    entries = session.execute(_page_statement(base_select, page, per_page, cursor, ranked_by)).all()
+    return _page_result(entries, per_page, cursor, ranked_by)
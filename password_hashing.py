@@ -0,0 +1,75 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from extensions import bcrypt
+
+DEFAULT_LOG_ROUNDS = 12
+DEFAULT_MAX_PENDING_PER_WORKER = 8
+DEFAULT_TIMEOUT_SECONDS = 10
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes are queued; the caller should answer 503 and let the client retry."""
+
+
+def hash_cost(hashed):
+    """
+    Cost factor of a bcrypt hash ($2b$12$...), or None if it is not one.
+    """
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, bounded thread pool. bcrypt releases the GIL,
+    so the pool size caps how many cores a login burst can take while
+    request threads stay free for cheap endpoints. Work beyond max_pending
+    (queued plus running) is refused at once with PasswordHasherBusy
+    instead of piling up behind the pool.
+    """
+
+    def __init__(self):
+        self.rounds = DEFAULT_LOG_ROUNDS
+        self.workers = 0
+        self.timeout = DEFAULT_TIMEOUT_SECONDS
+        self.executor = None
+        self._slots = None
+
+    def init_app(self, app):
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS') or min(4, os.cpu_count() or 1)
+        max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING') or self.workers * DEFAULT_MAX_PENDING_PER_WORKER
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT_SECONDS', DEFAULT_TIMEOUT_SECONDS)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self.executor.submit(function, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is freed when the hash finishes, even if the caller timed out.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise PasswordHasherBusy()
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def check(self, hashed, password):
+        return self._run(bcrypt.check_password_hash, hashed, password)
+
+    def needs_rehash(self, hashed):
+        return hash_cost(hashed) != self.rounds
+
+
+password_hasher = PasswordHasher()
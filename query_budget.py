@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def _budget():
+    if has_request_context() and not g.get('query_budget_paused'):
+        return g.get('query_budget')
+    return None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    budget = _budget()
+    if budget is not None:
+        budget['statements'] += 1
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _count_fetched_rows(orm_execute_state):
+    """
+    Counts the rows a session SELECT fetches, whether it loads ORM objects,
+    relationship batches or plain Core rows. Only runs under a budget,
+    since the result is buffered to count it.
+    """
+    budget = _budget()
+    if budget is None or not orm_execute_state.is_select:
+        return None
+    frozen = orm_execute_state.invoke_statement().freeze()
+    budget['rows'] += len(frozen.data)
+    return frozen()
+
+
+@contextmanager
+def unbudgeted():
+    """
+    Excludes the statements and rows inside the block from the current
+    budget, for shared upkeep such as refreshing an in-process index that
+    happens to run inside a request.
+    """
+    paused = g.get('query_budget_paused', False)
+    g.query_budget_paused = True
+    try:
+        yield
+    finally:
+        g.query_budget_paused = paused
+
+
+def _strict():
+    # Not app.debug: the development server always runs with debug on.
+    return current_app.config.get('QUERY_BUDGET_STRICT') or current_app.testing
+
+
+def query_budget(max_statements=None, max_rows=None):
+    """
+    Caps the number of SQL statements and rows fetched a view may issue.
+    Either limit may be a callable, evaluated in the request, for views
+    whose size depends on their arguments (e.g. per_page). Going over
+    budget raises QueryBudgetExceeded when QUERY_BUDGET_STRICT or TESTING
+    is set, so tests fail on eager-loading regressions in hot endpoints,
+    and is logged as a warning otherwise.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.query_budget = {'statements': 0, 'rows': 0}
+            try:
+                response = view(*args, **kwargs)
+            finally:
+                used = g.pop('query_budget')
+
+            statement_limit = max_statements() if callable(max_statements) else max_statements
+            row_limit = max_rows() if callable(max_rows) else max_rows
+            over_statements = statement_limit is not None and used['statements'] > statement_limit
+            over_rows = row_limit is not None and used['rows'] > row_limit
+            if over_statements or over_rows:
+                message = (
+                    f"Query budget exceeded in {view.__name__}: "
+                    f"{used['statements']}/{statement_limit if statement_limit is not None else '-'} statements, "
+                    f"{used['rows']}/{row_limit if row_limit is not None else '-'} rows"
+                )
+                if _strict():
+                    raise QueryBudgetExceeded(message)
+                current_app.logger.warning(message)
+            return response
+        return wrapper
+    return decorator
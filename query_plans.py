@@ -0,0 +1,71 @@
+import datetime
+import re
+from sqlalchemy import select
+
+from Database import users, area, areaImages, areaFarm, areaApproval, areaTopography, normalize_email
+from export import export_select
+from pagination import _page_statement, encode_cursor
+from read_repository import IMAGE_COLUMNS, area_select, harvests_for_area_select, harvests_for_farm_select
+
+SAMPLE_IDS = [1, 2, 3]
+_SQLITE_FULL_SCAN = re.compile(r'^SCAN (\S+)(?: AS \S+)?$')
+
+
+# Statement name -> builder, mirroring what the hot endpoints execute.
+HOT_QUERIES = {
+    'login': lambda: select(users).where(users.Email_Normalized == normalize_email('someone@example.com')),
+    'areas page': lambda: _page_statement(area_select('low'), 1, 10, None, None),
+    'areas keyset page': lambda: _page_statement(
+        area_select('low'), 1, 10, encode_cursor(datetime.datetime(2024, 1, 1), 1), None
+    ),
+    'approved areas page': lambda: _page_statement(
+        area_select('low').where(area.Approval_Status == "Approved"), 1, 10, None, None
+    ),
+    'approved areas keyset page': lambda: _page_statement(
+        area_select('low').where(area.Approval_Status == "Approved"), 1, 10,
+        encode_cursor(datetime.datetime(2024, 1, 1), 1), None
+    ),
+    'area images': lambda: select(*IMAGE_COLUMNS).where(areaImages.Area_ID.in_(SAMPLE_IDS)).order_by(areaImages.Image_ID),
+    'area farms': lambda: select(areaFarm).where(areaFarm.Area_ID.in_(SAMPLE_IDS)),
+    'area approvals': lambda: select(areaApproval).where(areaApproval.Area_ID.in_(SAMPLE_IDS)),
+    'area topography': lambda: select(areaTopography).where(areaTopography.Area_ID.in_(SAMPLE_IDS)),
+    'export batch by status': lambda: (
+        export_select(status='Approved').where(area.Area_ID > 0).order_by(area.Area_ID).limit(1000)
+    ),
+    'harvests for area': lambda: harvests_for_area_select(1, 'Ongoing'),
+    'harvests for farm': lambda: harvests_for_farm_select(1),
+}
+
+
+def explain(connection, statement):
+    """
+    Runs the database's EXPLAIN for statement and returns the plan rows.
+    """
+    dialect = connection.dialect
+    compiled = statement.compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+    return connection.exec_driver_sql(prefix + compiled.string, params).all()
+
+
+def full_scans(connection, plan):
+    """
+    Tables the plan reads in full: MySQL's access type ALL, or a SQLite
+    SCAN that is not driven by an index.
+    """
+    if connection.dialect.name == 'sqlite':
+        return [match.group(1) for match in (_SQLITE_FULL_SCAN.match(row[-1]) for row in plan) if match]
+    return [row._mapping['table'] for row in plan if row._mapping.get('type') == 'ALL']
+
+
+def check_hot_queries(connection):
+    """
+    Returns {query name: (plan rows, fully scanned tables)} for HOT_QUERIES.
+    """
+    results = {}
+    for name, build in HOT_QUERIES.items():
+        plan = explain(connection, build())
+        results[name] = (plan, full_scans(connection, plan))
+    return results
@@ -0,0 +1,142 @@
+from sqlalchemy import select
+from marshmallow import fields
+
+from Database import area, areaImages, areaFarm, farmHarvestData, area_schemas_by_detail, image_schema
+from serializers import compile_schema
+
+IN_CHUNK_SIZE = 1000
+
+BOUNDARY_COLUMNS = {
+    'low': area.Boundary_Low,
+    'medium': area.Boundary_Medium,
+    'full': area.Boundary,
+}
+
+
+def _schema_columns(model, schema):
+    # Plain fields are named after the model's columns.
+    return tuple(
+        getattr(model, field.attribute or field.name)
+        for field in schema.dump_fields.values()
+        if not isinstance(field, (fields.Method, fields.Nested))
+    )
+
+
+# Method fields read the boundary (added per detail level) and the image
+# paths, which are plain fields already.
+AREA_COLUMNS = _schema_columns(area, area_schemas_by_detail['full'])
+IMAGE_COLUMNS = (areaImages.Area_ID,) + _schema_columns(areaImages, image_schema)
+
+_area_row_serializers = {
+    detail: compile_schema(schema, exclude=('images',)) for detail, schema in area_schemas_by_detail.items()
+}
+_image_row_serializer = compile_schema(image_schema)
+
+HARVEST_COLUMNS = (
+    farmHarvestData.Harvest_ID,
+    farmHarvestData.Farm_ID,
+    farmHarvestData.Crop,
+    farmHarvestData.Sow_Date,
+    farmHarvestData.Harvest_Date,
+    farmHarvestData.Status,
+)
+
+
+def area_select(detail='full'):
+    """
+    Core select of exactly the area columns the area schema for this detail
+    level dumps, ready for the same filters and search joins as area.query.
+    """
+    return select(*AREA_COLUMNS, BOUNDARY_COLUMNS[detail])
+
+
+def images_by_area(session, area_ids):
+    """
+    Returns {Area_ID: [serialized image, ...]} in Image_ID order, fetched as
+    plain rows in IN batches.
+    """
+    grouped = {}
+    area_ids = list(area_ids)
+    for start in range(0, len(area_ids), IN_CHUNK_SIZE):
+        rows = session.execute(
+            select(*IMAGE_COLUMNS)
+            .where(areaImages.Area_ID.in_(area_ids[start:start + IN_CHUNK_SIZE]))
+            .order_by(areaImages.Image_ID)
+        )
+        for row in rows:
+            grouped.setdefault(row.Area_ID, []).append(_image_row_serializer(row))
+    return grouped
+
+
+def assemble_areas(session, rows, detail='full'):
+    """
+    Builds the same dicts as the area schema for this detail level from
+    area_select() rows, attaching images grouped by Area_ID. No ORM objects
+    or identity-map entries are created.
+    """
+    if not rows:
+        return []
+    serialize = _area_row_serializers[detail]
+    images = images_by_area(session, [row.Area_ID for row in rows])
+    entries = []
+    for row in rows:
+        entry = serialize(row)
+        entry['images'] = images.get(row.Area_ID, [])
+        entries.append(entry)
+    return entries
+
+
+def harvest_to_dict(row):
+    # Mirrors farmHarvestData.to_dict.
+    return {
+        'Harvest_ID': row.Harvest_ID,
+        'Farm_ID': row.Farm_ID,
+        'Status': row.Status,
+        'Crop': row.Crop,
+        'Sow_Date': row.Sow_Date.isoformat() if row.Sow_Date else None,
+        'Harvest_Date': row.Harvest_Date.isoformat() if row.Harvest_Date else None,
+    }
+
+
+def harvests_for_farm_select(farm_id):
+    return select(*HARVEST_COLUMNS).where(farmHarvestData.Farm_ID == farm_id)
+
+
+def harvests_for_farm(session, farm_id):
+    return session.execute(harvests_for_farm_select(farm_id)).all()
+
+
+def harvests_for_area_select(area_id, status=None):
+    """
+    One statement resolving the area's farm and its (matching) harvests,
+    outer-joined so a farm without harvests still yields its Farm_ID.
+    """
+    farm_id = (
+        select(areaFarm.Farm_ID)
+        .where(areaFarm.Area_ID == area_id)
+        .order_by(areaFarm.Farm_ID)
+        .limit(1)
+        .scalar_subquery()
+    )
+    join_condition = farmHarvestData.Farm_ID == areaFarm.Farm_ID
+    if status is not None:
+        join_condition &= farmHarvestData.Status == status
+    return (
+        select(areaFarm.Farm_ID.label('Area_Farm_ID'), *HARVEST_COLUMNS)
+        .select_from(areaFarm)
+        .outerjoin(farmHarvestData, join_condition)
+        .where(areaFarm.Farm_ID == farm_id)
+        .order_by(farmHarvestData.Harvest_ID)
+    )
+
+
+def harvests_for_area(session, area_id, status=None):
+    """
+    Resolves the area's farm and fetches its harvests in one statement.
+    Returns (farm_id, rows); farm_id is None if the area has no farm, and
+    rows is empty if the farm has no (matching) harvests.
+    """
+    rows = session.execute(harvests_for_area_select(area_id, status)).all()
+    if not rows:
+        return None, []
+    return rows[0].Area_Farm_ID, [row for row in rows if row.Harvest_ID is not None]
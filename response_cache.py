@@ -0,0 +1,239 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, request
+from sqlalchemy import event, insert, select
+
+from Database import area, areaApproval, areaCacheGeneration, areaImages
+from compression import compress_bytes, encoded_etag, negotiate_encoding
+from extensions import db
+from triggers import create_trigger
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 1024
+
+AREA_CACHE_GENERATION_ID = 1
+# Any change to these rows can alter a cached area response, except image
+# updates that only move Processing_Status: the pipeline commits one per photo.
+AREA_CACHE_TABLES = (area.__tablename__, areaApproval.__tablename__, areaImages.__tablename__)
+_IGNORED_COLUMNS = {areaImages.__tablename__: ('Processing_Status', 'updated_at')}
+_BUMP_GENERATION = (
+    "UPDATE area_cache_generation SET Generation = Generation + 1 "
+    f"WHERE Generation_ID = {AREA_CACHE_GENERATION_ID}"
+)
+
+
+class LocalBackend:
+    """
+    Thread-safe in-process LRU with a per-entry TTL.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def entry_count(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Shares cached responses between workers through a Redis-compatible
+    server.
+    """
+
+    def __init__(self, url, prefix='area-cache'):
+        if redis is None:
+            raise RuntimeError("AREA_CACHE_URL is set but the 'redis' package is not installed.")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(f"{self.prefix}:{key}")
+
+    def set(self, key, value, ttl):
+        self.client.set(f"{self.prefix}:{key}", value, ex=ttl)
+
+    def entry_count(self):
+        # Counting would mean a keyspace scan; Redis reports this itself.
+        return None
+
+
+class AreaResponseCache:
+    """
+    Caches the serialized JSON body of area read endpoints together with a
+    strong ETag. A hit costs one primary-key read of the shared generation
+    and no schema work, and a matching If-None-Match gets an empty 304.
+
+    The generation is part of every key and lives in the database, bumped
+    by triggers on the area tables, so writes from any worker, trigger or
+    plain SQL invalidate every worker's entries; stale ones are simply
+    never read again and age out.
+    """
+
+    def __init__(self):
+        self.backend = LocalBackend()
+        self.ttl = DEFAULT_TTL_SECONDS
+        self.enabled = True
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'invalidations': 0}
+        self._stats_lock = threading.Lock()
+        self._seen_generation = None
+
+    def init_app(self, app):
+        self.ttl = app.config.get('AREA_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+        self.enabled = self.ttl > 0
+        if app.config.get('AREA_CACHE_URL'):
+            self.backend = RedisBackend(app.config['AREA_CACHE_URL'])
+        else:
+            self.backend = LocalBackend(app.config.get('AREA_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _key(self, generation):
+        view_args = sorted((request.view_args or {}).items())
+        query_args = sorted(request.args.items(multi=True))
+        raw = f"{request.endpoint}|{view_args}|{query_args}"
+        return f"{generation}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    def _encoded_body(self, key, body, encoding):
+        # Compressed variants are cached next to the plain body, so each
+        # encoding is paid for once per generation.
+        variant_key = f"{key}:{encoding}"
+        encoded = self.backend.get(variant_key)
+        if encoded is None:
+            encoded = compress_bytes(body, encoding)
+            self.backend.set(variant_key, encoded, self.ttl)
+        return encoded
+
+    def _respond(self, key, etag, body, status):
+        encoding = negotiate_encoding(len(body))
+        etag = encoded_etag(etag, encoding)
+        if request.if_none_match.contains(etag):
+            self._count('not_modified')
+            response = Response(status=304)
+        elif encoding:
+            response = Response(self._encoded_body(key, body, encoding), mimetype='application/json')
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        # Responses are behind a JWT: clients may keep them but must revalidate.
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.headers['X-Cache'] = status
+        return response
+
+    def generation(self):
+        generation = db.session.execute(
+            select(areaCacheGeneration.Generation).where(areaCacheGeneration.Generation_ID == AREA_CACHE_GENERATION_ID)
+        ).scalar() or 0
+        with self._stats_lock:
+            if self._seen_generation is not None and generation != self._seen_generation:
+                self.stats['invalidations'] += 1
+            self._seen_generation = generation
+        return generation
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return view(*args, **kwargs)
+
+            # Read the generation before querying so a response built while
+            # an invalidating commit lands is filed under the old generation.
+            key = self._key(self.generation())
+            entry = self.backend.get(key)
+            if entry is not None:
+                self._count('hits')
+                etag, body = entry.split(b'\n', 1)
+                return self._respond(key, etag.decode(), body, 'HIT')
+
+            self._count('misses')
+            result = view(*args, **kwargs)
+            response, status_code = result if isinstance(result, tuple) else (result, 200)
+            if status_code != 200:
+                return result
+
+            body = response.get_data()
+            etag = hashlib.sha256(body).hexdigest()
+            self.backend.set(key, etag.encode() + b'\n' + body, self.ttl)
+            return self._respond(key, etag, body, 'MISS')
+        return wrapper
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+        stats['backend'] = type(self.backend).__name__
+        stats['entries'] = self.backend.entry_count()
+        stats['ttl_seconds'] = self.ttl
+        return stats
+
+
+area_cache = AreaResponseCache()
+
+
+def area_cache_trigger_ddl(dialect_name, table_names=None):
+    """
+    DROP/CREATE statements for the triggers that bump the generation on
+    every insert, update and delete on AREA_CACHE_TABLES (or on those in
+    table_names), on MySQL or SQLite.
+    """
+    statements = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in AREA_CACHE_TABLES or (table_names is not None and table.name not in table_names):
+            continue
+        for operation in ('INSERT', 'UPDATE', 'DELETE'):
+            trigger = f"{table.name}_cache_{operation.lower()}"
+            bump = _BUMP_GENERATION
+            ignored = _IGNORED_COLUMNS.get(table.name)
+            if operation == 'UPDATE' and ignored:
+                same = ' <=> ' if dialect_name == 'mysql' else ' IS '
+                unchanged = ' AND '.join(
+                    f"NEW.{column.name}{same}OLD.{column.name}" for column in table.columns if column.name not in ignored
+                )
+                bump += f" AND NOT ({unchanged})"
+            statements.append(f"DROP TRIGGER IF EXISTS {trigger}")
+            statements.append(create_trigger(dialect_name, trigger, operation, table.name, bump))
+    return statements
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_area_cache_triggers(metadata, connection, tables=(), **kwargs):
+    # Tables made by create_all get the same triggers as migrated ones.
+    created = {table.name for table in tables}
+    if areaCacheGeneration.__tablename__ in created:
+        connection.execute(insert(areaCacheGeneration).values(Generation_ID=AREA_CACHE_GENERATION_ID, Generation=0))
+    for statement in area_cache_trigger_ddl(connection.dialect.name, created):
+        connection.exec_driver_sql(statement)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+SESSIONS_DIR_NAME = '.sessions'
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_SESSION_TTL_SECONDS = 24 * 60 * 60
+COPY_BUFFER_SIZE = 64 * 1024
+
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadSessionError(Exception):
+    """Raised for requests that do not fit the upload session's state."""
+
+
+class ChunkStore:
+    """
+    Filesystem store for resumable upload sessions.
+
+    Each session is a directory holding meta.json and one file per received
+    chunk, so any worker sharing the upload volume can continue a session
+    and a dropped connection only costs the chunk that was in flight.
+    """
+
+    def __init__(self, root, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.root = root
+        self.chunk_size = chunk_size
+
+    def _session_dir(self, upload_id):
+        if not _UPLOAD_ID.match(upload_id or ''):
+            raise UploadSessionError("Unknown upload session.")
+        return os.path.join(self.root, upload_id)
+
+    def _chunk_path(self, upload_id, index):
+        return os.path.join(self._session_dir(upload_id), f"{index:06d}.chunk")
+
+    def create(self, **meta):
+        upload_id = uuid.uuid4().hex
+        session_dir = os.path.join(self.root, upload_id)
+        os.makedirs(session_dir)
+        meta.update({
+            'upload_id': upload_id,
+            'chunk_size': self.chunk_size,
+            'chunk_count': max(1, -(-meta['total_size'] // self.chunk_size)),
+            'created_at': time.time(),
+        })
+        with open(os.path.join(session_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        return meta
+
+    def load(self, upload_id):
+        try:
+            with open(os.path.join(self._session_dir(upload_id), 'meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadSessionError("Unknown upload session.")
+
+    def expected_chunk_length(self, meta, index):
+        if not 0 <= index < meta['chunk_count']:
+            raise UploadSessionError(f"Chunk index must be between 0 and {meta['chunk_count'] - 1}.")
+        return min(meta['chunk_size'], meta['total_size'] - index * meta['chunk_size'])
+
+    def write_chunk(self, meta, index, stream):
+        """
+        Streams one chunk from stream into the session. The chunk only becomes
+        visible once it has been fully received with the expected length.
+        """
+        expected = self.expected_chunk_length(meta, index)
+        final_path = self._chunk_path(meta['upload_id'], index)
+        partial_path = f"{final_path}.{uuid.uuid4().hex}.tmp"
+        received = 0
+        try:
+            with open(partial_path, 'wb') as f:
+                while True:
+                    data = stream.read(COPY_BUFFER_SIZE)
+                    if not data:
+                        break
+                    received += len(data)
+                    if received > expected:
+                        break
+                    f.write(data)
+            if received != expected:
+                raise UploadSessionError(f"Chunk {index} must be exactly {expected} bytes.")
+            os.replace(partial_path, final_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    def received_chunks(self, meta):
+        session_dir = self._session_dir(meta['upload_id'])
+        return sorted(int(name.split('.')[0]) for name in os.listdir(session_dir) if name.endswith('.chunk'))
+
+    def status(self, meta):
+        received = set(self.received_chunks(meta))
+        missing = [index for index in range(meta['chunk_count']) if index not in received]
+        return {
+            'upload_id': meta['upload_id'],
+            'chunk_size': meta['chunk_size'],
+            'chunk_count': meta['chunk_count'],
+            'total_size': meta['total_size'],
+            'received_chunks': sorted(received),
+            'missing_chunks': missing,
+            'missing_offsets': [index * meta['chunk_size'] for index in missing],
+            'received_bytes': sum(self.expected_chunk_length(meta, index) for index in received),
+        }
+
+    def assemble(self, meta, destination):
+        """
+        Concatenates every chunk into destination, verifying the declared
+        SHA-256 if the client sent one. Returns the hex digest.
+        """
+        if self.status(meta)['missing_chunks']:
+            raise UploadSessionError("Upload is incomplete.")
+        digest = hashlib.sha256()
+        partial_path = f"{destination}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(partial_path, 'wb') as out:
+                for index in range(meta['chunk_count']):
+                    with open(self._chunk_path(meta['upload_id'], index), 'rb') as chunk:
+                        while True:
+                            data = chunk.read(COPY_BUFFER_SIZE)
+                            if not data:
+                                break
+                            digest.update(data)
+                            out.write(data)
+            if meta.get('sha256') and meta['sha256'].lower() != digest.hexdigest():
+                raise UploadSessionError("Assembled file does not match the declared sha256.")
+            os.replace(partial_path, destination)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        return digest.hexdigest()
+
+    def delete(self, upload_id):
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+
+    def collect_garbage(self, max_age_seconds=DEFAULT_SESSION_TTL_SECONDS):
+        """
+        Removes sessions whose last activity is older than max_age_seconds.
+        Returns the number of sessions removed.
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for upload_id in os.listdir(self.root):
+            session_dir = os.path.join(self.root, upload_id)
+            try:
+                last_activity = max(os.path.getmtime(os.path.join(session_dir, name)) for name in os.listdir(session_dir))
+            except (OSError, ValueError):
+                last_activity = 0
+            if last_activity < cutoff:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                removed += 1
+        return removed
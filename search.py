@@ -0,0 +1,187 @@
+import re
+import unicodedata
+from flask import current_app
+from sqlalchemy import case, delete, distinct, event, false, func, insert, inspect, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from Database import area, areaSearchTerm
+
+SEARCH_MODES = ('prefix', 'fuzzy')
+
+# Field -> rank weight. A hit on the area name outranks a hit on its province.
+SEARCHABLE_FIELDS = {
+    'Area_Name': 3,
+    'Province': 2,
+    'Region': 1,
+}
+
+MAX_TERM_LENGTH = 64
+DEFAULT_FUZZY_THRESHOLD = 0.25
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_words(text):
+    """
+    Lowercases, strips accents and splits text into alphanumeric words.
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return [word[:MAX_TERM_LENGTH] for word in _NON_WORD.split(text) if word]
+
+
+def trigrams(word):
+    # Padding on both sides gives the first and last letters trigrams of
+    # their own, which is most of the signal in a short word.
+    padded = f"  {word}  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_terms(area_obj):
+    """
+    Returns {(Kind, Term, Word): Weight} for one area, keeping the highest
+    field weight when a term appears in several fields. Trigrams carry the
+    word they came from so fuzzy matching can score word against word;
+    whole words have a Word of None.
+    """
+    terms = {}
+    for field_name, weight in SEARCHABLE_FIELDS.items():
+        for word in normalize_words(getattr(area_obj, field_name)):
+            keys = [('w', word, None)] + [('t', gram, word) for gram in trigrams(word)]
+            for key in keys:
+                if terms.get(key, 0) < weight:
+                    terms[key] = weight
+    return terms
+
+
+def reindex_area(connection, area_obj):
+    connection.execute(delete(areaSearchTerm).where(areaSearchTerm.Area_ID == area_obj.Area_ID))
+    rows = [
+        {'Area_ID': area_obj.Area_ID, 'Kind': kind, 'Term': term, 'Word': word, 'Weight': weight}
+        for (kind, term, word), weight in build_terms(area_obj).items()
+    ]
+    if rows:
+        connection.execute(insert(areaSearchTerm), rows)
+
+
+def _search_fields_changed(area_obj):
+    state = inspect(area_obj)
+    return any(state.attrs[field_name].history.has_changes() for field_name in SEARCHABLE_FIELDS)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    """
+    Keeps area_search_term in step with area inserts and renames, inside the
+    same transaction as the area write.
+    """
+    pending = [obj for obj in session.new if isinstance(obj, area)]
+    pending += [obj for obj in session.dirty if isinstance(obj, area) and _search_fields_changed(obj)]
+    if not pending:
+        return
+    connection = session.connection()
+    for area_obj in pending:
+        reindex_area(connection, area_obj)
+
+
+def rebuild_search_index(session, chunk_size=1000):
+    """
+    Re-tokenizes every area. Used to backfill the index for rows written
+    before it existed.
+    """
+    connection = session.connection()
+    columns = [area.Area_ID] + [getattr(area, field_name) for field_name in SEARCHABLE_FIELDS]
+    last_id = 0
+    total = 0
+    while True:
+        rows = connection.execute(
+            select(*columns).where(area.Area_ID > last_id).order_by(area.Area_ID).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            reindex_area(connection, row)
+        last_id = rows[-1].Area_ID
+        total += len(rows)
+    return total
+
+
+def _prefix_matches(words):
+    per_word = []
+    for position, word in enumerate(words):
+        exact_bonus = case((areaSearchTerm.Term == word, areaSearchTerm.Weight), else_=0)
+        per_word.append(
+            select(
+                areaSearchTerm.Area_ID.label('Area_ID'),
+                literal(position).label('position'),
+                func.max(areaSearchTerm.Weight + exact_bonus).label('score'),
+            )
+            .where(areaSearchTerm.Kind == 'w', areaSearchTerm.Term.startswith(word, autoescape=True))
+            .group_by(areaSearchTerm.Area_ID)
+        )
+    hits = union_all(*per_word).subquery()
+    return (
+        select(hits.c.Area_ID, func.sum(hits.c.score).label('score'))
+        .group_by(hits.c.Area_ID)
+        .having(func.count(distinct(hits.c.position)) == len(words))
+        .subquery()
+    )
+
+
+def _fuzzy_matches(words):
+    threshold = current_app.config.get('SEARCH_FUZZY_THRESHOLD', DEFAULT_FUZZY_THRESHOLD)
+    per_word = []
+    for position, word in enumerate(words):
+        query_grams = trigrams(word)
+        shared = func.count(areaSearchTerm.Term)
+        # A padded word has len + 2 trigrams, counting repeats.
+        word_grams = func.length(areaSearchTerm.Word) + 2
+        similarity = shared * 1.0 / (len(query_grams) + word_grams - shared)
+        per_word.append(
+            select(
+                areaSearchTerm.Area_ID.label('Area_ID'),
+                literal(position).label('position'),
+                (similarity * 10 + func.max(areaSearchTerm.Weight)).label('score'),
+            )
+            .where(areaSearchTerm.Kind == 't', areaSearchTerm.Term.in_(query_grams))
+            .group_by(areaSearchTerm.Area_ID, areaSearchTerm.Word)
+            .having(similarity >= threshold)
+        )
+    hits = union_all(*per_word).subquery()
+    best = (
+        select(hits.c.Area_ID, hits.c.position, func.max(hits.c.score).label('score'))
+        .group_by(hits.c.Area_ID, hits.c.position)
+        .subquery()
+    )
+    return (
+        select(best.c.Area_ID, func.sum(best.c.score).label('score'))
+        .group_by(best.c.Area_ID)
+        .having(func.count(best.c.position) == len(words))
+        .subquery()
+    )
+
+
+def apply_search(query, search_query, mode='prefix'):
+    """
+    Restricts an area query to rows matching search_query through the
+    area_search_term index.
+
+    'prefix' requires every query word to prefix a word of the area name,
+    province or region. 'fuzzy' requires every query word to be similar to
+    one of those words, so typos still hit: similarity is shared trigrams
+    over all distinct trigrams of the pair, as in pg_trgm, and must reach
+    SEARCH_FUZZY_THRESHOLD. Returns (query, score_column); higher scores rank first.
+    Raises ValueError for an unknown mode.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}'")
+
+    words = normalize_words(search_query)
+    if not words:
+        return query.filter(false()), None
+
+    matches = _prefix_matches(words) if mode == 'prefix' else _fuzzy_matches(words)
+    query = query.join(matches, area.Area_ID == matches.c.Area_ID)
+    return query, matches.c.score
@@ -0,0 +1,132 @@
+import decimal
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import fields
+
+from Database import (area_schemas_by_detail, area_coordinate_schema, image_schema, farm_schema,
+                      approval_schema, topography_schema, harvest_schema)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _integer(value):
+    return int(value)
+
+
+def _float(value):
+    return float(value)
+
+
+def _string(value):
+    return str(value)
+
+
+def _iso_datetime(value):
+    return value.isoformat()
+
+
+def _decimal(value):
+    # marshmallow hands jsonify a Decimal, which Flask encodes as str().
+    return str(decimal.Decimal(str(value)))
+
+
+_CONVERTERS = {
+    fields.Integer: _integer,
+    fields.Float: _float,
+    fields.String: _string,
+    fields.Decimal: _decimal,
+}
+
+
+def _converter_for(field):
+    if isinstance(field, fields.DateTime):
+        if field.format not in (None, 'iso'):
+            raise TypeError(f"Unsupported DateTime format {field.format!r} on {field.name}")
+        return _iso_datetime
+    for field_type in type(field).__mro__:
+        if field_type in _CONVERTERS:
+            return _CONVERTERS[field_type]
+    raise TypeError(f"No fast converter for {type(field).__name__} field {field.name}")
+
+
+def compile_schema(schema, exclude=()):
+    """
+    Builds a plain function equivalent to schema.dump(obj) for the field
+    types our schemas use. The field list, converters and method fields are
+    resolved once here, so dumping an object is a single pass over a tuple
+    instead of marshmallow's per-field dispatch. Unsupported field types
+    fail at import time rather than drifting from the schema silently.
+
+    Any object exposing the schema's attributes works, including Core Row
+    tuples; fields named in exclude are left out.
+    """
+    plan = []
+    for key, field in schema.dump_fields.items():
+        if key in exclude:
+            continue
+        attribute = field.attribute or field.name
+        if isinstance(field, fields.Method):
+            plan.append((key, None, getattr(schema, field.serialize_method_name)))
+        elif isinstance(field, fields.Nested):
+            nested = compile_schema(field.schema)
+            if field.many:
+                plan.append((key, attribute, lambda items, nested=nested: [nested(item) for item in items]))
+            else:
+                plan.append((key, attribute, nested))
+        else:
+            plan.append((key, attribute, _converter_for(field)))
+    plan = tuple(plan)
+
+    def serialize(obj):
+        result = {}
+        for key, attribute, convert in plan:
+            if attribute is None:
+                result[key] = convert(obj)
+                continue
+            value = getattr(obj, attribute)
+            result[key] = None if value is None else convert(value)
+        return result
+
+    return serialize
+
+
+def compile_many(serialize):
+    def serialize_many(objs):
+        return [serialize(obj) for obj in objs]
+    return serialize_many
+
+
+area_serializers_by_detail = {detail: compile_schema(schema) for detail, schema in area_schemas_by_detail.items()}
+areas_serializers_by_detail = {detail: compile_many(serialize) for detail, serialize in area_serializers_by_detail.items()}
+
+serialize_area = area_serializers_by_detail['full']
+serialize_areas = areas_serializers_by_detail['full']
+serialize_coordinate = compile_schema(area_coordinate_schema)
+serialize_image = compile_schema(image_schema)
+serialize_farm = compile_schema(farm_schema)
+serialize_approval = compile_schema(approval_schema)
+serialize_topography = compile_schema(topography_schema)
+serialize_harvest = compile_schema(harvest_schema)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, enabled with FAST_JSON. Serializer output
+    contains only JSON-native types, so it encodes directly; anything else
+    falls back to Flask's default handling. Keys stay sorted like Flask's,
+    but non-ASCII text is written as UTF-8 instead of \\u escapes.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_SORT_KEYS).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_SORT_KEYS),
+            mimetype=self.mimetype,
+        )
@@ -0,0 +1,127 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import select
+
+from Database import area
+
+DEFAULT_CELL_SIZE = 0.05  # degrees, roughly 5.5 km at the equator
+DEFAULT_REBUILD_SECONDS = 300
+
+
+class GridIndex:
+    """
+    In-process uniform grid over area bounding boxes.
+
+    Each worker keeps its own copy. Areas are picked up incrementally from
+    the database by Area_ID on every query, and the whole grid is rebuilt
+    every rebuild_seconds so rows committed out of Area_ID order are not
+    missed for long. Areas this worker creates are added at once with
+    insert(); they do not move the database watermark, so lower IDs
+    committed meanwhile by other workers are still loaded.
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE, rebuild_seconds=DEFAULT_REBUILD_SECONDS):
+        self.cell_size = cell_size
+        self.rebuild_seconds = rebuild_seconds
+        # Guards the grid itself; held only for in-memory updates and lookups.
+        self._lock = threading.Lock()
+        # Lets one thread at a time query the database for a refresh.
+        self._refresh_lock = threading.Lock()
+        self._cells = defaultdict(set)
+        self._boxes = {}
+        # Local inserts since the last rebuild, replayed onto the next grid.
+        self._local_boxes = {}
+        self._db_watermark = 0
+        self._built_at = None
+
+    def _cell_range(self, min_lat, min_lng, max_lat, max_lng):
+        return (
+            math.floor(min_lat / self.cell_size), math.floor(min_lng / self.cell_size),
+            math.floor(max_lat / self.cell_size), math.floor(max_lng / self.cell_size),
+        )
+
+    def insert(self, area_id, bbox):
+        with self._lock:
+            self._local_boxes[area_id] = bbox
+            self._add(self._cells, self._boxes, area_id, bbox)
+
+    def _add(self, cells, boxes, area_id, bbox):
+        if area_id in boxes:
+            return
+        boxes[area_id] = bbox
+        row_lo, col_lo, row_hi, col_hi = self._cell_range(*bbox)
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                cells[(row, col)].add(area_id)
+
+    def refresh(self, session):
+        """
+        Loads areas committed since the last refresh (or everything, once the
+        rebuild interval has passed). The database is read without holding
+        the grid lock; a rebuild builds a new grid and swaps it in. If
+        another thread is already refreshing, this returns at once and
+        queries use the grid as it is, except before the first build.
+        """
+        # Until the first build finishes there is nothing to fall back on, so wait.
+        if not self._refresh_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            rebuild = self._built_at is None or time.monotonic() - self._built_at > self.rebuild_seconds
+            since = 0 if rebuild else self._db_watermark
+            rows = session.execute(
+                select(area.Area_ID, area.Min_Latitude, area.Min_Longitude, area.Max_Latitude, area.Max_Longitude)
+                .where(area.Area_ID > since, area.Min_Latitude.is_not(None))
+                .order_by(area.Area_ID)
+            ).all()
+            watermark = rows[-1][0] if rows else since
+
+            if rebuild:
+                cells, boxes = defaultdict(set), {}
+                for row in rows:
+                    self._add(cells, boxes, row[0], tuple(row[1:]))
+                with self._lock:
+                    # Local inserts may have committed after the read above.
+                    for area_id, bbox in self._local_boxes.items():
+                        self._add(cells, boxes, area_id, bbox)
+                    self._cells, self._boxes = cells, boxes
+                    self._local_boxes = {}
+                    self._db_watermark = watermark
+                self._built_at = time.monotonic()
+            else:
+                with self._lock:
+                    for row in rows:
+                        self._add(self._cells, self._boxes, row[0], tuple(row[1:]))
+                    self._db_watermark = max(self._db_watermark, watermark)
+        finally:
+            self._refresh_lock.release()
+
+    def query(self, min_lat, min_lng, max_lat, max_lng):
+        """
+        Returns the sorted Area_IDs whose bounding box intersects the given one.
+        """
+        with self._lock:
+            row_lo, col_lo, row_hi, col_hi = self._cell_range(min_lat, min_lng, max_lat, max_lng)
+            cell_count = (row_hi - row_lo + 1) * (col_hi - col_lo + 1)
+            candidates = set()
+            if cell_count <= len(self._cells):
+                for row in range(row_lo, row_hi + 1):
+                    for col in range(col_lo, col_hi + 1):
+                        candidates |= self._cells.get((row, col), set())
+            else:
+                # Zoomed far out: walking the occupied cells is cheaper than the viewport's.
+                for (row, col), ids in self._cells.items():
+                    if row_lo <= row <= row_hi and col_lo <= col <= col_hi:
+                        candidates |= ids
+
+            hits = []
+            for area_id in candidates:
+                box = self._boxes[area_id]
+                if box[0] <= max_lat and box[2] >= min_lat and box[1] <= max_lng and box[3] >= min_lng:
+                    hits.append(area_id)
+            hits.sort()
+            return hits
+
+
+area_grid = GridIndex()
@@ -0,0 +1,253 @@
+import base64
+import datetime
+import json
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from extensions import db
+from Database import (area, areaImages, areaFarm, areaApproval, areaTopography, farmHarvestData, changeLog,
+                      changeLogLock, changePending,
+                      area_schemas_by_detail, image_schema, farm_schema, approval_schema, topography_schema,
+                      harvest_schema)
+from read_repository import AREA_COLUMNS
+from serializers import compile_schema
+from triggers import create_trigger
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_TOMBSTONE_TTL_DAYS = 30
+SNAPSHOT_BATCH_SIZE = 1000
+IN_CHUNK_SIZE = 1000
+CHANGE_LOG_LOCK_ID = 1
+
+# Trigger event -> (row alias, change_log operation).
+SYNC_TRIGGER_EVENTS = {
+    'INSERT': ('NEW', 'upsert'),
+    'UPDATE': ('NEW', 'upsert'),
+    'DELETE': ('OLD', 'delete'),
+}
+
+
+class SyncTokenExpired(Exception):
+    """The token predates the retained change log; the client must re-snapshot."""
+
+
+def _entity(model, schema, parent_column=None, columns=None, exclude=()):
+    return {
+        'model': model,
+        'primary_key': model.__mapper__.primary_key[0],
+        'columns': tuple(columns or model.__table__.columns),
+        'parent': parent_column.key if parent_column is not None else None,
+        'serialize': compile_schema(schema, exclude=exclude),
+    }
+
+
+# Entity name -> how to load and serialize it. Schemas leave foreign keys
+# out, so each payload also carries its parent ID for the client to link on.
+SYNC_ENTITIES = {
+    'areas': _entity(area, area_schemas_by_detail['full'], columns=AREA_COLUMNS + (area.Boundary,), exclude=('images',)),
+    'images': _entity(areaImages, image_schema, areaImages.Area_ID),
+    'approvals': _entity(areaApproval, approval_schema, areaApproval.Area_ID),
+    'farms': _entity(areaFarm, farm_schema, areaFarm.Area_ID),
+    'topography': _entity(areaTopography, topography_schema, areaTopography.Area_ID),
+    'harvests': _entity(farmHarvestData, harvest_schema, farmHarvestData.Farm_ID),
+}
+_ENTITY_BY_MODEL = {spec['model']: name for name, spec in SYNC_ENTITIES.items()}
+
+
+def encode_token(change_id, issued_at=None):
+    issued_at = issued_at or datetime.datetime.now()
+    raw = f"v1|{change_id}|{int(issued_at.timestamp())}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_token(token):
+    """
+    Returns (change_id, issued_at). Raises ValueError if the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        version, change_id, issued_at = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split('|')
+        if version != 'v1':
+            raise ValueError(version)
+        return int(change_id), datetime.datetime.fromtimestamp(int(issued_at))
+    except Exception:
+        raise ValueError("Invalid sync token")
+
+
+def serialize_row(name, row):
+    spec = SYNC_ENTITIES[name]
+    payload = spec['serialize'](row)
+    if spec['parent']:
+        payload[spec['parent']] = getattr(row, spec['parent'])
+    return payload
+
+
+def sync_trigger_ddl(dialect_name, table_names=None):
+    """
+    DROP/CREATE statements for the triggers that queue a change_pending row
+    for every insert, update and delete on the synced tables (or on those
+    in table_names), on MySQL or SQLite. Triggers see writes made by other
+    triggers, admin tooling and plain SQL as well as the ORM.
+    """
+    statements = []
+    for name, spec in SYNC_ENTITIES.items():
+        table_name = spec['model'].__tablename__
+        if table_names is not None and table_name not in table_names:
+            continue
+        for operation, (row, change) in SYNC_TRIGGER_EVENTS.items():
+            trigger = f"{table_name}_sync_{operation.lower()}"
+            queue = (
+                "INSERT INTO change_pending (Entity, Entity_ID, Operation) "
+                f"VALUES ('{name}', {row}.{spec['primary_key'].name}, '{change}')"
+            )
+            statements.append(f"DROP TRIGGER IF EXISTS {trigger}")
+            statements.append(create_trigger(dialect_name, trigger, operation, table_name, queue))
+    return statements
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_sync_triggers(metadata, connection, tables=(), **kwargs):
+    # Tables made by create_all get the same triggers as migrated ones.
+    created = {table.name for table in tables}
+    if changeLogLock.__tablename__ in created:
+        connection.execute(insert(changeLogLock).values(Lock_ID=CHANGE_LOG_LOCK_ID))
+    for statement in sync_trigger_ddl(connection.dialect.name, created):
+        connection.exec_driver_sql(statement)
+
+
+def publish_changes(session):
+    """
+    Moves queued change_pending rows into change_log and returns how many
+    were moved. change_log is only written here, while holding the row lock
+    on change_log_lock until the transaction ends, so Change_IDs are handed
+    out in commit order: once an ID is visible, no lower one can appear.
+
+    Rows queued by a transaction still in flight are skipped (MySQL 8's
+    SKIP LOCKED; SQLite has a single writer anyway) and published by that
+    transaction when it commits.
+    """
+    connection = session.connection()
+    if connection.execute(select(changePending.Pending_ID).limit(1)).first() is None:
+        return 0
+    now = datetime.datetime.now()
+    connection.execute(update(changeLogLock).where(changeLogLock.Lock_ID == CHANGE_LOG_LOCK_ID).values(Locked_At=now))
+    pending = connection.execute(
+        select(changePending.Pending_ID, changePending.Entity, changePending.Entity_ID, changePending.Operation)
+        .order_by(changePending.Pending_ID)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not pending:
+        return 0
+    connection.execute(insert(changeLog), [
+        {'Entity': row.Entity, 'Entity_ID': row.Entity_ID, 'Operation': row.Operation, 'created_at': now}
+        for row in pending
+    ])
+    pending_ids = [row.Pending_ID for row in pending]
+    for start in range(0, len(pending_ids), IN_CHUNK_SIZE):
+        connection.execute(delete(changePending).where(changePending.Pending_ID.in_(pending_ids[start:start + IN_CHUNK_SIZE])))
+    return len(pending)
+
+
+@event.listens_for(Session, 'before_commit')
+def _publish_changes(session):
+    """
+    Publishes the changes this transaction queued (and any committed ones
+    still waiting) as the last work before it commits.
+    """
+    if not session.in_transaction():
+        return
+    # before_commit runs ahead of commit's own flush; flush now so the
+    # triggers have queued everything.
+    session.flush()
+    publish_changes(session)
+
+
+def latest_change_id(session):
+    """
+    Highest published Change_ID. Every lower ID is already committed, so a
+    token for it never skips a change.
+    """
+    return session.execute(select(func.max(changeLog.Change_ID))).scalar() or 0
+
+
+def _fetch_rows(session, name, ids):
+    spec = SYNC_ENTITIES[name]
+    rows = []
+    ids = list(ids)
+    for start in range(0, len(ids), SNAPSHOT_BATCH_SIZE):
+        rows.extend(session.execute(
+            select(*spec['columns']).where(spec['primary_key'].in_(ids[start:start + SNAPSHOT_BATCH_SIZE]))
+        ))
+    return rows
+
+
+def changes_since(session, token, page_size=DEFAULT_PAGE_SIZE, tombstone_ttl_days=DEFAULT_TOMBSTONE_TTL_DAYS):
+    """
+    Returns the delta payload for a sync token: per entity, the current rows
+    of everything upserted and the IDs of everything deleted since the token,
+    at most page_size change_log entries at a time (has_more says whether
+    to call again with next_token). Raises ValueError for a malformed token
+    and SyncTokenExpired once its tombstones may have been pruned.
+    """
+    since, issued_at = decode_token(token)
+    if issued_at < datetime.datetime.now() - datetime.timedelta(days=tombstone_ttl_days):
+        raise SyncTokenExpired()
+
+    changes = session.execute(
+        select(changeLog.Change_ID, changeLog.Entity, changeLog.Entity_ID, changeLog.Operation)
+        .where(changeLog.Change_ID > since)
+        .order_by(changeLog.Change_ID)
+        .limit(page_size + 1)
+    ).all()
+    has_more = len(changes) > page_size
+    changes = changes[:page_size]
+
+    # Only the last operation per object matters.
+    latest = {}
+    for change in changes:
+        latest[(change.Entity, change.Entity_ID)] = change.Operation
+
+    payload = {}
+    for name in SYNC_ENTITIES:
+        upserted_ids = [entity_id for (entity, entity_id), operation in latest.items() if entity == name and operation == 'upsert']
+        deleted_ids = [entity_id for (entity, entity_id), operation in latest.items() if entity == name and operation == 'delete']
+        # An upserted row that is already gone was deleted after this page;
+        # its tombstone arrives with a later one.
+        payload[name] = {
+            'upserted': [serialize_row(name, row) for row in _fetch_rows(session, name, upserted_ids)],
+            'deleted': sorted(deleted_ids),
+        }
+
+    return {
+        'changes': payload,
+        'has_more': has_more,
+        'next_token': encode_token(changes[-1].Change_ID if changes else since),
+    }
+
+
+def stream_snapshot(session):
+    """
+    Yields the full data set as NDJSON lines: a header, one line per row
+    ({"entity": ..., "data": ...}) and a trailer carrying the token to pass
+    as ?since= afterwards. The token is taken before reading, so anything
+    written meanwhile is simply delivered again by the first delta.
+    """
+    change_id = latest_change_id(session)
+    yield json.dumps({'type': 'snapshot', 'entities': list(SYNC_ENTITIES)}) + '\n'
+    for name, spec in SYNC_ENTITIES.items():
+        rows = session.execute(
+            select(*spec['columns']).order_by(spec['primary_key']).execution_options(yield_per=SNAPSHOT_BATCH_SIZE)
+        )
+        for row in rows:
+            yield json.dumps({'type': 'row', 'entity': name, 'data': serialize_row(name, row)}, default=str) + '\n'
+    yield json.dumps({'type': 'end', 'next_token': encode_token(change_id)}) + '\n'
+
+
+def prune_change_log(session, tombstone_ttl_days=DEFAULT_TOMBSTONE_TTL_DAYS):
+    """
+    Deletes change_log rows (tombstones included) older than the token TTL.
+    A day of slack covers tokens issued just before the cutoff. Returns the
+    number of rows removed.
+    """
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=tombstone_ttl_days + 1)
+    return session.execute(delete(changeLog).where(changeLog.created_at < cutoff)).rowcount
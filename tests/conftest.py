@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db  # noqa: E402
+import Database  # noqa: E402,F401
+
+
+@pytest.fixture
+def app():
+    """
+    A bare Flask app on in-memory SQLite with the models' tables, for
+    testing the helper modules without app.py's MySQL setup. TESTING is
+    on, so every @query_budget view asserts its limits.
+    """
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI='sqlite://')
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
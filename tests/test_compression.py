@@ -0,0 +1,130 @@
+import gzip
+import json
+
+import pytest
+from flask import Response, jsonify
+
+from compression import brotli, compress_response, compression
+from response_cache import area_cache
+
+BIG = {'entries': [{'Area_ID': index, 'Area_Name': f"Area {index}"} for index in range(200)]}
+
+
+@pytest.fixture
+def client(app):
+    app.after_request(compress_response)
+    area_cache.init_app(app)
+
+    @app.route('/big')
+    def big():
+        return jsonify(BIG)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/small-allowed')
+    @compression(min_size=0)
+    def small_allowed():
+        return jsonify({'ok': True})
+
+    @app.route('/off')
+    @compression(enabled=False)
+    def off():
+        return jsonify(BIG)
+
+    @app.route('/tagged')
+    def tagged():
+        response = jsonify(BIG)
+        response.set_etag('abc')
+        return response
+
+    @app.route('/stream')
+    def stream():
+        return Response((json.dumps(entry) + '\n' for entry in BIG['entries']), mimetype='application/x-ndjson')
+
+    @app.route('/cached')
+    @area_cache.cached
+    def cached():
+        return jsonify(BIG)
+
+    return app.test_client()
+
+
+def test_gzip_when_accepted(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert json.loads(gzip.decompress(response.data)) == BIG
+
+
+def test_identity_without_accept_encoding(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json() == BIG
+
+
+@pytest.mark.skipif(brotli is None, reason='brotli is not installed')
+def test_brotli_preferred_over_gzip(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(response.data)) == BIG
+
+
+def test_gzip_refused_by_qvalue(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip;q=0, deflate'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_below_min_size_is_not_compressed(client):
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_route_can_lower_min_size(client):
+    response = client.get('/small-allowed', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+def test_app_min_size_setting(app, client):
+    app.config['COMPRESSION_MIN_SIZE'] = 1024 * 1024
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_route_can_disable_compression(client):
+    response = client.get('/off', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_streamed_response_is_compressed(client):
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert [json.loads(line) for line in lines] == BIG['entries']
+
+
+def test_compressed_response_gets_encoded_etag(client):
+    assert client.get('/tagged', headers={'Accept-Encoding': 'gzip'}).headers['ETag'] == '"abc-gzip"'
+    assert client.get('/tagged', headers={'Accept-Encoding': 'identity'}).headers['ETag'] == '"abc"'
+
+
+def test_cached_response_revalidates_per_encoding(client):
+    first = client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+    etag = first.headers['ETag']
+    assert first.headers['Content-Encoding'] == 'gzip'
+    assert etag.endswith('-gzip"')
+    assert json.loads(gzip.decompress(first.data)) == BIG
+
+    again = client.get('/cached', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert again.data == b''
+
+    # The gzip ETag does not match the identity representation.
+    plain = client.get('/cached', headers={'Accept-Encoding': 'identity', 'If-None-Match': etag})
+    assert plain.status_code == 200
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['ETag'] == etag.replace('-gzip', '')
+    assert plain.get_json() == BIG
@@ -0,0 +1,69 @@
+import pytest
+from flask import request
+
+from Database import users
+from extensions import db
+from query_budget import QueryBudgetExceeded, query_budget, unbudgeted
+
+
+def add_users(count):
+    db.session.add_all(
+        users(Email=f"user{index}@example.com", Password='x', First_name='F', Last_name='L', Sex='F', Contact_No='0')
+        for index in range(count)
+    )
+    db.session.commit()
+
+
+@pytest.fixture
+def client(app):
+    @app.route('/two-statements')
+    @query_budget(max_statements=1)
+    def two_statements():
+        db.session.execute(db.select(users.User_ID)).all()
+        db.session.execute(db.select(users.Email)).all()
+        return 'ok'
+
+    @app.route('/rows/<int:limit>')
+    @query_budget(max_rows=lambda: request.view_args['limit'])
+    def rows(limit):
+        return str(len(db.session.execute(db.select(users)).scalars().all()))
+
+    @app.route('/upkeep')
+    @query_budget(max_statements=1)
+    def upkeep():
+        with unbudgeted():
+            db.session.execute(db.select(users.User_ID)).all()
+            db.session.execute(db.select(users.Email)).all()
+        db.session.execute(db.select(users.User_ID)).all()
+        return 'ok'
+
+    return app.test_client()
+
+
+def test_statement_budget_raises_under_testing(client):
+    with pytest.raises(QueryBudgetExceeded, match='2/1 statements'):
+        client.get('/two-statements')
+
+
+def test_row_budget_counts_fetched_rows(client):
+    add_users(3)
+    assert client.get('/rows/3').data == b'3'
+    with pytest.raises(QueryBudgetExceeded, match='3/2 rows'):
+        client.get('/rows/2')
+
+
+def test_unbudgeted_block_is_not_counted(client):
+    assert client.get('/upkeep').data == b'ok'
+
+
+def test_debug_mode_only_warns(app, client, caplog):
+    app.testing = False
+    app.debug = True
+    assert client.get('/two-statements').data == b'ok'
+    assert 'Query budget exceeded in two_statements' in caplog.text
+
+
+def test_strict_setting_fails_the_request_outside_testing(app, client):
+    app.testing = False
+    app.config['QUERY_BUDGET_STRICT'] = True
+    assert client.get('/two-statements').status_code == 500
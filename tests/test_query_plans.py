@@ -0,0 +1,20 @@
+import pytest
+
+from extensions import db
+from query_plans import HOT_QUERIES, check_hot_queries
+
+
+@pytest.fixture
+def results(app):
+    with db.engine.connect() as connection:
+        return check_hot_queries(connection)
+
+
+def test_every_hot_query_is_checked(results):
+    assert set(results) == set(HOT_QUERIES)
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_scans_no_table_in_full(results, name):
+    plan, scanned = results[name]
+    assert scanned == [], f"{name} scans {', '.join(scanned)} in full: {plan}"
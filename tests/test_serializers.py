@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from Database import areaImages, farmHarvestData, area, area_schemas_by_detail, harvest_schema, users
+from bulk_import import build_area
+from extensions import db
+from geometry import DETAIL_LEVELS, pack_boundary
+from geometry_metrics import compute_metrics
+from read_repository import area_select, assemble_areas
+from serializers import OrjsonProvider, area_serializers_by_detail, orjson, serialize_harvest
+
+AREA_VALUES = [
+    {'name': 'Mango Grove', 'region': 'Region IV-A', 'province': 'Batangas', 'barangay': 'Sabang',
+     'organization': 'Co-op', 'vertices': [(13.75, 121.05), (13.76, 121.05), (13.76, 121.06), (13.75, 121.06)],
+     'slope': 12, 'masl': 85.5, 'soil_type': 'Clay loam', 'suitability': 'High', 'hectares': 2.75},
+    # Nullable columns left empty and non-ASCII text.
+    {'name': 'Señora Plot', 'region': 'CAR', 'province': 'Benguet', 'barangay': 'Paoay',
+     'organization': 'Ñ Farmers', 'vertices': [(16.4, 120.6), (16.41, 120.6), (16.41, 120.61)],
+     'slope': None, 'masl': None, 'soil_type': None, 'suitability': None, 'hectares': 0.1234},
+]
+
+
+@pytest.fixture
+def areas(app):
+    owner = users(Email='owner@example.com', Password='x', First_name='F', Last_name='L', Sex='F', Contact_No='0')
+    db.session.add(owner)
+    db.session.flush()
+    metrics = compute_metrics([pack_boundary(values['vertices']) for values in AREA_VALUES])
+    entries = [build_area(owner.User_ID, values, row_metrics) for values, row_metrics in zip(AREA_VALUES, metrics)]
+    db.session.add_all(entries)
+    db.session.flush()
+    entries[0].images.append(areaImages(Filepath='/static/area_images/1/a.jpg', Processing_Status='Ready',
+                                        Thumbnail_Path='/static/area_images/1/a_thumb.jpg'))
+    db.session.add(farmHarvestData(Farm_ID=entries[0].farm[0].Farm_ID, Crop='Rice', Status='Ongoing',
+                                   Sow_Date=datetime.datetime(2024, 1, 15), Harvest_Date=datetime.datetime(2024, 5, 1)))
+    db.session.commit()
+    db.session.expire_all()
+    return area.query.order_by(area.Area_ID).all()
+
+
+def providers(app):
+    yield DefaultJSONProvider(app)
+    if orjson is not None:
+        yield OrjsonProvider(app)
+
+
+@pytest.mark.parametrize('detail', DETAIL_LEVELS)
+def test_area_serializers_match_schemas(app, areas, detail):
+    schema = area_schemas_by_detail[detail]
+    for provider in providers(app):
+        for entry in areas:
+            assert provider.dumps(area_serializers_by_detail[detail](entry)) == provider.dumps(schema.dump(entry))
+
+
+@pytest.mark.parametrize('detail', DETAIL_LEVELS)
+def test_core_row_assembly_matches_schemas(app, areas, detail):
+    schema = area_schemas_by_detail[detail]
+    rows = db.session.execute(area_select(detail).order_by(area.Area_ID)).all()
+    assembled = assemble_areas(db.session, rows, detail)
+    provider = DefaultJSONProvider(app)
+    assert [provider.dumps(entry) for entry in assembled] == [provider.dumps(schema.dump(entry)) for entry in areas]
+
+
+def test_harvest_serializer_matches_schema(app, areas):
+    harvest = farmHarvestData.query.one()
+    for provider in providers(app):
+        assert provider.dumps(serialize_harvest(harvest)) == provider.dumps(harvest_schema.dump(harvest))
@@ -0,0 +1,96 @@
+import datetime
+import threading
+import time
+from flask import current_app
+from sqlalchemy import delete, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from Database import revokedToken
+
+DEFAULT_REFRESH_SECONDS = 2
+DEFAULT_REBUILD_SECONDS = 300
+# Revocations are polled by created_at with this much overlap, which covers
+# transactions that committed a little after they stamped the row.
+POLL_OVERLAP_SECONDS = 30
+
+
+class RevocationStore:
+    """
+    JWT blocklist kept in the revoked_token table and mirrored into a
+    per-worker set, so the check on every request is a set lookup.
+
+    A worker sees its own revocations immediately and everybody else's
+    within refresh_seconds: the set is topped up from recently created
+    rows at most that often, and rebuilt from the unexpired rows every
+    rebuild_seconds, which also drops tokens that have since expired.
+    A refresh_seconds of 0 checks the table on every request.
+    """
+
+    def __init__(self, refresh_seconds=DEFAULT_REFRESH_SECONDS, rebuild_seconds=DEFAULT_REBUILD_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._revoked = frozenset()
+        self._next_refresh = 0
+        self._next_rebuild = 0
+        self._polled_at = None
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config.get('JWT_REVOCATION_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS)
+        self.rebuild_seconds = app.config.get('JWT_REVOCATION_REBUILD_SECONDS', DEFAULT_REBUILD_SECONDS)
+
+    def is_revoked(self, session, jti):
+        if time.monotonic() >= self._next_refresh:
+            self.refresh(session)
+        return jti in self._revoked
+
+    def refresh(self, session):
+        # One thread refreshes; the others keep answering from the current set.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            now = datetime.datetime.now()
+            statement = select(revokedToken.JTI).where(or_(revokedToken.Expires_At.is_(None), revokedToken.Expires_At > now))
+            rebuild = self._polled_at is None or time.monotonic() >= self._next_rebuild
+            if not rebuild:
+                since = self._polled_at - datetime.timedelta(seconds=POLL_OVERLAP_SECONDS)
+                statement = statement.where(revokedToken.created_at >= since)
+            jtis = session.execute(statement).scalars().all()
+
+            # The set is swapped, never mutated, so readers need no lock.
+            self._revoked = frozenset(jtis) if rebuild else self._revoked.union(jtis)
+            if rebuild:
+                self._next_rebuild = time.monotonic() + self.rebuild_seconds
+            self._polled_at = now
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+        except Exception as e:
+            # Keep serving the last known set rather than failing every request.
+            current_app.logger.error(f"Could not refresh revoked tokens: {e}")
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+        finally:
+            self._lock.release()
+
+    def revoke(self, session, jti, expires_at=None):
+        """
+        Records jti as revoked until expires_at (None: forever) and commits.
+        """
+        try:
+            session.add(revokedToken(JTI=jti, Expires_At=expires_at))
+            session.commit()
+        except IntegrityError:
+            # Already revoked, e.g. a logout retried by the client.
+            session.rollback()
+        with self._lock:
+            self._revoked = self._revoked.union((jti,))
+
+    def prune(self, session):
+        """
+        Deletes revocations of tokens that have expired anyway. Returns the
+        number of rows removed.
+        """
+        return session.execute(
+            delete(revokedToken).where(revokedToken.Expires_At < datetime.datetime.now())
+        ).rowcount
+
+
+revocation_store = RevocationStore()
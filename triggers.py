@@ -0,0 +1,40 @@
+TRIGGER_DIALECTS = ('mysql', 'sqlite')
+# The local time, as datetime.datetime.now() writes the updated_at columns.
+_LOCAL_NOW = {
+    'mysql': "NOW(6)",
+    'sqlite': "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')",
+}
+
+
+class UnsupportedDatabaseError(RuntimeError):
+    """The database has no trigger DDL here; see check_trigger_support()."""
+
+
+def check_trigger_support(dialect_name):
+    """
+    area.Approval_Status, the sync change log and the area cache generation
+    are kept current by database triggers, which exist for MySQL and SQLite
+    only. Raises UnsupportedDatabaseError for any other database, so such a
+    deployment fails at startup rather than silently missing changes.
+    """
+    if dialect_name not in TRIGGER_DIALECTS:
+        raise UnsupportedDatabaseError(
+            f"The {dialect_name} database is not supported: approval status, sync and the area cache "
+            f"rely on triggers, which are only defined for {', '.join(TRIGGER_DIALECTS)}."
+        )
+
+
+def local_now(dialect_name):
+    check_trigger_support(dialect_name)
+    return _LOCAL_NOW[dialect_name]
+
+
+def create_trigger(dialect_name, name, operation, table_name, body):
+    """
+    CREATE TRIGGER statement running the single SQL statement body after
+    each row's operation (INSERT, UPDATE or DELETE) on table_name.
+    """
+    check_trigger_support(dialect_name)
+    if dialect_name == 'mysql':
+        return f"CREATE TRIGGER {name} AFTER {operation} ON {table_name} FOR EACH ROW {body}"
+    return f"CREATE TRIGGER {name} AFTER {operation} ON {table_name} FOR EACH ROW BEGIN {body}; END"
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import uuid
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+STAGING_DIR_NAME = '.incoming'
+DEFAULT_MAX_IMAGE_UPLOAD_BYTES = 15 * 1024 * 1024
+UPLOAD_LIMIT_CONFIG = 'MAX_IMAGE_UPLOAD_BYTES'
+
+
+class StagedUpload:
+    """
+    Writable file stream for one multipart file part.
+
+    Bytes go straight to a staging file next to the final upload directory
+    while the SHA-256 and size are updated chunk by chunk, so a photo is
+    never held in memory and an oversized part is rejected as soon as it
+    crosses the limit.
+    """
+
+    def __init__(self, staging_dir, max_bytes):
+        os.makedirs(staging_dir, exist_ok=True)
+        self.path = os.path.join(staging_dir, f"{uuid.uuid4().hex}.part")
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = open(self.path, 'w+b')
+        self.finalized = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise RequestEntityTooLarge(f"Uploaded file exceeds the {self.max_bytes} byte limit.")
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def finalize(self, destination):
+        """
+        Moves the staged bytes to their final path (a rename, not a copy).
+        """
+        self._file.close()
+        os.replace(self.path, destination)
+        self.finalized = True
+
+    def discard(self):
+        self._file.close()
+        if not self.finalized and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        # read/seek/readline/close etc. for werkzeug's FileStorage
+        return getattr(self._file, name)
+
+
+def upload_limit(config_key):
+    """
+    Sizes a view's multipart file parts by another config key than
+    MAX_IMAGE_UPLOAD_BYTES, e.g. for bulk import files. Place it directly
+    under @app.route.
+    """
+    def decorator(view):
+        view.upload_limit_config = config_key
+        return view
+    return decorator
+
+
+class StreamingUploadRequest(Request):
+    """
+    Request class that streams multipart file parts into StagedUpload files
+    under BASE_UPLOAD_DIR instead of werkzeug's spooled temporary files.
+    Anything not finalized by the view is removed when the request closes.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        staging_dir = os.path.join(current_app.root_path, current_app.config['BASE_UPLOAD_DIR'], STAGING_DIR_NAME)
+        view = current_app.view_functions.get(self.endpoint)
+        config_key = getattr(view, 'upload_limit_config', UPLOAD_LIMIT_CONFIG)
+        max_bytes = current_app.config.get(config_key, DEFAULT_MAX_IMAGE_UPLOAD_BYTES)
+        upload = StagedUpload(staging_dir, max_bytes)
+        self.__dict__.setdefault('_staged_uploads', []).append(upload)
+        return upload
+
+    def close(self):
+        super().close()
+        for upload in self.__dict__.get('_staged_uploads', ()):
+            upload.discard()